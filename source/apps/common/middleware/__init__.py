@@ -8,12 +8,15 @@ apps.common.middleware
 * SetRealIPMiddleware — определяет реальный IP и блокирует некорректные адреса.
 * ExceptionResponseAuditorMiddleware — обрабатывает исключения и ведёт аудит ответов.
 * TimezoneMiddleware — активирует часовую зону из cookie.
+* QueryBudgetMiddleware — считает SQL-запросы и их время за запрос.
 """
 
+from .query_budget import QueryBudgetMiddleware
 from .real_ip import SetRealIPMiddleware
 from .timezone import TimezoneMiddleware
 
 __all__ = [
+    "QueryBudgetMiddleware",
     "SetRealIPMiddleware",
     "TimezoneMiddleware",
 ]
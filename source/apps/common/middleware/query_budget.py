@@ -0,0 +1,64 @@
+# apps/common/middleware/query_budget.py
+# -*- coding: utf-8 -*-
+"""
+QueryBudgetMiddleware
+
+- Считает SQL-запросы и их время за запрос (cross.query_budget).
+- Добавляет метрику db в заголовок Server-Timing.
+- Если представление превысило бюджет (@budgeted или
+  settings.QUERY_BUDGET_DEFAULT) — пишет предупреждение в лог
+  с самыми частыми повторяющимися запросами.
+- Выключается settings.QUERY_BUDGET_ENABLED (по умолчанию = DEBUG).
+"""
+
+import logging
+
+from django.conf import settings
+
+from cross.query_budget import record_queries, view_budget
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "QUERY_BUDGET_ENABLED", settings.DEBUG)
+        self.default_budget = getattr(settings, "QUERY_BUDGET_DEFAULT", 50)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        with record_queries(request.path) as stats:
+            response = self.get_response(request)
+
+        self._report(request, response, stats)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Состояние кешей неизвестно — проверяется холодный бюджет (верхняя граница)
+        request.query_budget = view_budget(view_func, request.method, self.default_budget)
+
+    # ------------------------------------------------------------------ #
+    # Вспомогательные методы                                             #
+    # ------------------------------------------------------------------ #
+
+    def _report(self, request, response, stats) -> None:
+        metric = f'db;desc="{stats.count} queries";dur={stats.seconds * 1000:.1f}'
+        existing = response.get("Server-Timing")
+        response["Server-Timing"] = f"{existing}, {metric}" if existing else metric
+
+        budget = getattr(request, "query_budget", self.default_budget)
+        if stats.count > budget:
+            logger.warning(
+                "Query budget exceeded",
+                extra={
+                    "path": request.path,
+                    "queries": stats.count,
+                    "budget": budget,
+                    "db_ms": round(stats.seconds * 1000, 1),
+                    "repeated": [f"{n}x {sql[:200]}" for sql, n in stats.duplicates()],
+                },
+            )
@@ -1,10 +1,16 @@
 from django.contrib import admin
+from django.db.models import Count, Q
+
+from cross.search import search_condition
+
 from .models import (
     Client,
     Service,
     ClientService,
+    ClientStats,
     Engineer,
     SupportTicket,
+    PriorityPolicy,
 )
 
 
@@ -43,10 +49,13 @@ class ClientAdmin(admin.ModelAdmin):
 
     list_filter = ("is_company",)
 
+    list_select_related = ("stats",)
+
     inlines = [ClientServiceInline]
 
     def services_count(self, obj):
-        return obj.clientservice_set.count()
+        stats = getattr(obj, "stats", None)
+        return stats.services_count if stats else 0
 
     services_count.short_description = "Кол-во услуг"
 
@@ -71,9 +80,28 @@ class ClientServiceAdmin(admin.ModelAdmin):
     list_display = ("client", "service", "service_number", "created_at")
     search_fields = ("service_number", "client__full_name", "service__title")
     list_filter = ("service__service_type",)
+    list_select_related = ("client", "service")
     readonly_fields = ("service_number", "created_at")
 
 
+# ============================================================
+# Админка Статистики клиентов (только чтение)
+# ============================================================
+
+@admin.register(ClientStats)
+class ClientStatsAdmin(admin.ModelAdmin):
+    list_display = ("client", "total_spend", "services_count", "updated_at")
+    search_fields = ("client__full_name", "client__account_number")
+    list_select_related = ("client",)
+    readonly_fields = [f.name for f in ClientStats._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 # ============================================================
 # Админка Инженеров
 # ============================================================
@@ -85,6 +113,18 @@ class EngineerAdmin(admin.ModelAdmin):
     list_filter = ("is_active",)
     readonly_fields = ("active_tickets_count",)
 
+    def get_queryset(self, request):
+        # Один COUNT в запросе списка вместо запроса на каждую строку
+        return super().get_queryset(request).annotate(
+            active_tickets=Count("supportticket", filter=Q(supportticket__status__in=["new", "in_progress"]))
+        )
+
+    def active_tickets_count(self, obj):
+        return obj.active_tickets
+
+    active_tickets_count.short_description = "Активных заявок"
+    active_tickets_count.admin_order_field = "active_tickets"
+
 # ============================================================
 # Админка Заявок
 # ============================================================
@@ -101,20 +141,31 @@ class SupportTicketAdmin(admin.ModelAdmin):
         "closed_at",
     )
 
+    # Описание и решение ищутся полнотекстовым индексом (get_search_results)
     search_fields = (
         "ticket_code",
         "client__full_name",
         "engineer__full_name",
-        "description",
     )
 
     list_filter = ("status",)
 
+    list_select_related = ("client", "engineer")
+
     readonly_fields = (
         "ticket_code",
         "created_at",
+        "version",
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        matched, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            # ИЛИ к условиям search_fields, с сохранением фильтров списка;
+            # все совпадения, а не первые SEARCH_LIMIT по релевантности
+            matched |= queryset.filter(search_condition(search_term))
+        return matched, may_have_duplicates
+
     fieldsets = (
         (
             "Общая информация",
@@ -126,6 +177,7 @@ class SupportTicketAdmin(admin.ModelAdmin):
                     "status",
                     "created_at",
                     "closed_at",
+                    "version",
                 )
             },
         ),
@@ -144,3 +196,15 @@ class SupportTicketAdmin(admin.ModelAdmin):
             },
         ),
     )
+
+
+# ============================================================
+# Админка Политик приоритизации
+# ============================================================
+
+@admin.register(PriorityPolicy)
+class PriorityPolicyAdmin(admin.ModelAdmin):
+    list_display = ("name", "kind", "version", "is_active", "updated_at")
+    list_filter = ("kind", "is_active")
+    search_fields = ("name",)
+    readonly_fields = ("version", "updated_at")
@@ -5,3 +5,6 @@ class SupportConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.support'
     verbose_name = "Служба поддержки клиентов"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,132 @@
+import time
+import threading
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.support.models import Client, Engineer, SupportTicket
+from cross.work_queue import claim_next_ticket
+
+
+BENCH_MARK = "[bench_claim]"
+# Столько ошибок подряд — ошибка постоянная (нет таблицы, БД заблокирована), поток останавливается
+MAX_CONSECUTIVE_ERRORS = 20
+
+
+class Command(BaseCommand):
+    help = "Бенчмарк очереди заявок: N инженеров параллельно забирают заявки"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--engineers", type=int, default=50)
+        parser.add_argument("--tickets", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        engineers_count = options["engineers"]
+        tickets_count = options["tickets"]
+
+        client = Client.objects.first()
+        if client is None:
+            self.stdout.write(self.style.ERROR("Нет клиентов. Сначала выполните seed."))
+            return
+
+        self.stdout.write(self.style.NOTICE(
+            f"\n=== Бенчмарк: {engineers_count} инженеров, {tickets_count} заявок "
+            f"({connection.vendor}) ===\n"
+        ))
+
+        engineers, ticket_ids = self._prepare(client, engineers_count, tickets_count)
+        try:
+            self._run(engineers, ticket_ids)
+        finally:
+            # Строки бенчмарка удаляются и при ошибке / прерывании (Ctrl+C)
+            self._cleanup(engineers)
+
+    def _run(self, engineers, ticket_ids):
+        claimed = Counter()
+        errors = []
+        stopped = []
+        lock = threading.Lock()
+        stop = threading.Event()
+        start_barrier = threading.Barrier(len(engineers))
+
+        bench_tickets = SupportTicket.objects.filter(id__in=ticket_ids)
+
+        def worker(engineer):
+            start_barrier.wait()
+            consecutive_errors = 0
+            try:
+                while not stop.is_set():
+                    try:
+                        ticket = claim_next_ticket(engineer, bench_tickets)
+                    except Exception as exc:
+                        consecutive_errors += 1
+                        with lock:
+                            errors.append(exc)
+                            if consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+                                stopped.append(engineer)
+                                break
+                        continue
+                    consecutive_errors = 0
+                    if ticket is None:
+                        break
+                    with lock:
+                        claimed[ticket.id] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(e,)) for e in engineers]
+
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        try:
+            for t in threads:
+                t.join()
+        finally:
+            stop.set()
+            for t in threads:
+                t.join()
+        elapsed = time.perf_counter() - started
+
+        duplicates = sum(1 for n in claimed.values() if n > 1)
+        total = sum(claimed.values())
+
+        self.stdout.write(f"Забрано заявок:    {total} / {len(ticket_ids)}")
+        self.stdout.write(f"Дубликатов:        {duplicates}")
+        self.stdout.write(f"Ошибок/повторов:   {len(errors)}")
+        for exc in errors[:3]:
+            self.stdout.write(f"  {exc.__class__.__name__}: {exc}")
+        if stopped:
+            self.stdout.write(self.style.WARNING(
+                f"Остановлено потоков после {MAX_CONSECUTIVE_ERRORS} ошибок подряд: {len(stopped)}"
+            ))
+        self.stdout.write(f"Время:             {elapsed:.2f} с")
+        self.stdout.write(f"Пропускная способность: {total / elapsed:.0f} заявок/с")
+
+        if duplicates:
+            self.stdout.write(self.style.ERROR("\nОдна заявка выдана нескольким инженерам!\n"))
+        else:
+            self.stdout.write(self.style.SUCCESS("\n=== ГОТОВО ===\n"))
+
+    def _prepare(self, client, engineers_count, tickets_count):
+        with transaction.atomic():
+            engineers = Engineer.objects.bulk_create([
+                Engineer(full_name=f"{BENCH_MARK} инженер {i}")
+                for i in range(engineers_count)
+            ])
+            tickets = SupportTicket.objects.bulk_create([
+                SupportTicket(
+                    client=client,
+                    description=f"{BENCH_MARK} заявка {i}",
+                    priority_score=i % 101,
+                    ticket_code=f"B{i:09d}",
+                    status="new",
+                )
+                for i in range(tickets_count)
+            ])
+        return engineers, [t.id for t in tickets]
+
+    def _cleanup(self, engineers):
+        SupportTicket.objects.filter(description__startswith=BENCH_MARK).delete()
+        Engineer.objects.filter(id__in=[e.id for e in engineers]).delete()
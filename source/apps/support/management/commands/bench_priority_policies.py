@@ -0,0 +1,109 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+
+from apps.support.models import PriorityPolicy, SupportTicket
+from cross.client_spend import load_spend_distribution
+from cross.priority_bulk import READ_CHUNK_SIZE, load_client_features
+from cross.priority_policy import (
+    DEFAULT_POLICY,
+    LOG_PRICE_POLICY,
+    SERVICE_TYPES,
+    compile_stored_policy,
+)
+
+
+DEFAULT_INITIAL_PRIORITY = 50
+
+BENCH_DTYPE = np.dtype([
+    ("client_id", np.int64),
+    ("initial_priority", np.float64),
+    ("priority_score", np.int64),
+])
+
+
+class Command(BaseCommand):
+    help = "Сравнение политик приоритизации: скорость и распределение оценок на реальных заявках"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sample", type=int, default=5000, help="Заявок для замера скалярного score()")
+        parser.add_argument("--policy", type=int, action="append", help="id политики из БД (по умолчанию все)")
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("\n=== Бенчмарк политик приоритизации ===\n"))
+
+        rows = (
+            SupportTicket.objects
+            .order_by()
+            .annotate(initial=Coalesce("initial_priority", Value(DEFAULT_INITIAL_PRIORITY)))
+            .values_list("client_id", "initial", "priority_score")
+        )
+        tickets = np.fromiter(rows.iterator(chunk_size=READ_CHUNK_SIZE), dtype=BENCH_DTYPE)
+        if not len(tickets):
+            self.stdout.write(self.style.ERROR("Нет заявок. Сначала выполните seed."))
+            return
+
+        client_ids = tickets["client_id"]
+        features = load_client_features(client_ids)
+        distribution = load_spend_distribution()
+
+        totals = features.total_spend[client_ids]
+        percentile = np.zeros(len(tickets)) if distribution.is_empty else distribution.percentile_many(totals)
+
+        vector_args = (
+            tickets["initial_priority"],
+            percentile,
+            features.is_company[client_ids],
+            totals,
+            features.services_count[client_ids],
+            features.type_counts[client_ids],
+        )
+
+        sample = np.random.default_rng(0).choice(len(tickets), size=min(options["sample"], len(tickets)), replace=False)
+        scalar_args = [
+            (
+                float(vector_args[0][i]),
+                float(vector_args[1][i]),
+                bool(vector_args[2][i]),
+                float(vector_args[3][i]),
+                int(vector_args[4][i]),
+                {t: int(n) for t, n in zip(SERVICE_TYPES, vector_args[5][i]) if n},
+            )
+            for i in sample
+        ]
+
+        stored = PriorityPolicy.objects.order_by("id")
+        if options["policy"]:
+            stored = stored.filter(id__in=options["policy"])
+        policies = [DEFAULT_POLICY, LOG_PRICE_POLICY, *(compile_stored_policy(p) for p in stored)]
+
+        self.stdout.write(f"Заявок: {len(tickets)}, выборка для score(): {len(scalar_args)}\n")
+
+        for policy in policies:
+            self._report(policy, vector_args, scalar_args, tickets["priority_score"])
+
+        self.stdout.write(self.style.SUCCESS("Готово!\n"))
+
+    def _report(self, policy, vector_args, scalar_args, current_scores):
+        started = time.perf_counter()
+        scores = policy.score_many(*vector_args)
+        vector_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for args in scalar_args:
+            policy.score(*args)
+        scalar_elapsed = time.perf_counter() - started
+
+        p10, p50, p90 = np.percentile(scores, [10, 50, 90])
+        deciles = np.bincount(np.minimum(scores // 10, 9), minlength=10) / len(scores)
+
+        self.stdout.write(self.style.NOTICE(f"--- {policy} ---"))
+        self.stdout.write(f"score_many:  {len(scores) / max(vector_elapsed, 1e-9):,.0f} заявок/с")
+        self.stdout.write(f"score:       {len(scalar_args) / max(scalar_elapsed, 1e-9):,.0f} заявок/с")
+        self.stdout.write(f"Среднее:     {scores.mean():.1f}   p10/p50/p90: {p10:.0f}/{p50:.0f}/{p90:.0f}")
+        self.stdout.write(f"Упёрлось в 100: {(scores == 100).mean():.1%}   в 0: {(scores == 0).mean():.1%}")
+        self.stdout.write(f"Отличается от сохранённого: {(scores != current_scores).mean():.1%}")
+        self.stdout.write("Децили:      " + " ".join(f"{share:.0%}" for share in deciles) + "\n")
@@ -0,0 +1,209 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Sum, Window
+from django.db.models.functions import RowNumber, TruncDate
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from apps.support.models import Client, Engineer, Service, SupportTicket
+from cross.rollups import ROLLUP_TZ, _day_range, local_day
+from cross.ticket_feed import _after, decode_cursor, encode_cursor, section_queryset
+from cross.work_queue import claimable_tickets
+
+
+INSERT_BATCH_SIZE = 10_000
+HISTORY_DAYS = 730
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарк индексов заявок: на временной БД сравнивает EXPLAIN и время "
+        "горячих запросов без индексов SupportTicket.Meta.indexes и с ними"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickets", type=int, default=1_000_000)
+        parser.add_argument("--clients", type=int, default=20_000)
+        parser.add_argument("--engineers", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=15)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+        try:
+            self._seed(options)
+            queries = self._queries()
+            indexes = SupportTicket._meta.indexes
+
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.remove_index(SupportTicket, index)
+            before = self._measure(queries, options["repeat"], "без индексов")
+
+            started = time.perf_counter()
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.add_index(SupportTicket, index)
+            self.stdout.write(f"\nПостроение {len(indexes)} индексов: {time.perf_counter() - started:.1f} с")
+            after = self._measure(queries, options["repeat"], "с индексами")
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(self.style.NOTICE("\n=== Итог (медиана, мс) ==="))
+        self.stdout.write(f"{'без':>10} {'с':>10} {'ускорение':>10}  запрос")
+        for name in queries:
+            speedup = before[name] / after[name] if after[name] else float("inf")
+            self.stdout.write(f"{before[name]:>10.2f} {after[name]:>10.2f} {speedup:>9.1f}x  {name}")
+
+    # ------------------------------------------------------------
+    # Данные
+    # ------------------------------------------------------------
+    def _seed(self, options):
+        rng = random.Random(options["seed"])
+        started = time.perf_counter()
+
+        Service.objects.bulk_create([
+            Service(title=f"Услуга {i}", service_type=service_type, price=Decimal(1000 + i))
+            for i, (service_type, _) in enumerate(Service.SERVICE_TYPES)
+        ])
+        client_ids = [
+            client.id for client in Client.objects.bulk_create([
+                Client(
+                    full_name=f"Клиент {i}",
+                    account_number=str(100000 + i),
+                    phone_number="+77000000000",
+                    email=f"client{i}@example.com",
+                    service_address="Алматы",
+                )
+                for i in range(options["clients"])
+            ], batch_size=INSERT_BATCH_SIZE)
+        ]
+        engineer_ids = [
+            engineer.id for engineer in Engineer.objects.bulk_create([
+                Engineer(full_name=f"Инженер {i}") for i in range(options["engineers"])
+            ])
+        ]
+
+        # Историческое время создания: auto_now_add на время вставки отключается
+        created_field = SupportTicket._meta.get_field("created_at")
+        now = timezone.now()
+        created_field.auto_now_add = False
+        try:
+            for start in range(0, options["tickets"], INSERT_BATCH_SIZE):
+                batch = []
+                for i in range(start, min(start + INSERT_BATCH_SIZE, options["tickets"])):
+                    # Как в жизни: открытых заявок немного, основная масса закрыта
+                    status = rng.choices(["new", "in_progress", "done"], weights=[3, 7, 90])[0]
+                    created_at = now - timedelta(seconds=rng.randint(0, HISTORY_DAYS * 86400))
+                    batch.append(SupportTicket(
+                        client_id=rng.choice(client_ids),
+                        engineer_id=rng.choice(engineer_ids) if status != "new" or rng.random() < 0.2 else None,
+                        description=f"Проблема {i}: нет соединения",
+                        priority_score=rng.randint(0, 100),
+                        initial_priority=rng.randint(0, 100),
+                        engineer_visit_probability=rng.randint(0, 100),
+                        final_resolution=(
+                            rng.choice(["Заменён коннектор", "Перезагрузка ONU", ""])
+                            if status == "done" else None
+                        ),
+                        status=status,
+                        created_at=created_at,
+                        closed_at=created_at + timedelta(hours=rng.randint(1, 72)) if status == "done" else None,
+                        ticket_code=f"{i + 1:06d}",
+                    ))
+                with transaction.atomic():
+                    SupportTicket.objects.bulk_create(batch)
+        finally:
+            created_field.auto_now_add = True
+
+        self.stdout.write(self.style.NOTICE(
+            f"\n=== {options['tickets']} заявок, {options['clients']} клиентов, "
+            f"{options['engineers']} инженеров ({connection.vendor}); "
+            f"данные: {time.perf_counter() - started:.1f} с ===\n"
+        ))
+
+    # ------------------------------------------------------------
+    # Горячие запросы (те же, что в коде приложения)
+    # ------------------------------------------------------------
+    def _queries(self) -> dict:
+        engineer = Engineer.objects.order_by("id").first()
+        engineers = list(Engineer.objects.order_by("id"))
+
+        # Курсор из середины закрытых заявок — «глубокая» страница ленты
+        done = section_queryset("done")
+        middle = done[done.count() // 2]
+        cursor = decode_cursor(encode_cursor(middle))
+
+        day_start, day_end = _day_range({local_day(timezone.now()) - timedelta(days=30)})
+
+        return {
+            "лента активных, 1-я страница": section_queryset("active")[:25],
+            "лента закрытых, страница из середины": done.filter(_after(*cursor))[:25],
+            "очередь инженера (claim)": claimable_tickets(engineer).values("id")[:1],
+            "загрузка инженеров": (
+                Engineer.objects
+                .annotate(active=Count("supportticket", filter=Q(supportticket__status__in=["new", "in_progress"])))
+                .order_by("id")
+                .values("id", "active")
+            ),
+            "история решений инженеров": (
+                SupportTicket.objects
+                .filter(engineer__in=engineers[:20], status="done")
+                .annotate(row=Window(RowNumber(), partition_by=F("engineer_id"), order_by=F("id").asc()))
+                .filter(row__lte=25)
+                .values_list("engineer_id", "description")
+            ),
+            "последние финальные решения": (
+                SupportTicket.objects
+                .filter(final_resolution__gt="")
+                .order_by("-created_at")
+                .values_list("final_resolution", flat=True)[:30]
+            ),
+            "агрегаты за день": (
+                SupportTicket.objects
+                .order_by()
+                .filter(created_at__gte=day_start, created_at__lt=day_end)
+                .annotate(day=TruncDate("created_at", tzinfo=ROLLUP_TZ))
+                .values("day", "status")
+                .annotate(total=Count("id"), priority=Sum("priority_score"))
+            ),
+        }
+
+    def _measure(self, queries: dict, repeat: int, title: str) -> dict:
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        self.stdout.write(self.style.NOTICE(f"\n=== {title} ==="))
+        medians = {}
+        for name, queryset in queries.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            medians[name] = statistics.median(timings)
+
+            self.stdout.write(f"\n{name}: {medians[name]:.2f} мс")
+            for line in self._explain(queryset):
+                self.stdout.write(f"    {line}")
+        return medians
+
+    @staticmethod
+    def _explain(queryset) -> list[str]:
+        """
+        План запроса. Не QuerySet.explain(): для фильтра по оконной
+        функции Django ставит EXPLAIN перед внешним подзапросом неверно.
+        """
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            return [" ".join(str(column) for column in row) for row in cursor.fetchall()]
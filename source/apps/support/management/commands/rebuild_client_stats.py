@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from apps.support.models import Client
+from cross.client_stats import refresh_client_stats
+
+
+class Command(BaseCommand):
+    help = "Полный пересчёт таблицы ClientStats по всем клиентам"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        self.stdout.write(self.style.NOTICE("\n=== Пересчёт статистики клиентов ===\n"))
+
+        client_ids = Client.objects.order_by("id").values_list("id", flat=True)
+        batch = []
+        total = 0
+
+        for client_id in client_ids.iterator(chunk_size=batch_size):
+            batch.append(client_id)
+            if len(batch) >= batch_size:
+                total += refresh_client_stats(batch)
+                batch = []
+
+        if batch:
+            total += refresh_client_stats(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"\nГотово! Обновлено строк: {total}\n"))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from cross.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Полная пересборка дневных агрегатов дешборда (DashboardRollup)"
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("\n=== Пересборка агрегатов дешборда ===\n"))
+
+        started = time.perf_counter()
+        result = rebuild_rollups()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"Строк по заявкам:  {result['tickets']}")
+        self.stdout.write(f"Строк по услугам:  {result['services']}")
+        self.stdout.write(f"Время:             {elapsed:.2f} с")
+        self.stdout.write(self.style.SUCCESS("\nГотово!\n"))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from cross.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Полная перестройка полнотекстового индекса заявок (после массовых вставок)"
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE(f"\n=== Перестройка поискового индекса ({connection.vendor}) ===\n"))
+
+        started = time.perf_counter()
+        total = rebuild_index()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"Заявок в индексе:  {total}")
+        self.stdout.write(f"Время:             {elapsed:.2f} с")
+        self.stdout.write(self.style.SUCCESS("\nГотово!\n"))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from cross.priority_bulk import WRITE_BATCH_SIZE, recompute_open_priorities
+
+
+class Command(BaseCommand):
+    help = "Массовый пересчёт priority_score открытых заявок (после смены цен или весов)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Только посчитать, не записывать")
+        parser.add_argument("--batch-size", type=int, default=WRITE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("\n=== Пересчёт приоритетов открытых заявок ===\n"))
+
+        result = recompute_open_priorities(
+            dry_run=options["dry_run"],
+            batch_size=options["batch_size"],
+        )
+
+        self.stdout.write(f"Политика:    {result['policy']}")
+        self.stdout.write(f"Заявок:      {result['tickets']}")
+        self.stdout.write(f"Изменилось:  {result['changed']}")
+        for stage, seconds in result["timings"].items():
+            self.stdout.write(f"  {stage:<14} {seconds:.3f} с")
+
+        suffix = " (dry-run, ничего не записано)" if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(f"\nГотово!{suffix}\n"))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 22:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0006_supportticket_why_engineer_needed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='supportticket',
+            name='version',
+            field=models.PositiveIntegerField(default=1, help_text='Увеличивается при каждом изменении (оптимистичная блокировка).', verbose_name='Версия'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 22:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0007_supportticket_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientStats',
+            fields=[
+                ('client', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='support.client', verbose_name='Клиент')),
+                ('total_spend', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Сумма услуг')),
+                ('services_count', models.PositiveIntegerField(default=0, verbose_name='Кол-во услуг')),
+                ('service_type_counts', models.JSONField(blank=True, default=dict, verbose_name='Кол-во услуг по типам')),
+                ('type_multiplier', models.FloatField(default=1.0, verbose_name='Множитель типов услуг')),
+                ('type_points', models.PositiveIntegerField(default=0, verbose_name='Баллы типов услуг')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'Статистика клиента',
+                'verbose_name_plural': 'Статистика клиентов',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 22:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0008_clientstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='supportticket',
+            name='initial_priority',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Оценка AI до учёта данных клиента. Нужна для пересчёта priority_score.', null=True, verbose_name='Начальный приоритет (AI)'),
+        ),
+    ]
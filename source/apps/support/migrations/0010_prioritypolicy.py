@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-18 22:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0009_supportticket_initial_priority'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriorityPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+                ('kind', models.CharField(choices=[('percentile', 'Перцентиль расходов + веса типов услуг'), ('log_price', 'Логарифм кол-ва услуг + сумма услуг')], default='percentile', max_length=20, verbose_name='Формула')),
+                ('config', models.JSONField(blank=True, default=dict, help_text='Незаданные параметры берутся из значений по умолчанию для формулы.', verbose_name='Веса и параметры')),
+                ('version', models.PositiveIntegerField(default=1, help_text='Увеличивается при каждом изменении. Скомпилированная политика кешируется по версии.', verbose_name='Версия')),
+                ('is_active', models.BooleanField(default=False, verbose_name='Активна?')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'Политика приоритизации',
+                'verbose_name_plural': 'Политики приоритизации',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-18 22:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0010_prioritypolicy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('metric', models.CharField(choices=[('status', 'Заявки по статусам'), ('engineer', 'Заявки по инженерам'), ('priority', 'Сумма приоритетов'), ('service', 'Подключения услуг')], max_length=20, verbose_name='Метрика')),
+                ('key', models.CharField(max_length=50, verbose_name='Ключ')),
+                ('value', models.BigIntegerField(default=0, verbose_name='Значение')),
+            ],
+            options={
+                'verbose_name': 'Агрегат дешборда',
+                'verbose_name_plural': 'Агрегаты дешборда',
+                'indexes': [models.Index(fields=['metric', 'day'], name='dashboard_rollup_metric_day')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'metric', 'key'), name='dashboard_rollup_unique')],
+            },
+        ),
+    ]
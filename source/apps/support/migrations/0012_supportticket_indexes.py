@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0011_dashboardrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='supportticket',
+            index=models.Index(condition=models.Q(('status', 'done'), _negated=True), fields=['-priority_score', 'created_at', 'id'], name='ticket_feed_active'),
+        ),
+        migrations.AddIndex(
+            model_name='supportticket',
+            index=models.Index(condition=models.Q(('status', 'done')), fields=['-priority_score', 'created_at', 'id'], name='ticket_feed_done'),
+        ),
+        migrations.AddIndex(
+            model_name='supportticket',
+            index=models.Index(fields=['engineer', 'status'], name='ticket_engineer_status'),
+        ),
+        migrations.AddIndex(
+            model_name='supportticket',
+            index=models.Index(fields=['created_at'], name='ticket_created_at'),
+        ),
+        migrations.AddIndex(
+            model_name='supportticket',
+            index=models.Index(condition=models.Q(('final_resolution__gt', '')), fields=['-created_at'], name='ticket_resolved_recent'),
+        ),
+    ]
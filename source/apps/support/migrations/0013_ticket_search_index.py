@@ -0,0 +1,98 @@
+import re
+
+from django.db import migrations
+
+
+SQLITE_TABLE = "support_ticket_fts"
+POSTGRES_TABLE = "support_ticket_search"
+BATCH_SIZE = 2000
+
+# Нормализация на момент создания индекса. Скопирована из cross.search,
+# а не импортирована: историческая миграция не должна меняться вместе
+# с живым кодом.
+_FOLD = str.maketrans({
+    "ё": "е", "й": "и",
+    "ә": "а", "ғ": "г", "қ": "к", "ң": "н", "ө": "о",
+    "ұ": "у", "ү": "у", "һ": "х", "і": "и",
+})
+
+_TOKEN_RE = re.compile(r"[0-9a-zа-я]+")
+
+
+def _normalize(text):
+    if not text:
+        return ""
+    return " ".join(_TOKEN_RE.findall(text.lower().translate(_FOLD)))
+
+
+def _write_documents(cursor, vendor, rows):
+    documents = [
+        (ticket_id, _normalize(description), _normalize(resolution))
+        for ticket_id, description, resolution in rows
+    ]
+    if not documents:
+        return
+    if vendor == "sqlite":
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {SQLITE_TABLE} (rowid, description, resolution) VALUES (%s, %s, %s)",
+            documents,
+        )
+    else:
+        cursor.executemany(
+            f"INSERT INTO {POSTGRES_TABLE} (ticket_id, document) "
+            f"VALUES (%s, setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B')) "
+            f"ON CONFLICT (ticket_id) DO UPDATE SET document = EXCLUDED.document",
+            documents,
+        )
+
+
+def create_search_index(apps, schema_editor):
+    """
+    FTS5 на SQLite, tsvector + GIN на PostgreSQL; другие СУБД — без индекса
+    (cross.search откатывается на подстрочный поиск).
+    """
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {SQLITE_TABLE} USING fts5(description, resolution, tokenize='unicode61')"
+        )
+    elif connection.vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE TABLE {POSTGRES_TABLE} ("
+            f"ticket_id bigint PRIMARY KEY REFERENCES support_supportticket (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            f"document tsvector NOT NULL)"
+        )
+        schema_editor.execute(f"CREATE INDEX {POSTGRES_TABLE}_document ON {POSTGRES_TABLE} USING GIN (document)")
+    else:
+        return
+
+    SupportTicket = apps.get_model("support", "SupportTicket")
+    rows = SupportTicket.objects.order_by("id").values_list("id", "description", "final_resolution")
+
+    batch = []
+    with connection.cursor() as cursor:
+        for row in rows.iterator(chunk_size=BATCH_SIZE):
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                _write_documents(cursor, connection.vendor, batch)
+                batch = []
+        _write_documents(cursor, connection.vendor, batch)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SQLITE_TABLE}")
+    elif connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {POSTGRES_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("support", "0012_supportticket_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,88 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+# Веса типов услуг на момент появления ClientStats (0008). Скопированы,
+# а не импортированы из cross: историческая миграция не должна меняться
+# вместе с живым кодом.
+SERVICE_TYPE_WEIGHTS = {
+    "networks":       {"mult": 1.10, "points": 5},
+    "it_services":    {"mult": 1.08, "points": 3},
+    "external_calls": {"mult": 1.04, "points": 2},
+    "local_phone":    {"mult": 1.00, "points": 1},
+    "ip_tv":          {"mult": 1.02, "points": 1},
+}
+
+BATCH_SIZE = 1000
+
+
+def _summarize(type_rows) -> dict:
+    total_spend = 0
+    services_count = 0
+    type_counts = {}
+
+    for service_type, count, spend in type_rows:
+        total_spend += spend or 0
+        services_count += count
+        type_counts[service_type] = type_counts.get(service_type, 0) + count
+
+    type_multiplier = 1.0
+    type_points = 0
+    for service_type, count in sorted(type_counts.items()):
+        weights = SERVICE_TYPE_WEIGHTS.get(service_type)
+        if weights:
+            type_multiplier *= weights["mult"] ** count
+            type_points += weights["points"] * count
+
+    return {
+        "total_spend": total_spend,
+        "services_count": services_count,
+        "service_type_counts": type_counts,
+        "type_multiplier": type_multiplier,
+        "type_points": type_points,
+    }
+
+
+def backfill_client_stats(apps, schema_editor):
+    """
+    Заполняет ClientStats для существующих клиентов: без этого после деплоя
+    у всех клиентов 0 услуг до ручного rebuild_client_stats.
+    Один GROUP BY по всем услугам и upsert пачками.
+    """
+    Client = apps.get_model("support", "Client")
+    ClientService = apps.get_model("support", "ClientService")
+    ClientStats = apps.get_model("support", "ClientStats")
+
+    rows_by_client = {client_id: [] for client_id in Client.objects.values_list("id", flat=True).iterator()}
+
+    type_rows = (
+        ClientService.objects
+        .values_list("client_id", "service__service_type")
+        .annotate(count=Count("id"), spend=Sum("service__price"))
+        .order_by()
+    )
+    for client_id, service_type, count, spend in type_rows.iterator():
+        rows_by_client[client_id].append((service_type, count, spend))
+
+    stats = [
+        ClientStats(client_id=client_id, **_summarize(rows))
+        for client_id, rows in rows_by_client.items()
+    ]
+    ClientStats.objects.bulk_create(
+        stats,
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["client"],
+        update_fields=["total_spend", "services_count", "service_type_counts", "type_multiplier", "type_points"],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0013_ticket_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_client_stats, migrations.RunPython.noop),
+    ]
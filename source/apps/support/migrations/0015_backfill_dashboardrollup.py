@@ -0,0 +1,72 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+BATCH_SIZE = 1000
+
+
+def _ticket_rollups(SupportTicket, DashboardRollup, tz):
+    tickets = SupportTicket.objects.order_by().annotate(day=TruncDate("created_at", tzinfo=tz))
+
+    priority_by_day = {}
+    for row in tickets.values("day", "status").annotate(total=Count("id"), priority=Sum("priority_score")).iterator():
+        yield DashboardRollup(day=row["day"], metric="status", key=row["status"], value=row["total"])
+        priority_by_day[row["day"]] = priority_by_day.get(row["day"], 0) + (row["priority"] or 0)
+
+    for day, value in priority_by_day.items():
+        yield DashboardRollup(day=day, metric="priority", key="sum", value=value)
+
+    engineer_rows = (
+        tickets
+        .filter(engineer__isnull=False)
+        .values("day", "engineer_id")
+        .annotate(total=Count("id"))
+    )
+    for row in engineer_rows.iterator():
+        yield DashboardRollup(day=row["day"], metric="engineer", key=str(row["engineer_id"]), value=row["total"])
+
+
+def _service_rollups(ClientService, DashboardRollup, tz):
+    rows = (
+        ClientService.objects
+        .order_by()
+        .annotate(day=TruncDate("created_at", tzinfo=tz))
+        .values("day", "service_id")
+        .annotate(total=Count("id"))
+    )
+    for row in rows.iterator():
+        yield DashboardRollup(day=row["day"], metric="service", key=str(row["service_id"]), value=row["total"])
+
+
+def backfill_dashboard_rollups(apps, schema_editor):
+    """
+    Заполняет DashboardRollup по существующим заявкам и услугам клиентов:
+    без этого после деплоя графики дешборда пусты до ручного
+    rebuild_dashboard_rollups. Расчёт как в cross/rollups.py на момент
+    0011 (дни TIME_ZONE), скопирован: историческая миграция не должна
+    меняться вместе с живым кодом.
+    """
+    ClientService = apps.get_model("support", "ClientService")
+    DashboardRollup = apps.get_model("support", "DashboardRollup")
+    SupportTicket = apps.get_model("support", "SupportTicket")
+    tz = timezone.get_default_timezone()
+
+    DashboardRollup.objects.all().delete()
+    rollups = [
+        *_ticket_rollups(SupportTicket, DashboardRollup, tz),
+        *_service_rollups(ClientService, DashboardRollup, tz),
+    ]
+    DashboardRollup.objects.bulk_create(rollups, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0014_backfill_clientstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_dashboard_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-19 00:44
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0015_backfill_dashboardrollup'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='clientstats',
+            name='type_multiplier',
+        ),
+        migrations.RemoveField(
+            model_name='clientstats',
+            name='type_points',
+        ),
+    ]
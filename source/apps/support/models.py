@@ -1,4 +1,6 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 
 
@@ -147,6 +149,56 @@ class ClientService(models.Model):
             super().save(update_fields=["service_number"])
 
 
+# ============================================================
+# Модель Статистика клиента (материализованные агрегаты)
+# ============================================================
+
+class ClientStats(models.Model):
+    """
+    Предрасчитанные агрегаты по услугам клиента для скоринга.
+    Обновляется сигналами при изменении ClientService / Service.price,
+    полностью пересчитывается командой rebuild_client_stats.
+    """
+
+    client = models.OneToOneField(
+        Client,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name="Клиент"
+    )
+
+    total_spend = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name="Сумма услуг"
+    )
+
+    services_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Кол-во услуг"
+    )
+
+    service_type_counts = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Кол-во услуг по типам"
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Обновлено"
+    )
+
+    class Meta:
+        verbose_name = "Статистика клиента"
+        verbose_name_plural = "Статистика клиентов"
+
+    def __str__(self):
+        return f"Статистика клиента {self.client_id}"
+
+
 # ============================================================
 # Модель Инженер
 # ============================================================
@@ -211,6 +263,13 @@ class SupportTicket(models.Model):
         verbose_name="Приоритет заявки"
     )
 
+    initial_priority = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Начальный приоритет (AI)",
+        help_text="Оценка AI до учёта данных клиента. Нужна для пересчёта priority_score."
+    )
+
     engineer_visit_probability = models.PositiveSmallIntegerField(
         default=0,
         verbose_name="Вероятность вызова инженера (0–100)",
@@ -273,17 +332,187 @@ class SupportTicket(models.Model):
         verbose_name="ID заявки"
     )
 
+    version = models.PositiveIntegerField(
+        default=1,
+        verbose_name="Версия",
+        help_text="Увеличивается при каждом изменении (оптимистичная блокировка)."
+    )
+
     class Meta:
         verbose_name = "Заявка"
         verbose_name_plural = "Заявки"
+        indexes = [
+            # Ленты дешборда (keyset по -priority_score, created_at, id)
+            models.Index(
+                fields=["-priority_score", "created_at", "id"],
+                name="ticket_feed_active",
+                condition=~Q(status="done"),
+            ),
+            models.Index(
+                fields=["-priority_score", "created_at", "id"],
+                name="ticket_feed_done",
+                condition=Q(status="done"),
+            ),
+            # Загрузка и история инженера, очередь (engineer_id IS NULL / = ?)
+            models.Index(fields=["engineer", "status"], name="ticket_engineer_status"),
+            # Диапазоны по дате создания (агрегаты дешборда, история для ИИ)
+            models.Index(fields=["created_at"], name="ticket_created_at"),
+            # История финальных решений (промпты ИИ, похожие решения в боте)
+            models.Index(
+                fields=["-created_at"],
+                name="ticket_resolved_recent",
+                condition=Q(final_resolution__gt=""),
+            ),
+        ]
 
     def __str__(self):
         return f"Заявка {self.ticket_code or self.id}"
 
     def save(self, *args, **kwargs):
         is_new = self.pk is None
+
+        # Любая запись существующей заявки меняет версию,
+        # чтобы параллельные compare-and-swap переходы увидели конфликт
+        if not is_new:
+            self.version += 1
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "version" not in update_fields:
+                kwargs["update_fields"] = [*update_fields, "version"]
+
         super().save(*args, **kwargs)
 
         if is_new:
             self.ticket_code = f"{self.id:06d}"
             super().save(update_fields=["ticket_code"])
+
+
+# ============================================================
+# Модель Политика приоритизации (версионируемая конфигурация)
+# ============================================================
+
+class PriorityPolicy(models.Model):
+
+    KINDS = [
+        ("percentile", "Перцентиль расходов + веса типов услуг"),
+        ("log_price", "Логарифм кол-ва услуг + сумма услуг"),
+    ]
+
+    name = models.CharField(
+        max_length=100,
+        verbose_name="Название"
+    )
+
+    kind = models.CharField(
+        max_length=20,
+        choices=KINDS,
+        default="percentile",
+        verbose_name="Формула"
+    )
+
+    config = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Веса и параметры",
+        help_text="Незаданные параметры берутся из значений по умолчанию для формулы."
+    )
+
+    version = models.PositiveIntegerField(
+        default=1,
+        verbose_name="Версия",
+        help_text="Увеличивается при каждом изменении. Скомпилированная политика кешируется по версии."
+    )
+
+    is_active = models.BooleanField(
+        default=False,
+        verbose_name="Активна?"
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Обновлено"
+    )
+
+    class Meta:
+        verbose_name = "Политика приоритизации"
+        verbose_name_plural = "Политики приоритизации"
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+    def clean(self):
+        # cross.priority_policy импортирует модели — импорт локальный
+        from cross.priority_policy import validate_policy_config
+
+        try:
+            validate_policy_config(self.kind, self.config)
+        except ValueError as e:
+            raise ValidationError({"config": str(e)})
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            self.version += 1
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "version" not in update_fields:
+                kwargs["update_fields"] = [*update_fields, "version"]
+
+        super().save(*args, **kwargs)
+
+        # Активной может быть только одна политика
+        if self.is_active:
+            PriorityPolicy.objects.exclude(pk=self.pk).filter(is_active=True).update(is_active=False)
+
+
+# ============================================================
+# Модель Дневные агрегаты для графиков дешборда
+# ============================================================
+
+class DashboardRollup(models.Model):
+    """
+    Дневные счётчики (дни по TIME_ZONE, Asia/Almaty):
+    - status   → заявки, созданные в этот день, по текущему статусу
+    - engineer → заявки дня по назначенному инженеру (key = id)
+    - priority → сумма priority_score заявок дня (key = "sum")
+    - service  → подключения услуг в этот день (key = id услуги)
+
+    Поддерживается инкрементально (cross/rollups.py).
+    """
+
+    METRICS = [
+        ("status", "Заявки по статусам"),
+        ("engineer", "Заявки по инженерам"),
+        ("priority", "Сумма приоритетов"),
+        ("service", "Подключения услуг"),
+    ]
+
+    day = models.DateField(
+        verbose_name="День"
+    )
+
+    metric = models.CharField(
+        max_length=20,
+        choices=METRICS,
+        verbose_name="Метрика"
+    )
+
+    key = models.CharField(
+        max_length=50,
+        verbose_name="Ключ"
+    )
+
+    value = models.BigIntegerField(
+        default=0,
+        verbose_name="Значение"
+    )
+
+    class Meta:
+        verbose_name = "Агрегат дешборда"
+        verbose_name_plural = "Агрегаты дешборда"
+        constraints = [
+            models.UniqueConstraint(fields=["day", "metric", "key"], name="dashboard_rollup_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["metric", "day"], name="dashboard_rollup_metric_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.metric}:{self.key} = {self.value}"
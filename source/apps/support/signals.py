@@ -0,0 +1,149 @@
+"""
+Сигналы приложения support.
+
+ClientStats и DashboardRollup поддерживаются инкрементально:
+пересчитываются только затронутые клиенты / дни и только после
+коммита транзакции. Кеш секций дешборда инвалидируется по темам
+после обновления агрегатов и при изменении справочников.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from cross.client_stats import clients_using_service, schedule_client_stats_refresh
+from cross.dashboard import invalidate_topic
+from cross.live_events import publish_ticket_event
+from cross.priority_policy import invalidate_active_policy
+from cross.rollups import (
+    SERVICE_METRICS,
+    TICKET_METRICS,
+    rollups_changed,
+    schedule_service_rollup_refresh,
+    schedule_ticket_rollup_refresh,
+)
+from cross.search import schedule_ticket_index, schedule_ticket_unindex
+
+from .models import Client, ClientService, DashboardRollup, Engineer, PriorityPolicy, Service, SupportTicket
+
+
+# ============================================================
+# Услуги клиента: добавление / изменение / удаление
+# ============================================================
+@receiver(pre_save, sender=ClientService)
+def remember_previous_client(sender, instance, **kwargs):
+    instance._previous_client_id = None
+    if instance.pk is not None:
+        instance._previous_client_id = (
+            ClientService.objects
+            .filter(pk=instance.pk)
+            .values_list("client_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=ClientService)
+def client_service_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Вторая запись в save() только проставляет service_number
+    if update_fields is not None and set(update_fields) == {"service_number"}:
+        return
+    schedule_client_stats_refresh({instance.client_id, getattr(instance, "_previous_client_id", None)})
+    schedule_service_rollup_refresh(instance)
+
+
+@receiver(post_delete, sender=ClientService)
+def client_service_deleted(sender, instance, **kwargs):
+    schedule_client_stats_refresh({instance.client_id})
+    schedule_service_rollup_refresh(instance)
+
+
+# ============================================================
+# Услуга: изменение цены или типа
+# ============================================================
+@receiver(pre_save, sender=Service)
+def remember_previous_pricing(sender, instance, **kwargs):
+    instance._previous_pricing = None
+    if instance.pk is not None:
+        instance._previous_pricing = (
+            Service.objects
+            .filter(pk=instance.pk)
+            .values_list("price", "service_type")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Service)
+def service_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_pricing", None)
+    if created or previous is None:
+        return
+    if previous == (instance.price, instance.service_type):
+        return
+    schedule_client_stats_refresh(clients_using_service(instance.pk))
+
+
+# ============================================================
+# Новый клиент: пустая строка статистики
+# ============================================================
+@receiver(post_save, sender=Client)
+def client_created(sender, instance, created, **kwargs):
+    if created:
+        schedule_client_stats_refresh({instance.pk})
+
+
+# ============================================================
+# Заявка: агрегаты дешборда, поисковый индекс, живые события
+# ============================================================
+@receiver(post_save, sender=SupportTicket)
+def ticket_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Вторая запись в save() только проставляет ticket_code
+    if update_fields is not None and set(update_fields) == {"ticket_code"}:
+        return
+    schedule_ticket_rollup_refresh(instance)
+    schedule_ticket_index(instance, update_fields)
+    publish_ticket_event(instance, "created" if created else "updated")
+
+
+@receiver(post_delete, sender=SupportTicket)
+def ticket_deleted(sender, instance, **kwargs):
+    schedule_ticket_rollup_refresh(instance)
+    schedule_ticket_unindex(instance)
+    publish_ticket_event(instance, "deleted")
+
+
+# ============================================================
+# Кеш секций дешборда
+# ============================================================
+@receiver(rollups_changed, sender=DashboardRollup)
+def dashboard_rollups_changed(sender, metrics, **kwargs):
+    if set(metrics) & set(TICKET_METRICS):
+        invalidate_topic("tickets")
+    if set(metrics) & set(SERVICE_METRICS):
+        invalidate_topic("client_services")
+
+
+DASHBOARD_TOPICS = {
+    Engineer: "engineers",
+    Service: "services",
+    Client: "clients",
+}
+
+
+@receiver(post_save, sender=Engineer)
+@receiver(post_delete, sender=Engineer)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def dashboard_reference_changed(sender, **kwargs):
+    topic = DASHBOARD_TOPICS[sender]
+    transaction.on_commit(lambda: invalidate_topic(topic))
+
+
+# ============================================================
+# Политика приоритизации: горячая перезагрузка
+# ============================================================
+@receiver(post_save, sender=PriorityPolicy)
+@receiver(post_delete, sender=PriorityPolicy)
+def priority_policy_changed(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_active_policy)
@@ -0,0 +1,292 @@
+import random
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.urls import resolve
+
+from apps.support.models import Client, ClientService, ClientStats, Engineer, Service, SupportTicket
+from apps.translation._core import registrar
+from apps.translation.models import Translation
+from cross import client_stats
+from cross.client_stats import refresh_client_stats
+from cross.openai_use_case import OpenAIUseCase
+from cross.query_budget import record_queries, view_budget
+from cross.rollups import rebuild_rollups
+from cross.search import SEARCH_LIMIT, rebuild_index
+
+
+LANGUAGE = "ru"
+# SetRealIPMiddleware отклоняет loopback при DEBUG=False (как в тестах)
+REMOTE_ADDR = "203.0.113.10"
+
+# Ответы вместо сети: считаются запросы, из которых строятся промпты
+AI_RESPONSES = {
+    "TelecomCheckSchema": {"is_telecom": True},
+    "FullAISchema": {
+        "client_advice": "Перезагрузите ONU.",
+        "engineer_advice": "Проверить затухание на порту.",
+        "engineer_probability": 40,
+        "engineer_probability_explanation": "Возможна проблема на линии.",
+        "initial_priority": 60,
+    },
+    "EngineerPickSchema": {"engineer_id": 1, "engineer_name": "", "reason": "check", "confidence": 90},
+}
+
+# Бюджеты страниц Django admin (представления админки не размечены @budgeted)
+ADMIN_BUDGETS = {
+    "/ru/dj-admin/support/client/": 10,
+    "/ru/dj-admin/support/clientservice/": 10,
+    "/ru/dj-admin/support/clientstats/": 10,
+    "/ru/dj-admin/support/engineer/": 10,
+    "/ru/dj-admin/support/supportticket/": 10,
+    "/ru/dj-admin/support/supportticket/?q=соединения": 11,
+    "/ru/dj-admin/support/client/{client}/change/": 12,
+    "/ru/dj-admin/support/supportticket/{ticket}/change/": 10,
+}
+
+
+def _fake_request(system_prompt, user_text, schema, model=None):
+    response = dict(AI_RESPONSES[schema.__name__])
+    if schema.__name__ == "EngineerPickSchema":
+        response["engineer_id"] = Engineer.objects.order_by("id").values_list("id", flat=True).first()
+    return response
+
+
+def _translation_writes(stats) -> int:
+    table = Translation._meta.db_table
+    return sum(
+        n for sql, n in stats.statements.items()
+        if table in sql and sql.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE"))
+    )
+
+
+class QueryBudgetTests(TransactionTestCase):
+    """
+    Регрессия числа SQL-запросов горячих страниц.
+
+    Каждая страница запрашивается трижды: прогрев (переводы строк шаблона
+    и т.п. создаются один раз), холодный путь (кеши пусты) и тёплый (тот же
+    запрос сразу после). Холодный укладывается в бюджет @budgeted, тёплый —
+    в его warm; рендер не пишет в таблицу переводов.
+
+    TransactionTestCase: представления работают в autocommit, как в бою —
+    on_commit-обработчики входят в замер, а рабочие потоки дешборда видят
+    данные теста.
+    """
+
+    CLIENTS = 100
+    ENGINEERS = 10
+    TICKETS = 600
+
+    def setUp(self):
+        # Ключи переводов пишутся в потоке теста, а не фоновым потоком
+        # регистратора: на общей in-memory SQLite его запись параллельно
+        # с представлением даёт «database table is locked»
+        for patcher in (
+            mock.patch.object(registrar, "_start_flusher"),
+            mock.patch.object(OpenAIUseCase, "_request", staticmethod(_fake_request)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self._seed()
+        self.client = self.client_class(REMOTE_ADDR=REMOTE_ADDR)
+        self.client.force_login(
+            get_user_model().objects.create_superuser(email="budget@example.com", password="budget", full_name="Budget")
+        )
+        self.ticket = SupportTicket.objects.exclude(status="done").order_by("id").first()
+        self.customer = Client.objects.order_by("id").first()
+        self.engineer = Engineer.objects.order_by("id").first()
+
+    def _seed(self):
+        rng = random.Random(42)
+
+        services = Service.objects.bulk_create([
+            Service(title=f"Услуга {i}", service_type=service_type, price=Decimal(rng.randint(1000, 20000)))
+            for i, (service_type, _) in enumerate(Service.SERVICE_TYPES * 4)
+        ])
+        clients = Client.objects.bulk_create([
+            Client(
+                full_name=f"Клиент {i}",
+                account_number=str(100000 + i),
+                phone_number="+77000000000",
+                email=f"client{i}@example.com",
+                service_address="Алматы",
+                age=rng.randint(18, 80),
+                is_company=rng.random() < 0.2,
+            )
+            for i in range(self.CLIENTS)
+        ])
+        ClientService.objects.bulk_create([
+            ClientService(client=client, service=service, service_number=f"SL-CHECK-{client.id:06d}-{j}")
+            for client in clients
+            for j, service in enumerate(rng.sample(services, rng.randint(1, 4)))
+        ])
+        engineers = Engineer.objects.bulk_create([
+            Engineer(full_name=f"Инженер {i}") for i in range(self.ENGINEERS)
+        ])
+
+        tickets = []
+        for i in range(self.TICKETS):
+            status = rng.choice(["new", "in_progress", "done"])
+            tickets.append(SupportTicket(
+                client=rng.choice(clients),
+                engineer=rng.choice(engineers) if status != "new" else None,
+                description=f"Проблема {i}: " + "нет соединения " * 20,
+                priority_score=rng.randint(0, 100),
+                initial_priority=rng.randint(0, 100),
+                engineer_visit_probability=rng.randint(0, 100),
+                why_engineer_needed="Высокое затухание на линии. " * 10,
+                proposed_solution_engineer="Проверить порт. " * 15,
+                proposed_solution_client="Перезагрузите ONU. " * 15,
+                final_resolution="Заменён коннектор. " * 10 if status == "done" else None,
+                status=status,
+                ticket_code=f"{i + 1:06d}",
+            ))
+        SupportTicket.objects.bulk_create(tickets)
+
+        refresh_client_stats(client.id for client in clients)
+        rebuild_rollups()
+        rebuild_index()
+
+    # ------------------------------------------------------------
+    # Замер
+    # ------------------------------------------------------------
+    def _send(self, method, path, data):
+        send = self.client.post if method == "POST" else self.client.get
+        response = send(path, data)
+        self.assertLess(response.status_code, 400, f"{method} {path}")
+        return response
+
+    def assertWithinBudget(self, method, path, data=None, budget=None):
+        """budget=None → бюджет представления (@budgeted)."""
+        if budget is None:
+            view = resolve(path.removeprefix(f"/{LANGUAGE}").split("?")[0]).func
+            budget = view_budget(view, method, settings.QUERY_BUDGET_DEFAULT)
+            warm_budget = view_budget(view, method, settings.QUERY_BUDGET_DEFAULT, warm=True)
+        else:
+            warm_budget = budget
+
+        self._send(method, path, data)
+        registrar.flush()
+        cache.clear()
+
+        with record_queries(path) as cold:
+            self._send(method, path, data)
+        with record_queries(path) as warm:
+            self._send(method, path, data)
+
+        for label, stats, limit in (("холодный", cold, budget), ("тёплый", warm, warm_budget)):
+            duplicates = "\n".join(f"{n}× {sql[:160]}" for sql, n in stats.duplicates())
+            self.assertLessEqual(stats.count, limit, f"{method} {path}, {label} путь\n{duplicates}")
+            # Рендер на любом языке не пишет в таблицу переводов (ключи регистрирует фон)
+            self.assertEqual(_translation_writes(stats), 0, f"{method} {path}, {label} путь")
+
+    # ------------------------------------------------------------
+    # Страницы
+    # ------------------------------------------------------------
+    def test_dashboard(self):
+        for path in (
+            "/ru/admin/dashboard/",
+            "/ru/admin/dashboard/sections/reference/",
+            "/ru/admin/dashboard/tickets/active/",
+            f"/ru/admin/dashboard/tickets/card/{self.ticket.id}/",
+            "/ru/admin/dashboard/search/?q=нет+соединения",
+        ):
+            with self.subTest(path=path):
+                self.assertWithinBudget("GET", path)
+
+    def test_ticket_actions(self):
+        self.assertWithinBudget("GET", f"/ru/admin/auto-engineer/{self.ticket.id}/")
+        self.assertWithinBudget("POST", f"/ru/admin/queue/claim/{self.engineer.id}/", {})
+
+    def test_support_pages(self):
+        self.assertWithinBudget("GET", "/ru/support/")
+        self.assertWithinBudget("POST", "/ru/support/", {
+            "full_name": self.customer.full_name,
+            "account_number": self.customer.account_number,
+            "description": "Пропадает интернет по вечерам",
+        })
+        self.assertWithinBudget("POST", "/ru/support/check/", {"ticket_id": self.ticket.ticket_code})
+
+    def test_django_admin(self):
+        for path, budget in ADMIN_BUDGETS.items():
+            path = path.format(client=self.customer.id, ticket=self.ticket.id)
+            with self.subTest(path=path):
+                self.assertWithinBudget("GET", path, budget=budget)
+
+
+class SupportTicketAdminSearchTests(TestCase):
+    """Поиск в списке заявок Django admin."""
+
+    def setUp(self):
+        client = Client.objects.create(
+            full_name="Клиент",
+            account_number="100000",
+            phone_number="+77000000000",
+            email="client@example.com",
+            service_address="Алматы",
+            age=30,
+        )
+        SupportTicket.objects.bulk_create([
+            SupportTicket(
+                client=client,
+                description="Нет соединения с интернетом" if i % 2 else "Не работает IP-TV",
+                status="new",
+                ticket_code=f"{i + 1:06d}",
+            )
+            for i in range(2 * SEARCH_LIMIT + 100)
+        ])
+        rebuild_index()
+
+        self.client = self.client_class(REMOTE_ADDR=REMOTE_ADDR)
+        self.client.force_login(
+            get_user_model().objects.create_superuser(email="admin@example.com", password="admin", full_name="Admin")
+        )
+
+    def _result_count(self, query):
+        response = self.client.get("/ru/dj-admin/support/supportticket/", {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return response.context["cl"].result_count
+
+    def test_full_text_matches_are_not_capped(self):
+        self.assertEqual(self._result_count("соединения"), SEARCH_LIMIT + 50)
+
+    def test_partial_ticket_code(self):
+        # 000012 и 000120–000129
+        self.assertEqual(self._result_count("00012"), 11)
+
+
+class ClientStatsRefreshTests(TestCase):
+    """Пересчёт ClientStats при изменении цены услуги."""
+
+    def setUp(self):
+        self.service = Service.objects.create(title="Интернет", service_type="internet", price=Decimal(1000))
+        clients = Client.objects.bulk_create([
+            Client(
+                full_name=f"Клиент {i}",
+                account_number=str(100000 + i),
+                phone_number="+77000000000",
+                email=f"client{i}@example.com",
+                service_address="Алматы",
+                age=30,
+            )
+            for i in range(5)
+        ])
+        ClientService.objects.bulk_create([
+            ClientService(client=client, service=self.service, service_number=f"SL-{client.id:06d}")
+            for client in clients
+        ])
+        refresh_client_stats(client.id for client in clients)
+
+    def test_price_change_refreshes_clients_in_batches(self):
+        self.service.price = Decimal(2500)
+        with mock.patch.object(client_stats, "REFRESH_BATCH_SIZE", 2):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.service.save()
+
+        self.assertEqual(ClientStats.objects.filter(total_spend=Decimal(2500)).count(), 5)
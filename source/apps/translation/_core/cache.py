@@ -1,33 +1,368 @@
 """
-In-memory cache for translation values (thread-safe, TTL-based).
+Two-tier cache for translation values.
 
-Thread safety:
-- The cache is a plain Python dictionary.
-- All read/write operations are protected by threading.Lock to support
-  concurrent Django request handling.
+L1 — in-process cache (thread-safe, TTL-based):
+- Split into TRANSLATION_CACHE_STRIPES stripes, each with its own write
+  lock; reads take no lock at all, so threads rendering tag-heavy
+  templates do not queue behind each other (bench_translation_cache
+  compares it with a single global lock).
+- Each item expires after TRANSLATION_CACHE_TTL_SECONDS; expired entries
+  are reported as misses and removed by a periodic sweep.
+- Limited to TRANSLATION_CACHE_MAX_ENTRIES entries and roughly
+  TRANSLATION_CACHE_MAX_BYTES; not recently used entries are evicted
+  (CLOCK), so memory stays flat however long the worker runs.
+- cache_stats() returns hit / miss / eviction / size metrics.
 
-Time-to-live (TTL):
-- Each item is stored with an expiration time defined by TRANSLATION_CACHE_TTL_SECONDS.
-- Expired entries are lazily removed on access.
+L2 — shared tier (settings.TRANSLATION_SHARED_CACHE):
+- "none"  — no shared tier (default, single process);
+- "local" — in-memory stand-in with the same interface (tests, development);
+- "redis" — a Redis-protocol server shared by all workers; the redis package
+  is imported only in this mode.
+- Writes go to both tiers, so a translation produced by the background
+  worker in one process is visible to the others without a DB read.
+  A row saved through the model (admin edits) is written through after
+  commit, and its empty languages are deleted (signals.py).
+- L1 misses are looked up in L2 (batched with MGET for get_many_from_cache)
+  and promoted to L1.
+- L2 failures are logged and treated as misses.
 
 Usage:
-- Cache key: (source_text, lang_code)
-- Value: (translated_text, expires_at)
+- Cache key: (source_text, lang_code); in L2 the source text is hashed.
+- Value: translated text.
 
 Notes:
 - `source_text` is the unique base key in the DB.
 - Supports caching translations for all languages, including the default reference language.
 """
 
+import hashlib
+import logging
+import sys
 import threading
 import time
+from collections import OrderedDict
 
-from .conf import TRANSLATION_CACHE_TTL_SECONDS
+from django.conf import settings
 
-# (source_text, lang_code) → (translated_value, expires_at)
-_cache: dict[tuple[str, str], tuple[str, float]] = {}
-_cache_lock = threading.Lock()
+from .conf import (
+    TRANSLATION_CACHE_MAX_BYTES,
+    TRANSLATION_CACHE_MAX_ENTRIES,
+    TRANSLATION_CACHE_STRIPES,
+    TRANSLATION_CACHE_SWEEP_SECONDS,
+    TRANSLATION_CACHE_TTL_SECONDS,
+    TRANSLATION_SHARED_CACHE_TTL_SECONDS,
+)
 
+logger = logging.getLogger("data.translation.cache")
+
+SHARED_KEY_PREFIX = "translation:value"
+
+# ============================
+# L1: in-process striped LRU
+# ============================
+
+# Rough per-entry overhead: OrderedDict node, key tuple, entry list
+ENTRY_OVERHEAD_BYTES = 200
+
+# Entry layout: [value, expires_at, size, referenced]
+_VALUE, _EXPIRES, _SIZE, _REFERENCED = range(4)
+
+
+class CacheStripe:
+    """
+    One stripe of the L1 cache: an OrderedDict in insertion order with
+    CLOCK (second chance) eviction instead of strict LRU.
+
+    - Reads take no lock: a dict lookup plus setting the entry's
+      referenced flag, both atomic under the GIL. They never reorder the
+      dict, so there is nothing to protect.
+    - Writes, eviction and sweeps run under self.lock. Eviction looks at
+      the oldest entry: a referenced one gets a second chance (flag
+      cleared, moved to the end), an unreferenced one is evicted.
+    - Expired entries are not removed by readers, only reported as misses;
+      the sweep and eviction remove them.
+    - hits / misses are bumped without the lock and may undercount a
+      little under contention.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self._items: OrderedDict[tuple[str, str], list] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, cache_key: tuple[str, str], now: float) -> str | None:
+        entry = self._items.get(cache_key)
+        if entry is None or now > entry[_EXPIRES]:
+            self.misses += 1
+            return None
+        entry[_REFERENCED] = True
+        self.hits += 1
+        return entry[_VALUE]
+
+    def set(self, cache_key: tuple[str, str], value: str, ttl: float) -> None:
+        size = sys.getsizeof(cache_key[0]) + sys.getsizeof(value) + ENTRY_OVERHEAD_BYTES
+        with self.lock:
+            previous = self._items.pop(cache_key, None)
+            if previous is not None:
+                self.bytes -= previous[_SIZE]
+            if size > self.max_bytes:
+                return
+
+            self._items[cache_key] = [value, time.time() + ttl, size, False]
+            self.bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        now = time.time()
+        while len(self._items) > self.max_entries or self.bytes > self.max_bytes:
+            cache_key, entry = next(iter(self._items.items()))
+            if entry[_REFERENCED] and now <= entry[_EXPIRES]:
+                entry[_REFERENCED] = False
+                self._items.move_to_end(cache_key)
+                continue
+            del self._items[cache_key]
+            self.bytes -= entry[_SIZE]
+            self.evictions += 1
+
+    def delete(self, cache_key: tuple[str, str]) -> None:
+        with self.lock:
+            previous = self._items.pop(cache_key, None)
+            if previous is not None:
+                self.bytes -= previous[_SIZE]
+
+    def sweep(self, now: float) -> int:
+        with self.lock:
+            expired = [cache_key for cache_key, entry in self._items.items() if now > entry[_EXPIRES]]
+            for cache_key in expired:
+                self.bytes -= self._items.pop(cache_key)[_SIZE]
+            self.expirations += len(expired)
+        return len(expired)
+
+    def clear(self) -> None:
+        with self.lock:
+            self._items.clear()
+            self.bytes = 0
+
+
+class StripedCache:
+    """
+    L1 cache split into stripes by key hash, each with its own write lock,
+    bounded by entry count and by approximate size in bytes (limits are
+    divided evenly between stripes).
+
+    - Keys are interned: the same source text cached for several languages
+      (and held by templates / the DB layer) is one string object.
+    - Expired entries are swept at most once per sweep_interval seconds,
+      one stripe at a time, by whichever thread notices first.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, sweep_interval: float, stripes: int = 16):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._stripes = [
+            CacheStripe(max(1, max_entries // stripes), max(1, max_bytes // stripes))
+            for _ in range(stripes)
+        ]
+        self._last_sweep = time.monotonic()
+        self._sweep_lock = threading.Lock()
+
+    def _stripe(self, cache_key: tuple[str, str]) -> CacheStripe:
+        return self._stripes[hash(cache_key) % len(self._stripes)]
+
+    def get(self, key: str, lang_code: str, now: float) -> str | None:
+        cache_key = (key, lang_code)
+        return self._stripe(cache_key).get(cache_key, now)
+
+    def set(self, key: str, lang_code: str, value: str, ttl: float) -> None:
+        cache_key = (sys.intern(key), sys.intern(lang_code))
+        self._stripe(cache_key).set(cache_key, value, ttl)
+
+    def delete(self, key: str, lang_code: str) -> None:
+        cache_key = (key, lang_code)
+        self._stripe(cache_key).delete(cache_key)
+
+    def maybe_sweep(self) -> None:
+        if time.monotonic() - self._last_sweep < self.sweep_interval:
+            return
+        if not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_sweep = time.monotonic()
+            now = time.time()
+            expired = sum(stripe.sweep(now) for stripe in self._stripes)
+            logger.debug("Translation cache sweep | expired=%d | %s", expired, self.stats())
+        finally:
+            self._sweep_lock.release()
+
+    def clear(self) -> None:
+        for stripe in self._stripes:
+            stripe.clear()
+
+    def stats(self) -> dict:
+        hits = sum(stripe.hits for stripe in self._stripes)
+        misses = sum(stripe.misses for stripe in self._stripes)
+        lookups = hits + misses
+        return {
+            "entries": sum(len(stripe) for stripe in self._stripes),
+            "bytes": sum(stripe.bytes for stripe in self._stripes),
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 3) if lookups else None,
+            "evictions": sum(stripe.evictions for stripe in self._stripes),
+            "expirations": sum(stripe.expirations for stripe in self._stripes),
+        }
+
+
+_cache = StripedCache(
+    max_entries=TRANSLATION_CACHE_MAX_ENTRIES,
+    max_bytes=TRANSLATION_CACHE_MAX_BYTES,
+    sweep_interval=TRANSLATION_CACHE_SWEEP_SECONDS,
+    stripes=TRANSLATION_CACHE_STRIPES,
+)
+_shared_hits = 0
+_shared_hits_lock = threading.Lock()
+
+
+# ============================
+# L2: shared tiers
+# ============================
+
+def _shared_key(key: str, lang_code: str) -> str:
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return f"{SHARED_KEY_PREFIX}:{lang_code}:{digest}"
+
+
+class LocalSharedTier:
+    """In-memory stand-in for the shared tier: same interface, one process."""
+
+    def __init__(self):
+        self._items: dict[str, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: list[str]) -> dict[str, str]:
+        now = time.time()
+        found = {}
+        with self._lock:
+            for key in keys:
+                item = self._items.get(key)
+                if item and item[1] >= now:
+                    found[key] = item[0]
+        return found
+
+    def set_many(self, mapping: dict[str, str], ttl: int) -> None:
+        expires_at = time.time() + ttl
+        with self._lock:
+            for key, value in mapping.items():
+                self._items[key] = (value, expires_at)
+
+    def delete_many(self, keys: list[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._items.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+class RedisSharedTier:
+    """Shared tier on a Redis-protocol server (Redis, Valkey, KeyDB…)."""
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get_many(self, keys: list[str]) -> dict[str, str]:
+        values = self._client.mget(keys)
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, mapping: dict[str, str], ttl: int) -> None:
+        pipeline = self._client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipeline.set(key, value, ex=ttl)
+        pipeline.execute()
+
+    def delete_many(self, keys: list[str]) -> None:
+        if keys:
+            self._client.delete(*keys)
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(match=f"{SHARED_KEY_PREFIX}:*", count=1000))
+        for start in range(0, len(keys), 1000):
+            self._client.delete(*keys[start:start + 1000])
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_tier() -> LocalSharedTier | RedisSharedTier | None:
+    global _shared
+
+    backend = getattr(settings, "TRANSLATION_SHARED_CACHE", "none")
+    if backend == "none":
+        return None
+
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                if backend == "redis":
+                    _shared = RedisSharedTier(settings.TRANSLATION_SHARED_CACHE_URL)
+                else:
+                    _shared = LocalSharedTier()
+    return _shared
+
+
+def _shared_get_many(keys: list[str], lang_code: str) -> dict[str, str]:
+    shared = get_shared_tier()
+    if shared is None or not keys:
+        return {}
+
+    shared_keys = {_shared_key(key, lang_code): key for key in keys}
+    try:
+        found = shared.get_many(list(shared_keys))
+    except Exception as e:
+        logger.warning("Shared translation cache read failed | error=%s", e)
+        return {}
+    return {shared_keys[shared_key]: value for shared_key, value in found.items()}
+
+
+def _shared_set(key: str, lang_code: str, value: str, ttl: int) -> None:
+    shared = get_shared_tier()
+    if shared is None:
+        return
+    try:
+        shared.set_many({_shared_key(key, lang_code): value}, ttl)
+    except Exception as e:
+        logger.warning("Shared translation cache write failed | error=%s", e)
+
+
+def _shared_delete(key: str, lang_codes) -> None:
+    shared = get_shared_tier()
+    if shared is None:
+        return
+    try:
+        shared.delete_many([_shared_key(key, lang_code) for lang_code in lang_codes])
+    except Exception as e:
+        logger.warning("Shared translation cache delete failed | error=%s", e)
+
+
+# ============================
+# Public API
+# ============================
 
 def get_from_cache(key: str, lang_code: str) -> str | None:
     """
@@ -37,36 +372,83 @@ def get_from_cache(key: str, lang_code: str) -> str | None:
     :param lang_code: Target language code
     :return: Cached translation, or None if missing or expired
     """
+    return get_many_from_cache([key], lang_code).get(key)
+
+
+def get_many_from_cache(keys, lang_code: str) -> dict[str, str]:
+    """
+    Cached translations for several keys: L1 first, the rest with one
+    shared-tier multi-get. Shared hits are promoted to L1.
+
+    :return: {source_text: translation} for the keys that were found
+    """
+    global _shared_hits
+
     now = time.time()
-    cache_key = (key, lang_code)
+    found = {}
+    missing = []
 
-    with _cache_lock:
-        item = _cache.get(cache_key)
-        if not item:
-            return None
+    _cache.maybe_sweep()
+    for key in keys:
+        value = _cache.get(key, lang_code, now)
+        if value is not None:
+            found[key] = value
+        else:
+            missing.append(key)
 
-        value, expires_at = item
-        if now > expires_at:
-            del _cache[cache_key]
-            return None
+    shared = _shared_get_many(missing, lang_code)
+    if shared:
+        for key, value in shared.items():
+            _cache.set(key, lang_code, value, TRANSLATION_CACHE_TTL_SECONDS)
+        with _shared_hits_lock:
+            _shared_hits += len(shared)
+        found.update(shared)
 
-        return value
+    return found
 
 
-def save_to_cache(key: str, lang_code: str, value: str) -> None:
+def save_to_cache(key: str, lang_code: str, value: str, shared_ttl: int | None = None) -> None:
     """
-    Save a translation value in the cache with TTL.
+    Save a translation value in both tiers.
 
     :param key: Source text (unique DB value)
     :param lang_code: Target language code
     :param value: Translated text
+    :param shared_ttl: Shared-tier TTL; TRANSLATION_SHARED_CACHE_TTL_SECONDS by default
     """
-    expires_at = time.time() + TRANSLATION_CACHE_TTL_SECONDS
-    with _cache_lock:
-        _cache[(key, lang_code)] = (value, expires_at)
+    _cache.set(key, lang_code, value, TRANSLATION_CACHE_TTL_SECONDS)
+    _shared_set(key, lang_code, value, shared_ttl or TRANSLATION_SHARED_CACHE_TTL_SECONDS)
+
+
+def delete_from_cache(key: str, lang_codes) -> None:
+    """
+    Drop a key's cached values for lang_codes from both tiers (a translation
+    cleared in the admin), so the next lookup goes to the DB and requests
+    a new translation.
+
+    Other processes keep their L1 copy for up to TRANSLATION_CACHE_TTL_SECONDS.
+    """
+    for lang_code in lang_codes:
+        _cache.delete(key, lang_code)
+    _shared_delete(key, lang_codes)
+
+
+def cache_stats() -> dict:
+    """
+    L1 metrics of this process: entries, bytes, hits, misses, hit_ratio,
+    evictions (size limits), expirations; plus shared_hits (L1 misses
+    answered by the shared tier).
+    """
+    return {**_cache.stats(), "shared_hits": _shared_hits}
 
 
 def invalidate_cache() -> None:
-    """Clear the entire translation cache."""
-    with _cache_lock:
-        _cache.clear()
+    """Clear the entire translation cache (both tiers)."""
+    _cache.clear()
+
+    shared = get_shared_tier()
+    if shared is not None:
+        try:
+            shared.clear()
+        except Exception as e:
+            logger.warning("Shared translation cache clear failed | error=%s", e)
@@ -0,0 +1,243 @@
+"""
+Render-scoped translation catalog for the {% tr %} tag.
+
+Problem:
+- Every {% tr %} called get_translate() on its own, i.e. one
+  get_or_create round-trip per tag (and per loop iteration for
+  keys like {% tr t.get_status_display %}).
+
+Approach:
+- On the first {% tr %} of a render a TranslationCatalog is attached to the
+  template Context (included templates share it) and every key the
+  template is known to need is resolved with one `source_text IN (...)`
+  query; unknown keys go to the buffered registrar. In the reference
+  language the keys are only registered, no query is made.
+- Known keys:
+    * static  — literal {% tr "..." %} arguments of the compiled template,
+                its {% extends %} parents and constant {% include %}s;
+    * learned — dynamic keys resolved lazily during earlier renders of the
+                same template (capped by MAX_LEARNED_KEYS, so free text such
+                as {% tr description %} cannot grow the set forever).
+- The rest of the render is served from memory. A dynamic key that is not
+  known yet costs one lookup, once per render.
+- With the preloaded catalog (snapshot.py) keys are answered from process
+  memory and the SELECT is only made for keys it does not hold.
+
+Both key sets are kept on the compiled Template object, which the cached
+template loader keeps for the lifetime of the process.
+"""
+
+from django.template import Node, Template
+from django.template.library import SimpleNode
+from django.template.loader_tags import ExtendsNode, IncludeNode
+
+from .active_language_context import get_language
+from .cache import get_many_from_cache, save_to_cache
+from .conf import DEFAULT_REFERENCE_LANGUAGE
+from .registrar import mark_registered, register_keys
+from .snapshot import get_snapshot
+from .translator import request_translation
+from ..models import Translation
+
+MAX_LEARNED_KEYS = 200
+
+_CONTEXT_ATTR = "translation_catalog"
+_STATIC_KEYS_ATTR = "translation_static_keys"
+_LEARNED_KEYS_ATTR = "translation_learned_keys"
+
+
+# ============================
+# Template key discovery
+# ============================
+
+def _constant(expression) -> str | None:
+    """Return the value of a literal FilterExpression ("text"), else None."""
+    if expression is None or expression.filters:
+        return None
+    return expression.var if isinstance(expression.var, str) else None
+
+
+def _collect_static_keys(template: Template, tag_func, seen: set[str]) -> set[str]:
+    if template.origin.name in seen:
+        return set()
+    seen.add(template.origin.name)
+
+    keys = set()
+    for node in template.nodelist.get_nodes_by_type(Node):
+        if isinstance(node, SimpleNode) and node.func is tag_func:
+            key = _constant(node.args[0]) if node.args else None
+            if key is not None:
+                keys.add(str(key))
+
+        elif isinstance(node, (ExtendsNode, IncludeNode)):
+            name = _constant(node.parent_name if isinstance(node, ExtendsNode) else node.template)
+            if name is None:
+                continue
+            try:
+                related = template.engine.get_template(name)
+            except Exception:
+                continue
+            keys |= _collect_static_keys(related, tag_func, seen)
+
+    return keys
+
+
+def template_keys(template: Template | None, tag_func) -> frozenset[str]:
+    """
+    Static + learned keys of a template. The static scan runs once per
+    compiled template.
+    """
+    if template is None:
+        return frozenset()
+
+    static = getattr(template, _STATIC_KEYS_ATTR, None)
+    if static is None:
+        static = frozenset(_collect_static_keys(template, tag_func, set()))
+        setattr(template, _STATIC_KEYS_ATTR, static)
+
+    return static | getattr(template, _LEARNED_KEYS_ATTR, frozenset())
+
+
+def _learn_key(template: Template | None, key: str) -> None:
+    if template is None:
+        return
+    learned = getattr(template, _LEARNED_KEYS_ATTR, frozenset())
+    if len(learned) < MAX_LEARNED_KEYS:
+        # Copy-on-write: renders in other threads read the old frozenset
+        setattr(template, _LEARNED_KEYS_ATTR, learned | {key})
+
+
+# ============================
+# Catalog
+# ============================
+
+class TranslationCatalog:
+    """
+    Translations of a set of keys for one language, loaded in batches.
+
+    Mirrors get_translate():
+    - reference language → the key itself; new keys are handed to the
+      registrar, the render does not touch the DB;
+    - other languages    → process cache, then DB, then OpenAI / key.
+    """
+
+    def __init__(self, lang_code: str, template: Template | None = None):
+        self.lang_code = lang_code
+        self.template = template
+        self._loaded: set[str] = set()
+        self._values: dict[str, str | None] = {}
+        self._ids: dict[str, int] = {}
+
+    def load(self, keys) -> None:
+        """Resolve keys that are not loaded yet: from memory, or with at most one SELECT."""
+        keys = {key for key in keys if key not in self._loaded}
+        if not keys:
+            return
+        self._loaded |= keys
+
+        if self.lang_code == DEFAULT_REFERENCE_LANGUAGE:
+            register_keys(self._unknown(keys))
+            return
+
+        self._resolve(keys)
+
+    @staticmethod
+    def _unknown(keys: set[str]) -> set[str]:
+        """Keys the preloaded catalog does not know (all keys without it)."""
+        snapshot = get_snapshot()
+        if snapshot is None:
+            return keys
+        unknown = set()
+        for key in keys:
+            hit = snapshot.lookup(key, DEFAULT_REFERENCE_LANGUAGE)
+            if hit is None or hit[0] is None:
+                unknown.add(key)
+        return unknown
+
+    def _resolve(self, keys: set[str]) -> None:
+        """Preloaded catalog → cache tiers (one multi-get) → one SELECT; unknown keys go to the registrar."""
+        snapshot = get_snapshot()
+        unknown = set()
+        untranslated = []
+
+        for key in list(keys):
+            hit = snapshot.lookup(key, self.lang_code) if snapshot else None
+            if hit is not None:
+                keys.discard(key)
+                obj_id, value = hit
+                if obj_id is None:
+                    unknown.add(key)
+                else:
+                    self._ids[key], self._values[key] = obj_id, value
+                    if not value:
+                        untranslated.append(key)
+
+        # One multi-get: keys the catalog does not hold, and rows translated
+        # by another process after the last catalog refresh
+        for key, value in get_many_from_cache([*keys, *untranslated], self.lang_code).items():
+            if value:
+                self._values[key] = value
+                keys.discard(key)
+
+        found = self._fetch(keys)
+        mark_registered(found)
+        register_keys(unknown | (keys - found))
+
+    def _fetch(self, keys: set[str]) -> set[str]:
+        if not keys:
+            return set()
+
+        lang_field = f"text_{self.lang_code}"
+        rows = Translation.objects.filter(source_text__in=keys).values_list("id", "source_text", lang_field)
+
+        found = set()
+        for obj_id, source_text, value in rows:
+            found.add(source_text)
+            self._ids[source_text] = obj_id
+            self._values[source_text] = value
+            if value:
+                save_to_cache(source_text, self.lang_code, value)
+        return found
+
+    def translate(self, key: str, is_default_lang: bool = True, fast: bool = True) -> str:
+        key = str(key)
+        if key not in self._loaded:
+            self.load([key])
+            _learn_key(self.template, key)
+
+        if self.lang_code == DEFAULT_REFERENCE_LANGUAGE:
+            if is_default_lang:
+                return key
+            if key not in self._ids:
+                # Forced lookup: the reference text may have been edited in the admin
+                self._resolve({key})
+
+        value = self._values.get(key)
+        if value:
+            return value
+
+        obj_id = self._ids.get(key)
+        if obj_id is None:
+            # Not flushed by the registrar yet: translated on a later render
+            return key
+
+        value = request_translation(obj_id, key, self.lang_code, fast)
+        self._values[key] = value
+        return value
+
+
+def render_catalog(context, tag_func) -> TranslationCatalog:
+    """
+    Catalog of the current render; created and preloaded with the
+    template's keys on the first {% tr %}.
+    """
+    lang_code = get_language()
+    catalog = getattr(context, _CONTEXT_ATTR, None)
+
+    if catalog is None or catalog.lang_code != lang_code:
+        template = getattr(context, "template", None)
+        catalog = TranslationCatalog(lang_code, template)
+        catalog.load(template_keys(template, tag_func))
+        setattr(context, _CONTEXT_ATTR, catalog)
+
+    return catalog
@@ -5,13 +5,62 @@ Languages are defined by their code (e.g., "ru", "en", "kk").
 The name is used only for UI display.
 """
 
+import re
+
 from django.conf import settings
 
 
 # === Core Settings ===
 
 ENABLE_DJANGO_TRANSLATION_ACTIVATE: bool = False  # Enable django.utils.translation.activate(lang_code)
-TRANSLATION_CACHE_TTL_SECONDS: int = 60 * 8       # Cache TTL in seconds
+TRANSLATION_CACHE_TTL_SECONDS: int = 60 * 8       # Cache TTL in seconds (in-process tier)
+TRANSLATION_SHARED_CACHE_TTL_SECONDS: int = 60 * 60 * 24  # Shared tier TTL (settings.TRANSLATION_SHARED_CACHE)
+TRANSLATION_CACHE_MAX_ENTRIES: int = 20_000       # In-process tier: max (text, language) entries
+TRANSLATION_CACHE_MAX_BYTES: int = 16 * 1024 * 1024  # In-process tier: approximate memory limit
+TRANSLATION_CACHE_SWEEP_SECONDS: int = 60         # In-process tier: how often expired entries are swept
+TRANSLATION_CACHE_STRIPES: int = 16               # In-process tier: independently locked stripes
+
+
+# === Preloaded Catalog ===
+
+PRELOAD_CATALOG: bool = True                      # Hold all translations in memory per process
+CATALOG_VERSION_CHECK_SECONDS: float = 2.0        # How often a process checks the shared catalog version
+CATALOG_MAX_KEY_LENGTH: int = 500                 # Longer keys (free text) stay on the TTL cache / DB path
+
+
+# === Background Translation ===
+
+TRANSLATION_BATCH_SIZE: int = 40                  # Strings per OpenAI call
+TRANSLATION_MAX_WORKERS: int = 8                  # Upper bound of the background pool
+TRANSLATION_WORKER_IDLE_SECONDS: int = 30         # Idle workers exit after this
+OPENAI_REQUESTS_PER_MINUTE: int = 60              # API key limit: requests (shared by processes, see rate_limit.py)
+OPENAI_TOKENS_PER_MINUTE: int = 150_000           # API key limit: estimated tokens
+TRANSLATION_JOB_LEASE_SECONDS: int = 600          # A claimed job is re-offered if not finished by then
+TRANSLATION_JOB_MAX_ATTEMPTS: int = 5             # Then the job is dead (manage.py translation_jobs --retry-dead)
+TRANSLATION_JOB_BACKOFF_SECONDS: int = 30         # Retry delay, doubled on every attempt
+TRANSLATION_JOB_BACKOFF_MAX_SECONDS: int = 60 * 60
+TRANSLATION_JOB_POLL_SECONDS: float = 2.0         # Idle workers look for jobs of other processes this often
+
+
+# === Quality Tiers ===
+#   single     — one call, one translation; batched by the background workers
+#   candidates — one call, TRANSLATION_CANDIDATES_COUNT candidates, majority vote
+#   full       — 10 candidates (with retries) + an evaluator call
+
+TRANSLATION_TIERS: tuple[str, ...] = ("single", "candidates", "full")
+TRANSLATION_TIER_RULES: list[tuple[str, str]] = [  # (regex searched in the key, tier); first match wins
+    (r"(?i)конфиденциальн|соглашени|оферт|персональных данных|условия (использования|обслуживания)", "full"),
+    (r"^[^.!?]{0,40}$", "single"),                # short UI labels: up to 40 chars, no sentence
+]
+TRANSLATION_DEFAULT_TIER: str = "candidates"      # Sentences, descriptions, free text
+TRANSLATION_CANDIDATES_COUNT: int = 5             # Candidates per call in the "candidates" tier
+
+
+# === Pre-translation (manage.py pretranslate) ===
+
+PRETRANSLATE_CHOICE_FIELDS: list[str] = [         # "app_label.Model.field": choice labels shown via {% tr %}
+    "support.SupportTicket.status",
+]
 
 
 # === Language Roles ===
@@ -68,6 +117,14 @@ def get_language_dict() -> dict[str, str]:
     return {lang["code"]: lang["name"] for lang in SUPPORTED_LANGUAGES}
 
 
+def get_translation_tier(text: str) -> str:
+    """Return the quality tier for a key: first matching TRANSLATION_TIER_RULES entry, else the default."""
+    for pattern, tier in TRANSLATION_TIER_RULES:
+        if re.search(pattern, text):
+            return tier
+    return TRANSLATION_DEFAULT_TIER
+
+
 def is_openai_enabled() -> bool:
     """Return True if OpenAI translation is enabled via Django settings."""
     return bool(getattr(settings, "OPENAI_KEY", "").strip())
@@ -81,6 +138,7 @@ def validate_translation_config() -> None:
     - DEFAULT_LANGUAGE_STARTUP or DEFAULT_REFERENCE_LANGUAGE are not in supported codes.
     - Missing "code" or "name" in language entries.
     - Duplicate language codes found.
+    - Unknown quality tier in TRANSLATION_TIER_RULES / TRANSLATION_DEFAULT_TIER.
     - Excluded paths do not start with "/".
     """
     codes = get_supported_language_codes()
@@ -107,6 +165,10 @@ def validate_translation_config() -> None:
             raise ValueError(f"Duplicate language code detected: '{code}'")
         seen.add(code)
 
+    for tier in [TRANSLATION_DEFAULT_TIER, *(tier for _, tier in TRANSLATION_TIER_RULES)]:
+        if tier not in TRANSLATION_TIERS:
+            raise ValueError(f"Unknown translation tier: '{tier}'")
+
     for path in LANGUAGE_EXCLUDED_URL_PREFIXES:
         if not path.startswith("/"):
             raise ValueError(f"Excluded path must start with '/': '{path}'")
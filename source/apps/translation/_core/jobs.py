@@ -0,0 +1,261 @@
+"""
+Durable translation job queue (TranslationJob table).
+
+Problem:
+- Jobs lived in a per-process queue.Queue (lost on restart) and the
+  "pending" flag was keyed by hash(source_text), which is randomized per
+  process: every worker process queued and paid for the same translation.
+
+Approach:
+- A job is unique per (sha256 of source text, language); enqueue() is an
+  INSERT ... ON CONFLICT DO NOTHING, so any number of processes asking for
+  the same translation create one row.
+- claim() takes up to `limit` ready jobs of one language with a lease
+  (token + lease_until):
+    * PostgreSQL → SELECT ... FOR UPDATE SKIP LOCKED, concurrent workers
+      skip each other's rows;
+    * SQLite     → one UPDATE ... WHERE id IN (SELECT ... LIMIT n), which
+      runs under the database write lock.
+  A job whose lease expired (worker killed mid-batch) is ready again,
+  or dead if that was its last attempt.
+- complete() / fail() / extend() only touch jobs still leased with the
+  caller's token; a worker extends the lease while it works through a
+  batch of slow (non-single tier) strings. Failures are retried with exponential backoff; after
+  TRANSLATION_JOB_MAX_ATTEMPTS the job is dead until retry_dead().
+- A done job is reopened by enqueue() when its translation is missing
+  again (cleared in the admin); the worker skips rows that are already
+  translated, so a reopened job costs no OpenAI call.
+"""
+
+import hashlib
+import uuid
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .conf import (
+    TRANSLATION_JOB_BACKOFF_MAX_SECONDS,
+    TRANSLATION_JOB_BACKOFF_SECONDS,
+    TRANSLATION_JOB_LEASE_SECONDS,
+    TRANSLATION_JOB_MAX_ATTEMPTS,
+)
+from ..models import TranslationJob
+
+CLAIM_ORDER = ("available_at", "id")
+
+
+def content_hash(source_text: str) -> str:
+    """Stable across processes and restarts, unlike hash()."""
+    return hashlib.sha256(source_text.encode("utf-8")).hexdigest()
+
+
+# ============================
+# Enqueue
+# ============================
+
+def enqueue(items) -> None:
+    """
+    Create jobs for (translation_id, source_text, lang_code) items; jobs that
+    already exist are left alone, done ones are reopened.
+    """
+    now = timezone.now()
+    jobs = {}
+    for translation_id, source_text, lang_code in items:
+        digest = content_hash(source_text)
+        jobs[(digest, lang_code)] = TranslationJob(
+            translation_id=translation_id,
+            content_hash=digest,
+            lang_code=lang_code,
+            available_at=now,
+        )
+    if not jobs:
+        return
+
+    TranslationJob.objects.bulk_create(jobs.values(), ignore_conflicts=True)
+
+    by_language: dict[str, list[str]] = {}
+    for digest, lang_code in jobs:
+        by_language.setdefault(lang_code, []).append(digest)
+    for lang_code, digests in by_language.items():
+        (
+            TranslationJob.objects
+            .filter(lang_code=lang_code, content_hash__in=digests, status=TranslationJob.DONE)
+            .update(status=TranslationJob.PENDING, attempts=0, available_at=now, last_error="", updated_at=now)
+        )
+
+
+# ============================
+# Claim
+# ============================
+
+def _ready(now) -> Q:
+    return (
+        Q(status=TranslationJob.PENDING, available_at__lte=now)
+        | Q(status=TranslationJob.RUNNING, lease_until__lt=now, attempts__lt=TRANSLATION_JOB_MAX_ATTEMPTS)
+    )
+
+
+def _bury_expired(now) -> int:
+    """
+    Jobs whose lease expired on the last attempt are dead: a batch that
+    kills its worker never reaches fail(), and would be leased forever.
+    """
+    return (
+        TranslationJob.objects
+        .filter(
+            status=TranslationJob.RUNNING,
+            lease_until__lt=now,
+            attempts__gte=TRANSLATION_JOB_MAX_ATTEMPTS,
+        )
+        .update(
+            status=TranslationJob.DEAD,
+            leased_by=None,
+            lease_until=None,
+            last_error="Lease expired on the last attempt",
+            updated_at=now,
+        )
+    )
+
+
+def _lease(token: str, now) -> dict:
+    return {
+        "status": TranslationJob.RUNNING,
+        "leased_by": token,
+        "lease_until": now + timedelta(seconds=TRANSLATION_JOB_LEASE_SECONDS),
+        "attempts": F("attempts") + 1,
+        "updated_at": now,
+    }
+
+
+def _claim_skip_locked(candidates, token: str, now, limit: int) -> None:
+    with transaction.atomic():
+        ids = list(
+            candidates
+            .select_for_update(skip_locked=True)
+            .values_list("id", flat=True)[:limit]
+        )
+        if ids:
+            TranslationJob.objects.filter(id__in=ids).update(**_lease(token, now))
+
+
+def _claim_single_update(candidates, token: str, now, limit: int) -> None:
+    # The readiness filter is repeated outside the subquery: it is what makes
+    # the claim conditional if the rows changed since they were selected
+    (
+        TranslationJob.objects
+        .filter(id__in=candidates.values("id")[:limit])
+        .filter(_ready(now))
+        .update(**_lease(token, now))
+    )
+
+
+def claim(limit: int) -> tuple[str, list[TranslationJob]] | None:
+    """
+    Lease up to `limit` ready jobs of one language (the one waiting longest).
+
+    :return: (lease token, jobs with their translation), or None when nothing is ready
+    """
+    now = timezone.now()
+    _bury_expired(now)
+    lang_code = (
+        TranslationJob.objects
+        .filter(_ready(now))
+        .order_by(*CLAIM_ORDER)
+        .values_list("lang_code", flat=True)
+        .first()
+    )
+    if lang_code is None:
+        return None
+
+    token = uuid.uuid4().hex
+    candidates = TranslationJob.objects.filter(_ready(now), lang_code=lang_code).order_by(*CLAIM_ORDER)
+
+    if connection.features.has_select_for_update_skip_locked:
+        _claim_skip_locked(candidates, token, now, limit)
+    else:
+        _claim_single_update(candidates, token, now, limit)
+
+    jobs = list(TranslationJob.objects.filter(leased_by=token).select_related("translation"))
+    return (token, jobs) if jobs else None
+
+
+# ============================
+# Results
+# ============================
+
+def complete(token: str, job_ids) -> int:
+    now = timezone.now()
+    return (
+        TranslationJob.objects
+        .filter(id__in=job_ids, leased_by=token)
+        .update(status=TranslationJob.DONE, leased_by=None, lease_until=None, last_error="", updated_at=now)
+    )
+
+
+def extend(token: str, job_ids) -> int:
+    """
+    Renew the lease of jobs still held with token.
+
+    :return: number of jobs renewed; fewer than asked → the lease was lost
+             (expired and claimed by another worker)
+    """
+    now = timezone.now()
+    return (
+        TranslationJob.objects
+        .filter(id__in=job_ids, leased_by=token, status=TranslationJob.RUNNING)
+        .update(lease_until=now + timedelta(seconds=TRANSLATION_JOB_LEASE_SECONDS), updated_at=now)
+    )
+
+
+def _backoff(attempts: int) -> timedelta:
+    seconds = TRANSLATION_JOB_BACKOFF_SECONDS * 2 ** max(0, attempts - 1)
+    return timedelta(seconds=min(seconds, TRANSLATION_JOB_BACKOFF_MAX_SECONDS))
+
+
+def fail(token: str, jobs: list[TranslationJob], error: str) -> None:
+    """Back off and retry the jobs, or mark them dead after the last attempt."""
+    now = timezone.now()
+    by_attempts: dict[int, list[int]] = {}
+    for job in jobs:
+        by_attempts.setdefault(job.attempts, []).append(job.id)
+
+    for attempts, job_ids in by_attempts.items():
+        if attempts >= TRANSLATION_JOB_MAX_ATTEMPTS:
+            changes = {"status": TranslationJob.DEAD}
+        else:
+            changes = {"status": TranslationJob.PENDING, "available_at": now + _backoff(attempts)}
+        (
+            TranslationJob.objects
+            .filter(id__in=job_ids, leased_by=token)
+            .update(**changes, leased_by=None, lease_until=None, last_error=error[:2000], updated_at=now)
+        )
+
+
+# ============================
+# Maintenance
+# ============================
+
+def has_ready_jobs() -> bool:
+    return TranslationJob.objects.filter(_ready(timezone.now())).exists()
+
+
+def job_stats() -> dict[str, int]:
+    counts = dict(
+        TranslationJob.objects
+        .order_by()
+        .values_list("status")
+        .annotate(n=Count("id"))
+    )
+    return {status: counts.get(status, 0) for status, _ in TranslationJob.STATUSES}
+
+
+def retry_dead() -> int:
+    """Give dead jobs a fresh set of attempts."""
+    now = timezone.now()
+    return (
+        TranslationJob.objects
+        .filter(status=TranslationJob.DEAD)
+        .update(status=TranslationJob.PENDING, attempts=0, available_at=now, updated_at=now)
+    )
@@ -3,17 +3,36 @@ OpenAI-based translation generator using GPT models.
 
 Features:
 - Auto-detects source language.
-- Generates 10 translation candidates (5 literal + 5 dictionary-guided).
-- Retries candidate generation up to N times if incomplete.
-- Selects the best candidate using evaluation prompt.
+- Quality tiers (per key pattern, see TRANSLATION_TIER_RULES in conf.py):
+    * single     — one structured-output call, one translation;
+    * candidates — one call with N candidates, the most frequent one wins;
+    * full       — 10 candidates (5 literal + 5 dictionary-guided), retried
+                   up to N times if incomplete, then an evaluator call
+                   selects the best one.
 - Returns plain translated string (no quality threshold).
+- generate_translations(): many strings in one structured-output call
+  (the single tier of the background workers).
+- TranslationUsage collects calls and tokens (benchmarks).
 """
 
+import json
+from collections import Counter
+
 from django.conf import settings
 from openai import OpenAI
 from pydantic import BaseModel
 
-from .conf import get_language_dict, is_openai_enabled
+from .conf import (
+    TRANSLATION_CANDIDATES_COUNT,
+    get_language_dict,
+    get_translation_tier,
+    is_openai_enabled,
+)
+
+MODEL = "gpt-4o-2024-11-20"
+EVALUATOR_MODEL = "gpt-4o-mini"
+FULL_CANDIDATES_COUNT = 10
+FULL_MAX_RETRIES = 3            # Candidate generation attempts of the full tier
 
 
 # ============================
@@ -31,31 +50,89 @@ class BestSchema(BaseModel):
     best: str
 
 
+class BatchItemSchema(BaseModel):
+    """One translated string of a batch, matched by id."""
+    id: int
+    translation: str
+
+
+class BatchSchema(BaseModel):
+    """Schema for batch translation."""
+    translations: list[BatchItemSchema]
+
+
+# ============================
+# Usage accounting
+# ============================
+
+
+class TranslationUsage:
+    """OpenAI calls and tokens spent, accumulated over any number of requests."""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def add(self, response) -> None:
+        self.calls += 1
+        if response.usage is not None:
+            self.prompt_tokens += response.usage.prompt_tokens
+            self.completion_tokens += response.usage.completion_tokens
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+def _parse(client: OpenAI, usage: TranslationUsage | None, **kwargs):
+    """One structured-output call; returns the parsed message."""
+    response = client.beta.chat.completions.parse(**kwargs)
+    if usage is not None:
+        usage.add(response)
+    return response.choices[0].message.parsed
+
+
+def tier_cost(tier: str) -> tuple[int, int]:
+    """
+    (requests, candidates per string) of a tier, for the rate limiter.
+
+    The full tier reserves its worst case: every candidate attempt plus
+    the evaluator call.
+    """
+    if tier == "full":
+        return FULL_MAX_RETRIES + 1, FULL_CANDIDATES_COUNT
+    if tier == "candidates":
+        return 1, TRANSLATION_CANDIDATES_COUNT
+    return 1, 1
+
+
 # ============================
 # Prompts
 # ============================
 
 
-def _build_candidates_prompt(lang_name: str) -> str:
+def _build_candidates_prompt(lang_name: str, count: int = FULL_CANDIDATES_COUNT) -> str:
     """
     Build a system prompt for candidate translation generation.
 
-    Produces 10 translations:
-    - First 5: literal, UI-suitable.
-    - Next 5: dictionary-based (canonical wording).
+    Produces `count` translations (10 for the full tier):
+    - First half (rounded up): literal, UI-suitable.
+    - The rest: dictionary-based (canonical wording).
     """
+    literal = (count + 1) // 2
     return (
         f"You are a professional translator working on a GAME BOOSTING WEBSITE. "
         f"This is a commercial web application where accuracy, consistency, and semantic fidelity are critical.\n\n"
         f"--- TASK ---\n"
         f"1. Auto-detect the source language.\n"
         f"2. Translate the given text into {lang_name}.\n"
-        f"3. Generate exactly 10 translation candidates:\n"
-        f"   - First 5: literal and interface-appropriate translations.\n"
-        f"   - Next 5: dictionary-style translations (from Oxford, Cambridge, Multitran, Glosbe) "
+        f"3. Generate exactly {count} translation candidates:\n"
+        f"   - First {literal}: literal and interface-appropriate translations.\n"
+        f"   - Next {count - literal}: dictionary-style translations (from Oxford, Cambridge, Multitran, Glosbe) "
         f"using canonical wordings.\n\n"
         f"--- RULES ---\n"
-        f"- Output must be strict JSON with a single key 'translations', containing a list of 10 plain strings.\n"
+        f"- Output must be strict JSON with a single key 'translations', containing a list of {count} plain strings.\n"
         f"- No formatting, no explanations, no comments — just raw JSON.\n"
         f"- Preserve all placeholders ({{}}, %s, {{variable}}), numbers, emojis, HTML tags.\n"
         f"- Retain gaming terms exactly:\n"
@@ -96,45 +173,61 @@ def _build_best_prompt(lang_name: str) -> str:
     )
 
 
+def _build_batch_prompt(lang_name: str) -> str:
+    """
+    Build a system prompt for translating a batch of independent strings.
+    """
+    return (
+        f"You are a professional translator working on a GAME BOOSTING WEBSITE. "
+        f"This is a commercial web application where accuracy, consistency, and semantic fidelity are critical.\n\n"
+        f"--- TASK ---\n"
+        f"You receive a JSON list of objects {{\"id\": number, \"text\": string}}.\n"
+        f"1. Auto-detect the source language of each text.\n"
+        f"2. Translate every text into {lang_name} independently.\n"
+        f"3. Choose the literal, interface-appropriate, dictionary-consistent wording.\n\n"
+        f"--- RULES ---\n"
+        f"- Output must be strict JSON with a single key 'translations': a list of objects "
+        f"{{\"id\": number, \"translation\": string}}, one per input id, ids unchanged.\n"
+        f"- No formatting, no explanations, no comments — just raw JSON.\n"
+        f"- Preserve all placeholders ({{}}, %s, {{variable}}), numbers, emojis, HTML tags.\n"
+        f"- Retain gaming terms exactly:\n"
+        f"   booster → 'booster' (EN), 'бустер' (RU/KZ)\n"
+        f"   boosting → 'бустинг'\n"
+        f"   rank → 'ранг'\n"
+        f"- Do not shorten or simplify the meaning unless the source string itself is short.\n"
+        f"- All legal, policy-related, or contractual texts must be translated with full accuracy and attention to detail.\n"
+        f"- Maintain consistent terminology across all translations in the list.\n"
+    )
+
+
 # ============================
 # Main logic
 # ============================
 
 
-def generate_translation(
+def _full_evaluation(
+    client: OpenAI,
     text: str,
-    lang_code: str,
-    max_retries: int = 3,
+    lang_name: str,
+    max_retries: int,
+    usage: TranslationUsage | None,
 ) -> str | None:
-    """
-    Generate a translation for the given text.
-
-    Workflow:
-    1. Generate 10 candidates (5 literal, 5 dictionary-based).
-    2. Retry up to `max_retries` times if not enough candidates.
-    3. Let GPT evaluate and select the best one.
-    4. Return the best plain translation string.
-    """
-    if not is_openai_enabled():
-        raise RuntimeError("OpenAI translation is disabled or API key is missing.")
-
-    lang_name = get_language_dict().get(lang_code, lang_code)
-    client = OpenAI(api_key=settings.OPENAI_KEY)
     translations: list[str] | None = None
 
     for attempt in range(1, max_retries + 1):
-        candidates_result = client.beta.chat.completions.parse(
-            model="gpt-4o-2024-11-20",
+        translations = _parse(
+            client,
+            usage,
+            model=MODEL,
             messages=[
                 {"role": "system", "content": _build_candidates_prompt(lang_name)},
                 {"role": "user", "content": text},
             ],
             temperature=0.7,
             response_format=CandidatesSchema,
-        )
-        translations = candidates_result.choices[0].message.parsed.translations
+        ).translations
 
-        if translations and len(translations) == 10:
+        if translations and len(translations) == FULL_CANDIDATES_COUNT:
             break
         translations = None
 
@@ -143,14 +236,110 @@ def generate_translation(
 
     options_text = "\n".join(f"{i + 1}. {t}" for i, t in enumerate(translations))
 
-    best_result = client.beta.chat.completions.parse(
-        model="gpt-4o-mini",
+    best = _parse(
+        client,
+        usage,
+        model=EVALUATOR_MODEL,
         messages=[
             {"role": "system", "content": _build_best_prompt(lang_name)},
             {"role": "user", "content": options_text},
         ],
         temperature=0,
         response_format=BestSchema,
+    ).best
+
+    return best.strip()
+
+
+def _candidates_vote(
+    client: OpenAI,
+    text: str,
+    lang_name: str,
+    usage: TranslationUsage | None,
+) -> str | None:
+    translations = _parse(
+        client,
+        usage,
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": _build_candidates_prompt(lang_name, TRANSLATION_CANDIDATES_COUNT)},
+            {"role": "user", "content": text},
+        ],
+        temperature=0.7,
+        response_format=CandidatesSchema,
+    ).translations
+
+    votes = Counter(t.strip() for t in translations if t.strip())
+    if not votes:
+        return None
+    # Ties go to the earliest candidate, i.e. the literal ones
+    return votes.most_common(1)[0][0]
+
+
+def generate_translation(
+    text: str,
+    lang_code: str,
+    max_retries: int = FULL_MAX_RETRIES,
+    tier: str | None = None,
+    usage: TranslationUsage | None = None,
+) -> str | None:
+    """
+    Generate a translation for the given text.
+
+    :param tier: "single", "candidates" or "full"; by default chosen by
+                 TRANSLATION_TIER_RULES for the text.
+    :param max_retries: full tier: candidate generation attempts.
+    :param usage: accumulates calls and tokens when given.
+    """
+    if not is_openai_enabled():
+        raise RuntimeError("OpenAI translation is disabled or API key is missing.")
+
+    tier = tier or get_translation_tier(text)
+    if tier == "single":
+        return generate_translations([text], lang_code, usage).get(text)
+
+    lang_name = get_language_dict().get(lang_code, lang_code)
+    client = OpenAI(api_key=settings.OPENAI_KEY)
+
+    if tier == "candidates":
+        return _candidates_vote(client, text, lang_name, usage)
+    return _full_evaluation(client, text, lang_name, max_retries, usage)
+
+
+def generate_translations(
+    texts: list[str],
+    lang_code: str,
+    usage: TranslationUsage | None = None,
+) -> dict[str, str]:
+    """
+    Translate several strings with one structured-output call.
+
+    :return: {source text: translation} for the strings the model returned;
+             missing or empty items are simply absent.
+    """
+    if not is_openai_enabled():
+        raise RuntimeError("OpenAI translation is disabled or API key is missing.")
+    if not texts:
+        return {}
+
+    lang_name = get_language_dict().get(lang_code, lang_code)
+    client = OpenAI(api_key=settings.OPENAI_KEY)
+    payload = json.dumps([{"id": i, "text": text} for i, text in enumerate(texts)], ensure_ascii=False)
+
+    result = _parse(
+        client,
+        usage,
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": _build_batch_prompt(lang_name)},
+            {"role": "user", "content": payload},
+        ],
+        temperature=0,
+        response_format=BatchSchema,
     )
 
-    return best_result.choices[0].message.parsed.best.strip()
+    translated = {}
+    for item in result.translations:
+        if 0 <= item.id < len(texts) and item.translation.strip():
+            translated[texts[item.id]] = item.translation.strip()
+    return translated
@@ -0,0 +1,174 @@
+"""
+Ahead-of-time translation of the UI catalog (manage.py pretranslate).
+
+Without it a missing translation is only discovered when somebody opens
+the page, and the first visitors see the reference text while the
+background workers catch up. Run at deploy time instead:
+
+- keys are collected statically: literal {% tr "..." %} arguments of every
+  template under TEMPLATES["DIRS"] (the same scan the render catalog
+  uses) and the choice labels listed in PRETRANSLATE_CHOICE_FIELDS,
+  which reach templates as {% tr t.get_status_display %};
+- new keys are registered with one bulk insert (registrar.write_keys);
+- rows missing a language are enqueued as TranslationJobs and drained by
+  several threads through the same claim / lease / complete cycle as the
+  background workers (batches of TRANSLATION_BATCH_SIZE, same token
+  buckets). Workers running meanwhile share the queue instead of
+  translating the same rows a second time; jobs they still hold when the
+  queue runs dry are reported as missing.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.apps import apps
+from django.db import connection
+from django.db.models import Q
+from django.template import engines
+
+from .catalog import template_keys
+from .conf import (
+    DEFAULT_REFERENCE_LANGUAGE,
+    PRETRANSLATE_CHOICE_FIELDS,
+)
+from .jobs import enqueue
+from .registrar import mark_registered, write_keys
+from .translator import process_next_batch
+from ..models import Translation
+
+
+# ============================
+# Key collection
+# ============================
+
+def collect_template_keys() -> tuple[set[str], dict[str, str]]:
+    """
+    Literal {% tr %} keys of all project templates.
+
+    :return: (keys, {template name: error} for templates that failed to compile)
+    """
+    from ..templatetags.lang_tags import tr
+
+    engine = engines["django"].engine
+    keys, errors = set(), {}
+
+    for directory in engine.dirs:
+        directory = Path(directory)
+        for path in sorted(directory.rglob("*.html")):
+            name = path.relative_to(directory).as_posix()
+            try:
+                template = engine.get_template(name)
+            except Exception as e:
+                errors[name] = str(e)
+                continue
+            keys |= template_keys(template, tr)
+
+    return keys, errors
+
+
+def collect_choice_labels() -> set[str]:
+    """Display labels of the model fields listed in PRETRANSLATE_CHOICE_FIELDS."""
+    labels = set()
+    for path in PRETRANSLATE_CHOICE_FIELDS:
+        app_label, model_name, field_name = path.split(".")
+        field = apps.get_model(app_label, model_name)._meta.get_field(field_name)
+        labels.update(str(label) for _, label in field.flatchoices)
+    return labels
+
+
+# ============================
+# Registration
+# ============================
+
+def register_catalog_keys(keys: set[str]) -> int:
+    """
+    Create rows for keys that are not in the DB yet, with one bulk insert.
+
+    Written with write_keys() rather than through the registrar buffer: a
+    flush() that fails keeps the keys for a later retry, and the count would
+    be reported for rows that do not exist. Here a DB error reaches the caller.
+
+    :return: number of new keys
+    """
+    existing = set(Translation.objects.filter(source_text__in=keys).values_list("source_text", flat=True))
+    new_keys = keys - existing
+    write_keys(new_keys)
+    mark_registered(keys)
+    return len(new_keys)
+
+
+# ============================
+# Translation
+# ============================
+
+def _missing(lang_code: str, keys: set[str] | None):
+    field = f"text_{lang_code}"
+    rows = Translation.objects.filter(Q(**{f"{field}__isnull": True}) | Q(**{field: ""}))
+    if keys is not None:
+        rows = rows.filter(source_text__in=keys)
+    return rows.order_by("id")
+
+
+def missing_rows(lang_code: str, keys: set[str] | None = None) -> list[int]:
+    """Ids of rows without a translation into lang_code (all rows when keys is None)."""
+    return list(_missing(lang_code, keys).values_list("id", flat=True))
+
+
+def _drain(report) -> None:
+    try:
+        while (batch := process_next_batch()) is not None:
+            report(*batch)
+    finally:
+        # Pool threads own their connections
+        connection.close()
+
+
+def pretranslate(
+    keys: set[str] | None,
+    languages: list[str],
+    workers: int,
+    on_batch=None,
+) -> dict[str, dict[str, int]]:
+    """
+    Translate every missing row into each of languages (the reference
+    language is skipped: its text is the key).
+
+    Rows are enqueued and the queue is drained by `workers` threads; ready
+    jobs enqueued by page renders are processed along the way.
+
+    :param keys: limit to these source texts; None for the whole table
+    :param on_batch: called as on_batch(lang_code, strings, translated)
+                     after every batch (progress output)
+    :return: {lang: {"missing": n, "translated": n, "failed": n}}; failed
+             counts strings of failed batches (retried later by the queue)
+    """
+    stats = {}
+    items = []
+    for lang_code in languages:
+        if lang_code == DEFAULT_REFERENCE_LANGUAGE:
+            continue
+        rows = list(_missing(lang_code, keys).values_list("id", "source_text"))
+        stats[lang_code] = {"missing": len(rows), "translated": 0, "failed": 0}
+        items += [(obj_id, source_text, lang_code) for obj_id, source_text in rows]
+
+    if not items:
+        return stats
+    enqueue(items)
+
+    lock = threading.Lock()
+
+    def report(lang_code: str, strings: int, translated: int) -> None:
+        with lock:
+            if lang_code in stats:
+                stats[lang_code]["failed"] += strings - translated
+            if on_batch is not None:
+                on_batch(lang_code, strings, translated)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for future in [pool.submit(_drain, report) for _ in range(max(1, workers))]:
+            future.result()
+
+    for lang_code, row in stats.items():
+        row["translated"] = max(0, row["missing"] - len(missing_rows(lang_code, keys)))
+    return stats
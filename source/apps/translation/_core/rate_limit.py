@@ -0,0 +1,86 @@
+"""
+Token-bucket rate limiting for OpenAI translation requests (thread-safe).
+
+A bucket holds up to `capacity` tokens and refills continuously at
+`rate` tokens per second. acquire(n) takes n tokens, sleeping only as long
+as needed for them to refill, so a burst of work goes out immediately and
+a sustained load is spread evenly instead of waiting a fixed delay before
+every call.
+
+Two buckets guard the API: requests per minute and (estimated) tokens per
+minute; limits are in conf.py.
+
+The buckets live in the process, but the OpenAI limits apply to the whole
+API key: with N processes calling OpenAI (server workers, a pretranslate
+run) each bucket gets 1/N of the limit, N being
+settings.OPENAI_RATE_LIMIT_PROCESSES. Threads of one process share its
+buckets.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+
+from .conf import OPENAI_REQUESTS_PER_MINUTE, OPENAI_TOKENS_PER_MINUTE
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens, blocking until they are available.
+        Requests larger than the capacity are clamped to it.
+
+        :return: seconds spent waiting
+        """
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def _process_share(per_minute: int) -> tuple[float, float]:
+    """(rate per second, capacity) of this process's share of an account-wide limit."""
+    share = per_minute / max(1, getattr(settings, "OPENAI_RATE_LIMIT_PROCESSES", 1))
+    return share / 60, share
+
+
+_requests = TokenBucket(*_process_share(OPENAI_REQUESTS_PER_MINUTE))
+_tokens = TokenBucket(*_process_share(OPENAI_TOKENS_PER_MINUTE))
+
+
+def estimate_tokens(texts: list[str], candidates: int = 1) -> int:
+    """
+    Rough prompt + completion size of one request: ~3 characters per token
+    for Cyrillic, the text appears once as input and `candidates` times as
+    output, plus the system prompt and JSON overhead.
+    """
+    characters = sum(len(text) for text in texts)
+    return 600 + 20 * len(texts) + ((1 + candidates) * characters) // 3
+
+
+def wait_for_capacity(texts: list[str], requests: int = 1, candidates: int = 1) -> float:
+    """
+    Block until `requests` calls for texts fit both limits (see tier_cost()
+    in openai.py); returns seconds waited.
+    """
+    return _requests.acquire(requests) + _tokens.acquire(requests * estimate_tokens(texts, candidates))
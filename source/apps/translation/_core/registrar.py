@@ -0,0 +1,160 @@
+"""
+Buffered registration of translation keys.
+
+Rendering a page in the reference language used to write to the DB per
+{% tr %}: get_or_create() for the key and a save() to auto-copy the
+reference text. Now the render only calls register_keys():
+
+- keys already registered by this process are skipped in memory;
+- new keys go into a deduplicated buffer;
+- a background thread flushes the buffer every FLUSH_INTERVAL seconds
+  (or once FLUSH_BATCH_SIZE keys are waiting) with one
+  bulk_create(ignore_conflicts=True), so concurrent workers registering
+  the same key do not fail;
+- AUTO_COPY_REFERENCE_TEXT is applied by the flush, not by the render.
+
+flush() registers pending keys synchronously (management commands,
+process exit); write_keys() writes given keys past the buffer.
+"""
+
+import atexit
+import logging
+import threading
+
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .conf import AUTO_COPY_REFERENCE_TEXT, DEFAULT_REFERENCE_LANGUAGE
+from .snapshot import bump_version
+from ..models import Translation
+
+logger = logging.getLogger("data.translation.registrar")
+
+FLUSH_INTERVAL = 2.0
+FLUSH_BATCH_SIZE = 500
+MAX_KNOWN_KEYS = 20_000
+
+# ============================
+# State
+# ============================
+
+_known: set[str] = set()      # keys that exist in the DB (as far as this process knows)
+_buffer: set[str] = set()     # keys waiting for the next flush
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_wakeup = threading.Event()
+_flusher_started = False
+
+
+# ============================
+# Flush
+# ============================
+
+def _write(keys: list[str]) -> None:
+    ref_field = f"text_{DEFAULT_REFERENCE_LANGUAGE}"
+    Translation.objects.bulk_create(
+        [
+            Translation(source_text=key, **({ref_field: key} if AUTO_COPY_REFERENCE_TEXT else {}))
+            for key in keys
+        ],
+        ignore_conflicts=True,
+    )
+    if AUTO_COPY_REFERENCE_TEXT:
+        # Rows created before auto-copy (or by other code) with an empty reference text
+        (
+            Translation.objects
+            .filter(source_text__in=keys)
+            .filter(Q(**{f"{ref_field}__isnull": True}) | Q(**{ref_field: ""}))
+            .update(**{ref_field: F("source_text"), "updated_at": timezone.now()})
+        )
+    # bulk_create / update() send no signals: other processes learn about the keys here
+    bump_version()
+
+
+def flush() -> int:
+    """Write buffered keys to the DB. Returns the number of keys written."""
+    with _flush_lock:
+        with _lock:
+            keys = sorted(_buffer)
+            _buffer.clear()
+
+        if not keys:
+            return 0
+
+        try:
+            _write(keys)
+        except Exception as e:
+            # Keys are put back and retried on the next flush
+            with _lock:
+                _buffer.update(keys)
+            logger.warning("Key registration failed | keys=%d | error=%s", len(keys), e)
+            return 0
+
+        with _lock:
+            if len(_known) + len(keys) > MAX_KNOWN_KEYS:
+                _known.clear()
+            _known.update(keys)
+
+        logger.debug("Registered translation keys | keys=%d", len(keys))
+        return len(keys)
+
+
+def _flusher_loop() -> None:
+    while True:
+        _wakeup.wait(FLUSH_INTERVAL)
+        _wakeup.clear()
+        try:
+            flush()
+            close_old_connections()
+        except Exception:
+            continue
+
+
+def _start_flusher() -> None:
+    """Start the background flush thread once; called under _lock."""
+    global _flusher_started
+    if not _flusher_started:
+        threading.Thread(target=_flusher_loop, daemon=True).start()
+        atexit.register(flush)
+        _flusher_started = True
+
+
+# ============================
+# Public API
+# ============================
+
+def register_keys(keys) -> None:
+    """
+    Make sure translation rows exist for keys. Memory only: the DB
+    write happens in the background flush.
+    """
+    with _lock:
+        new_keys = {key for key in keys if key not in _known and key not in _buffer}
+        if not new_keys:
+            return
+        _buffer.update(new_keys)
+        pending = len(_buffer)
+        _start_flusher()
+
+    if pending >= FLUSH_BATCH_SIZE:
+        _wakeup.set()
+
+
+def write_keys(keys) -> None:
+    """
+    Create rows for keys right away, past the buffer: a DB error reaches
+    the caller instead of being retried by the next flush.
+    """
+    keys = sorted(set(keys))
+    if keys:
+        _write(keys)
+    mark_registered(keys)
+
+
+def mark_registered(keys) -> None:
+    """Remember keys that were seen in the DB, so they are never buffered."""
+    with _lock:
+        if len(_known) > MAX_KNOWN_KEYS:
+            _known.clear()
+        _known.update(keys)
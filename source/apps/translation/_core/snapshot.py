@@ -0,0 +1,235 @@
+"""
+Preloaded translation catalog: every Translation row, for every language,
+held in process memory.
+
+Loading:
+- preload() is called when the worker starts (wsgi.py / asgi.py); if the DB
+  is not ready yet, the catalog is loaded on first use instead.
+
+Cross-process invalidation:
+- A catalog version (a time_ns generation without expiry) is kept in the
+  shared Django cache. Translation saves / admin edits and the bulk writers
+  (registrar, OpenAI results) bump it; deletions bump a separate reset
+  counter.
+- Each process compares both counters with the ones it loaded, at most once
+  per CATALOG_VERSION_CHECK_SECONDS (one cache read):
+    * version changed → reload only rows with updated_at after the last load;
+    * reset changed   → full reload.
+
+Keys longer than CATALOG_MAX_KEY_LENGTH (free text passed to {% tr %}) are
+not held; lookup() returns None for them and callers fall back to the
+TTL cache / DB path.
+"""
+
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models.functions import Length
+
+from .conf import (
+    CATALOG_MAX_KEY_LENGTH,
+    CATALOG_VERSION_CHECK_SECONDS,
+    PRELOAD_CATALOG,
+    get_supported_language_codes,
+)
+from ..models import Translation
+
+logger = logging.getLogger("data.translation.snapshot")
+
+VERSION_KEY = "translation-catalog:version"
+RESET_KEY = "translation-catalog:reset"
+
+# Overlap for the delta query: rows saved around the previous load by
+# another process may carry a slightly earlier updated_at
+DELTA_OVERLAP = timedelta(seconds=5)
+
+
+# ============================
+# Version counters
+# ============================
+
+def _bump(key: str) -> None:
+    """
+    A new generation value rather than cache.incr: on DatabaseCache incr is
+    a non-atomic get + set with the default 5-minute timeout, so concurrent
+    bumps were lost and the counter expired back to 1. Processes only
+    compare for inequality, so any fresh value works.
+    """
+    cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_version() -> None:
+    """Rows were created or changed (saves, bulk writes)."""
+    _bump(VERSION_KEY)
+
+
+def bump_reset() -> None:
+    """Rows were deleted: processes reload the whole catalog."""
+    _bump(RESET_KEY)
+
+
+# ============================
+# Snapshot
+# ============================
+
+class CatalogSnapshot:
+    """
+    source_text → id, and per language source_text → text (non-empty only).
+    Readers do plain dict lookups; loads run under a lock.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self._ids: dict[str, int] = {}
+        self._texts: dict[str, dict[str, str]] = {}
+        self._version = None
+        self._reset = None
+        self._loaded_until = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    # ------------------------------
+    # Reads
+    # ------------------------------
+
+    def lookup(self, source_text: str, lang_code: str) -> tuple[int | None, str | None] | None:
+        """
+        (id, text) for a key; (None, None) if there is no such row;
+        None if the snapshot cannot answer (not loaded / long key).
+        """
+        if not self.loaded or len(source_text) > CATALOG_MAX_KEY_LENGTH:
+            return None
+        obj_id = self._ids.get(source_text)
+        if obj_id is None:
+            return None, None
+        return obj_id, self._texts.get(lang_code, {}).get(source_text)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    # ------------------------------
+    # Loading
+    # ------------------------------
+
+    def _rows(self, since=None):
+        fields = ["id", "source_text", "updated_at"] + [f"text_{code}" for code in get_supported_language_codes()]
+        rows = (
+            Translation.objects
+            .annotate(key_length=Length("source_text"))
+            .filter(key_length__lte=CATALOG_MAX_KEY_LENGTH)
+        )
+        if since is not None:
+            rows = rows.filter(updated_at__gte=since - DELTA_OVERLAP)
+        return rows.order_by().values_list(*fields).iterator(chunk_size=2000)
+
+    @staticmethod
+    def _apply(rows, ids: dict, texts: dict, latest=None):
+        """Put rows into the dicts; returns the newest updated_at seen."""
+        codes = get_supported_language_codes()
+        for obj_id, source_text, updated_at, *values in rows:
+            ids[source_text] = obj_id
+            for code, value in zip(codes, values):
+                if value:
+                    texts[code][source_text] = value
+                else:
+                    texts[code].pop(source_text, None)
+            if latest is None or updated_at > latest:
+                latest = updated_at
+        return latest
+
+    def load(self) -> None:
+        """Full load; the new dicts replace the old ones at once."""
+        with self._lock:
+            version, reset = self._remote_counters()
+            ids, texts = {}, {code: {} for code in get_supported_language_codes()}
+            self._loaded_until = self._apply(self._rows(), ids, texts)
+            self._ids, self._texts = ids, texts
+            self._version, self._reset = version, reset
+            self._checked_at = time.monotonic()
+            self.loaded = True
+        logger.info("Translation catalog loaded | keys=%d", len(self._ids))
+
+    def refresh(self) -> None:
+        """
+        Cheap freshness check (throttled); reloads changed rows only when
+        another process bumped the version.
+        """
+        if not self.loaded:
+            # Failed loads (DB not ready) are retried at the same pace as version checks
+            if time.monotonic() - self._checked_at >= CATALOG_VERSION_CHECK_SECONDS:
+                self._checked_at = time.monotonic()
+                self.load()
+            return
+        if time.monotonic() - self._checked_at < CATALOG_VERSION_CHECK_SECONDS:
+            return
+
+        with self._lock:
+            if time.monotonic() - self._checked_at < CATALOG_VERSION_CHECK_SECONDS:
+                return
+            self._checked_at = time.monotonic()
+            version, reset = self._remote_counters()
+            if reset != self._reset:
+                full = True
+            elif version != self._version:
+                full = False
+                self._loaded_until = self._apply(
+                    self._rows(self._loaded_until), self._ids, self._texts, self._loaded_until
+                )
+                self._version = version
+            else:
+                return
+
+        if full:
+            self.load()
+
+    def remember(self, obj: Translation) -> None:
+        """Apply a row saved by this process right away (others get it via the version)."""
+        if self.loaded and len(obj.source_text) <= CATALOG_MAX_KEY_LENGTH:
+            with self._lock:
+                self._ids[obj.source_text] = obj.id
+                for code in get_supported_language_codes():
+                    value = getattr(obj, f"text_{code}", None)
+                    if value:
+                        self._texts[code][obj.source_text] = value
+                    else:
+                        self._texts[code].pop(obj.source_text, None)
+
+    @staticmethod
+    def _remote_counters():
+        counters = cache.get_many([VERSION_KEY, RESET_KEY])
+        return counters.get(VERSION_KEY), counters.get(RESET_KEY)
+
+
+_snapshot = CatalogSnapshot()
+
+
+# ============================
+# Public API
+# ============================
+
+def preload() -> None:
+    """Load the catalog at worker start; errors leave it for lazy loading."""
+    if not PRELOAD_CATALOG:
+        return
+    try:
+        _snapshot.load()
+    except Exception as e:
+        logger.warning("Translation catalog preload failed | error=%s", e)
+
+
+def get_snapshot() -> CatalogSnapshot | None:
+    """The fresh catalog, or None when preloading is disabled or the DB is unavailable."""
+    if not PRELOAD_CATALOG:
+        return None
+    try:
+        _snapshot.refresh()
+    except Exception as e:
+        logger.warning("Translation catalog refresh failed | error=%s", e)
+    return _snapshot if _snapshot.loaded else None
+
+
+def remember(obj: Translation) -> None:
+    _snapshot.remember(obj)
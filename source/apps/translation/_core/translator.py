@@ -1,129 +1,376 @@
 import logging
-import queue
 import threading
 import time
 
-from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
 
 from .active_language_context import get_language
 from .cache import get_from_cache, save_to_cache
 from .conf import (
     DEFAULT_REFERENCE_LANGUAGE,
-    AUTO_COPY_REFERENCE_TEXT,
+    TRANSLATION_BATCH_SIZE,
+    TRANSLATION_CACHE_TTL_SECONDS,
+    TRANSLATION_JOB_POLL_SECONDS,
+    TRANSLATION_MAX_WORKERS,
+    TRANSLATION_WORKER_IDLE_SECONDS,
+    get_translation_tier,
     is_openai_enabled,
 )
-from .openai import generate_translation
+from .jobs import claim, complete, enqueue, extend, fail, has_ready_jobs
+from .openai import generate_translation, generate_translations, tier_cost
+from .rate_limit import wait_for_capacity
+from .registrar import register_keys
+from .snapshot import bump_version, get_snapshot
 from ..models import Translation
 
 logger = logging.getLogger("data.translation.translator")
 
 # ============================
-# Queue and worker state
+# Request and worker state
 # ============================
-
-_task_queue: queue.Queue = queue.Queue()
-_pending_tasks: set[tuple[str, str]] = set()
+#
+# Jobs live in the TranslationJob table (jobs.py): one row per source text
+# and language for the whole cluster, claimed by workers with a lease.
+# Renders only note the request in memory (_outbox); the workers write it
+# to the table before claiming, so a page render never waits on an INSERT.
+#
+# Workers claim up to TRANSLATION_BATCH_SIZE jobs of one language per
+# round (one OpenAI call for single-tier strings; see TRANSLATION_TIER_RULES),
+# paced by the token buckets in rate_limit.py. Strings of the other tiers
+# take several calls each: they are stored and completed one at a time, and
+# the lease on the rest is renewed before each, so a slow batch never
+# outlives its lease and gets translated twice. A worker that claims a full
+# batch starts another one (up to TRANSLATION_MAX_WORKERS); workers that
+# find nothing for TRANSLATION_WORKER_IDLE_SECONDS exit.
+
+_outbox: dict[tuple[str, str], int] = {}        # (source_text, lang) → row id, not enqueued yet
+_requested: dict[tuple[str, str], float] = {}   # (source_text, lang) → when this process last asked
 _pending_lock = threading.Lock()
+_wakeup = threading.Event()
+
+_workers_lock = threading.Lock()
+_worker_count = 0
 
-WORKER_COUNT = 4
-REQUEST_DELAY = 1.2
-CACHE_TTL = 30
+REQUEST_DEDUP_SECONDS = 30
+MAX_REQUESTED = 20_000
 
 
 # ============================
-# Pending flag helpers
+# Worker loop
 # ============================
 
-def _make_task_key(source_text: str, lang_code: str) -> str:
-    """
-    Build cache key for translation pending flag.
+def translate_batch(lang_code: str, obj_ids: list[int]) -> set[int]:
     """
-    return f"translation-pending:{lang_code}:{hash(source_text)}"
+    Translate up to one batch of rows into lang_code and store the results.
+    Single-tier strings share one OpenAI call, others are translated one by
+    one at their tier. Rows already translated (or deleted) are skipped.
 
+    :return: ids of the rows that have a translation now (including the
+             ones that already had it)
+    """
+    field = f"text_{lang_code}"
+    todo, translated = [], set()
+    for obj in Translation.objects.filter(id__in=obj_ids):
+        if getattr(obj, field, None):
+            translated.add(obj.id)
+        else:
+            todo.append(obj)
+    if not todo:
+        return translated
+
+    by_tier: dict[str, list[str]] = {}
+    for obj in todo:
+        by_tier.setdefault(get_translation_tier(obj.source_text), []).append(obj.source_text)
+
+    # Single-tier strings share one call; the other tiers go one by one
+    generated = {}
+    waited = 0.0
+    texts = by_tier.pop("single", [])
+    if texts:
+        waited += wait_for_capacity(texts)
+        generated.update(generate_translations(texts, lang_code))
+
+    for tier, texts in by_tier.items():
+        for text in texts:
+            waited += wait_for_capacity([text], *tier_cost(tier))
+            try:
+                value = generate_translation(text, lang_code, tier=tier)
+            except Exception as e:
+                logger.warning(
+                    "Translation failed | text='%s' | lang='%s' | tier='%s' | error=%s",
+                    text,
+                    lang_code,
+                    tier,
+                    e,
+                )
+                continue
+            if value:
+                generated[text] = value
+
+    now = timezone.now()
+    done = []
+    for obj in todo:
+        value = generated.get(obj.source_text)
+        if value:
+            setattr(obj, field, value)
+            obj.updated_at = now
+            done.append(obj)
+            save_to_cache(obj.source_text, lang_code, value)
+        else:
+            save_to_cache(obj.source_text, lang_code, obj.source_text, shared_ttl=TRANSLATION_CACHE_TTL_SECONDS)
+            logger.warning(
+                "No usable translation | text='%s' | lang='%s'",
+                obj.source_text,
+                lang_code,
+            )
 
-def mark_translation_pending(
-    source_text: str,
-    lang_code: str,
-    ttl: int = CACHE_TTL,
-) -> bool:
-    key = _make_task_key(source_text, lang_code)
-    if cache.get(key) is None:
-        cache.set(key, "1", timeout=ttl)
-        return True
-    return False
-
+    if done:
+        Translation.objects.bulk_update(done, [field, "updated_at"])
+        # bulk_update sends no signals
+        bump_version()
+
+    logger.debug(
+        "Batch translated | lang='%s' | strings=%d | translated=%d | waited=%.2fs",
+        lang_code,
+        len(todo),
+        len(done),
+        waited,
+    )
+    return translated | {obj.id for obj in done}
+
+
+def _flush_outbox() -> None:
+    """Write the requests noted by renders to the job table (one INSERT)."""
+    with _pending_lock:
+        items = [(obj_id, source_text, lang_code) for (source_text, lang_code), obj_id in _outbox.items()]
+        _outbox.clear()
+    if not items:
+        return
+    try:
+        enqueue(items)
+    except Exception as e:
+        # Dropped: the next render that misses the translation asks again
+        with _pending_lock:
+            for _, source_text, lang_code in items:
+                _requested.pop((source_text, lang_code), None)
+        logger.warning("Enqueue failed | jobs=%d | error=%s", len(items), e)
+
+
+def _process_batch(token: str, jobs) -> int:
+    lang_code = jobs[0].lang_code
+    try:
+        translated = translate_batch(lang_code, [job.translation_id for job in jobs])
+    except Exception as e:
+        logger.warning(
+            "Worker failed batch | lang='%s' | strings=%d | error=%s",
+            lang_code,
+            len(jobs),
+            e,
+        )
+        fail(token, jobs, str(e))
+        return 0
+
+    completed = complete(token, [job.id for job in jobs if job.translation_id in translated])
+    failed = [job for job in jobs if job.translation_id not in translated]
+    if failed:
+        fail(token, failed, "No usable translation")
+    return completed
+
+
+def _process(token: str, jobs) -> int:
+    """
+    Single-tier jobs in one batch, then the others one by one under a renewed lease.
+    Returns the number of jobs completed.
+    """
+    single, slow = [], []
+    for job in jobs:
+        (single if get_translation_tier(job.translation.source_text) == "single" else slow).append(job)
 
-def clear_translation_pending(source_text: str, lang_code: str) -> None:
-    cache.delete(_make_task_key(source_text, lang_code))
+    completed = 0
+    if single:
+        completed += _process_batch(token, single)
 
+    for index, job in enumerate(slow):
+        remaining = [other.id for other in slow[index:]]
+        if extend(token, remaining) < len(remaining):
+            logger.warning("Job lease lost | lang='%s' | jobs=%d", job.lang_code, len(remaining))
+            break
+        completed += _process_batch(token, [job])
+    return completed
 
-# ============================
-# Worker loop
-# ============================
 
 def _worker_loop() -> None:
+    global _worker_count
+
+    idle_since = time.monotonic()
     while True:
         try:
-            source_text, lang_code, obj_id = _task_queue.get()
-            try:
-                time.sleep(REQUEST_DELAY)
-
-                obj = Translation.objects.get(id=obj_id)
-                obj.refresh_from_db()
-
-                # already filled
-                if getattr(obj, f"text_{lang_code}", None):
-                    continue
-
-                generated = generate_translation(source_text, lang_code)
-
-                if generated:
-                    setattr(obj, f"text_{lang_code}", generated)
-                    obj.save(update_fields=[f"text_{lang_code}"])
-                    save_to_cache(source_text, lang_code, generated)
-                    logger.debug(
-                        "Background translated | text='%s' | lang='%s'",
-                        source_text,
-                        lang_code,
-                    )
-                else:
-                    save_to_cache(source_text, lang_code, source_text)
-                    logger.warning(
-                        "No usable translation | text='%s' | lang='%s'",
-                        source_text,
-                        lang_code,
-                    )
+            _flush_outbox()
+            claimed = claim(TRANSLATION_BATCH_SIZE)
+        except Exception as e:
+            logger.warning("Job claim failed | error=%s", e)
+            claimed = None
+
+        if claimed is None:
+            close_old_connections()
+            if time.monotonic() - idle_since >= TRANSLATION_WORKER_IDLE_SECONDS:
+                with _workers_lock:
+                    # Re-check under the lock: a request may have arrived meanwhile
+                    if not _outbox:
+                        _worker_count -= 1
+                        return
+            _wakeup.wait(TRANSLATION_JOB_POLL_SECONDS)
+            _wakeup.clear()
+            continue
 
-            except Exception as e:
-                logger.warning(
-                    "Worker failed task | text='%s' | lang='%s' | error=%s",
-                    source_text,
-                    lang_code,
-                    e,
-                )
-            finally:
-                clear_translation_pending(source_text, lang_code)
-                with _pending_lock:
-                    _pending_tasks.discard((source_text, lang_code))
-                _task_queue.task_done()
+        token, jobs = claimed
+        if len(jobs) == TRANSLATION_BATCH_SIZE:
+            # Probably more waiting: let another worker take the next batch
+            _start_workers(_worker_count + 1)
 
-        except Exception:
-            continue
+        try:
+            _process(token, jobs)
+        except Exception as e:
+            # Lease expires and the jobs are claimed again
+            logger.warning("Job bookkeeping failed | jobs=%d | error=%s", len(jobs), e)
+
+        idle_since = time.monotonic()
+        close_old_connections()
 
 
 # ============================
 # Worker initialization
 # ============================
 
-_workers_started = False
+def _start_workers(wanted: int = 1) -> None:
+    """Grow the pool to `wanted` workers (at most TRANSLATION_MAX_WORKERS)."""
+    global _worker_count
 
-
-def _start_workers() -> None:
-    global _workers_started
-    if not _workers_started:
-        for _ in range(WORKER_COUNT):
+    wanted = min(TRANSLATION_MAX_WORKERS, wanted)
+    with _workers_lock:
+        while _worker_count < wanted:
             threading.Thread(target=_worker_loop, daemon=True).start()
-        _workers_started = True
+            _worker_count += 1
+
+
+def resume_translation_jobs() -> None:
+    """
+    Start a worker when the job table has ready jobs (left by a restart
+    or another process). Called when the worker process starts.
+    """
+    if not is_openai_enabled():
+        return
+    try:
+        if has_ready_jobs():
+            _start_workers()
+    except Exception as e:
+        logger.warning("Translation jobs resume failed | error=%s", e)
+
+
+def process_next_batch() -> tuple[str, int, int] | None:
+    """
+    Claim one batch of ready jobs and process it in the calling thread.
+
+    :return: (lang_code, jobs, completed) or None when no job is ready
+    """
+    claimed = claim(TRANSLATION_BATCH_SIZE)
+    if claimed is None:
+        return None
+    token, jobs = claimed
+    return jobs[0].lang_code, len(jobs), _process(token, jobs)
+
+
+def drain_translation_jobs() -> int:
+    """
+    Process ready jobs in the calling thread until none is left
+    (management command). Returns the number of jobs processed.
+    """
+    processed = 0
+    _flush_outbox()
+    while (batch := process_next_batch()) is not None:
+        processed += batch[1]
+    return processed
+
+
+# ============================
+# OpenAI request
+# ============================
+
+def request_translation(
+    obj_id: int,
+    source_text: str,
+    lang_code: str,
+    fast: bool = True,
+) -> str:
+    """
+    Translate a key that has no stored value for lang_code.
+
+    fast=True queues a background task and returns source_text at once;
+    fast=False blocks on OpenAI and saves the result.
+    Without OpenAI the key is returned as-is.
+    """
+    if not is_openai_enabled():
+        return source_text
+
+    # Fast mode → background
+    if fast:
+        task_key = (source_text, lang_code)
+        now = time.monotonic()
+
+        with _pending_lock:
+            requested_at = _requested.get(task_key)
+            if requested_at is not None and now - requested_at < REQUEST_DEDUP_SECONDS:
+                logger.debug(
+                    "Duplicate task skipped | text='%s' | lang='%s'",
+                    source_text,
+                    lang_code,
+                )
+                return source_text
+            if len(_requested) >= MAX_REQUESTED:
+                _requested.clear()
+            _requested[task_key] = now
+            _outbox[task_key] = obj_id
+
+        _start_workers()
+        _wakeup.set()
+        logger.debug(
+            "Task queued | text='%s' | lang='%s'",
+            source_text,
+            lang_code,
+        )
+        return source_text
+
+    # Slow mode → blocking
+    try:
+        tier = get_translation_tier(source_text)
+        wait_for_capacity([source_text], *tier_cost(tier))
+        generated = generate_translation(source_text, lang_code, tier=tier)
+
+        if generated:
+            obj = Translation.objects.get(id=obj_id)
+            setattr(obj, f"text_{lang_code}", generated)
+            obj.save(update_fields=[f"text_{lang_code}", "updated_at"])
+            save_to_cache(source_text, lang_code, generated)
+            return generated
+
+        save_to_cache(source_text, lang_code, source_text, shared_ttl=TRANSLATION_CACHE_TTL_SECONDS)
+        logger.warning(
+            "Generated empty translation | text='%s' | lang='%s'",
+            source_text,
+            lang_code,
+        )
+        return source_text
+
+    except Exception as e:
+        logger.warning(
+            "Translation failed | text='%s' | lang='%s' | error=%s",
+            source_text,
+            lang_code,
+            e,
+        )
+        save_to_cache(source_text, lang_code, source_text, shared_ttl=TRANSLATION_CACHE_TTL_SECONDS)
+        return source_text
 
 
 # ============================
@@ -144,15 +391,28 @@ def get_translate(
     # Reference language
     # ------------------------------
     if lang_code == DEFAULT_REFERENCE_LANGUAGE and is_default_lang:
-        obj, _ = Translation.objects.get_or_create(source_text=source_text)
-        ref_field = f"text_{DEFAULT_REFERENCE_LANGUAGE}"
-
-        if AUTO_COPY_REFERENCE_TEXT and not getattr(obj, ref_field, None):
-            setattr(obj, ref_field, source_text)
-            obj.save(update_fields=[ref_field])
-
+        # No DB access: the row is created by the buffered registrar
+        register_keys([source_text])
         return source_text
 
+    # ------------------------------
+    # Preloaded catalog
+    # ------------------------------
+    snapshot = get_snapshot()
+    hit = snapshot.lookup(source_text, lang_code) if snapshot else None
+    if hit is not None:
+        obj_id, value = hit
+        if value:
+            return value
+        if obj_id is None:
+            register_keys([source_text])
+            return source_text
+        # Translated by another process after the last catalog refresh
+        cached = get_from_cache(source_text, lang_code)
+        if cached:
+            return cached
+        return request_translation(obj_id, source_text, lang_code, fast)
+
     # ------------------------------
     # Cache
     # ------------------------------
@@ -163,7 +423,11 @@ def get_translate(
     # ------------------------------
     # Database
     # ------------------------------
-    obj, _ = Translation.objects.get_or_create(source_text=source_text)
+    obj = Translation.objects.filter(source_text=source_text).first()
+    if obj is None:
+        register_keys([source_text])
+        return source_text
+
     value = getattr(obj, f"text_{lang_code}", None)
 
     if value:
@@ -171,63 +435,6 @@ def get_translate(
         return value
 
     # ------------------------------
-    # OpenAI
-    # ------------------------------
-    if is_openai_enabled():
-
-        # Fast mode → background
-        if fast:
-            _start_workers()
-
-            task_key = (source_text, lang_code)
-
-            with _pending_lock:
-                if task_key not in _pending_tasks:
-                    if mark_translation_pending(source_text, lang_code):
-                        _pending_tasks.add(task_key)
-                        _task_queue.put((source_text, lang_code, obj.id))
-                        logger.debug(
-                            "Task queued | text='%s' | lang='%s'",
-                            source_text,
-                            lang_code,
-                        )
-                else:
-                    logger.debug(
-                        "Duplicate task skipped | text='%s' | lang='%s'",
-                        source_text,
-                        lang_code,
-                    )
-
-            return source_text
-
-        # Slow mode → blocking
-        try:
-            generated = generate_translation(source_text, lang_code)
-
-            if generated:
-                setattr(obj, f"text_{lang_code}", generated)
-                obj.save(update_fields=[f"text_{lang_code}"])
-                save_to_cache(source_text, lang_code, generated)
-                return generated
-
-            save_to_cache(source_text, lang_code, source_text)
-            logger.warning(
-                "Generated empty translation | text='%s' | lang='%s'",
-                source_text,
-                lang_code,
-            )
-            return source_text
-
-        except Exception as e:
-            logger.warning(
-                "Translation failed | text='%s' | lang='%s' | error=%s",
-                source_text,
-                lang_code,
-                e,
-            )
-            save_to_cache(source_text, lang_code, source_text)
-
-    # ------------------------------
-    # Fallback
+    # OpenAI / fallback
     # ------------------------------
-    return source_text
+    return request_translation(obj.id, source_text, lang_code, fast)
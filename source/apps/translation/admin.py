@@ -4,8 +4,9 @@ from django.http import HttpResponse
 from django.contrib import admin
 from django.conf import settings
 
-from .models import Translation
+from .models import Translation, TranslationJob
 from ._core.conf import SUPPORTED_LANGUAGES
+from ._core.jobs import retry_dead
 
 
 @admin.register(Translation)
@@ -57,3 +58,31 @@ class TranslationAdmin(admin.ModelAdmin):
             writer.writerow(row)
 
         return response
+
+
+@admin.register(TranslationJob)
+class TranslationJobAdmin(admin.ModelAdmin):
+    """
+    Background translation jobs (read-only).
+
+    Features:
+    - Filter by status / language to find dead jobs.
+    - Action to give dead jobs a fresh set of attempts.
+    """
+
+    list_display = ["id", "translation", "lang_code", "status", "attempts", "available_at", "last_error"]
+    list_filter = ["status", "lang_code"]
+    search_fields = ["translation__source_text", "content_hash"]
+    list_select_related = ["translation"]
+    ordering = ["-updated_at"]
+    actions = ["retry_dead_jobs"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description="Retry all dead jobs")
+    def retry_dead_jobs(self, request, queryset):
+        self.message_user(request, f"Jobs requeued: {retry_dead()}")
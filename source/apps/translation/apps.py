@@ -5,3 +5,6 @@ class TranslationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.translation"
     verbose_name = "Переводы"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,146 @@
+import random
+import statistics
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.management.base import BaseCommand
+
+from apps.translation._core.cache import StripedCache
+from apps.translation._core.conf import (
+    TRANSLATION_CACHE_MAX_BYTES,
+    TRANSLATION_CACHE_MAX_ENTRIES,
+    TRANSLATION_CACHE_STRIPES,
+    TRANSLATION_CACHE_SWEEP_SECONDS,
+    get_supported_language_codes,
+)
+from apps.translation.models import Translation
+
+
+TTL = 60 * 60
+
+
+class GlobalLockCache:
+    """
+    Прежний L1: строгий LRU (OrderedDict.move_to_end на каждом чтении)
+    под одним threading.Lock на чтение и запись.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, lang_code, now):
+        cache_key = (key, lang_code)
+        with self._lock:
+            item = self._items.get(cache_key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if now > expires_at:
+                del self._items[cache_key]
+                return None
+            self._items.move_to_end(cache_key)
+            return value
+
+    def set(self, key, lang_code, value, ttl):
+        with self._lock:
+            self._items[(key, lang_code)] = (value, time.time() + ttl)
+            self._items.move_to_end((key, lang_code))
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарк кеша переводов: пропускная способность L1 при N потоках, "
+        "один глобальный lock против полосатого кеша с чтением без блокировок"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", default="1,2,4,8,16")
+        parser.add_argument("--seconds", type=float, default=2.0)
+        parser.add_argument("--keys", type=int, default=400, help="Ключей, если в БД переводов меньше")
+        parser.add_argument("--write-ratio", type=float, default=0.02)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        keys = self._keys(options["keys"])
+        languages = get_supported_language_codes()
+        threads = [int(n) for n in options["threads"].split(",")]
+
+        self.stdout.write(self.style.NOTICE(
+            f"\n=== {len(keys)} ключей × {len(languages)} языков, "
+            f"записей {options['write_ratio']:.0%}, {options['seconds']} с на прогон ===\n"
+        ))
+        self.stdout.write(f"{'потоков':>8} {'global lock':>14} {'striped':>14} {'ускорение':>10}  (тыс. операций/с)")
+
+        for count in threads:
+            results = {}
+            for name, factory in (
+                ("global", lambda: GlobalLockCache(TRANSLATION_CACHE_MAX_ENTRIES)),
+                ("striped", lambda: StripedCache(
+                    TRANSLATION_CACHE_MAX_ENTRIES,
+                    TRANSLATION_CACHE_MAX_BYTES,
+                    TRANSLATION_CACHE_SWEEP_SECONDS,
+                    stripes=TRANSLATION_CACHE_STRIPES,
+                )),
+            ):
+                runs = [
+                    self._run(factory(), keys, languages, count, options)
+                    for _ in range(options["repeat"])
+                ]
+                results[name] = statistics.median(runs)
+
+            self.stdout.write(
+                f"{count:>8} {results['global'] / 1000:>14.0f} {results['striped'] / 1000:>14.0f} "
+                f"{results['striped'] / results['global']:>9.2f}x"
+            )
+
+    def _keys(self, minimum: int) -> list[str]:
+        """Реальные ключи из БД, дополненные синтетическими до minimum."""
+        keys = list(Translation.objects.values_list("source_text", flat=True)[:5000])
+        keys += [f"Синтетический ключ интерфейса {i}" for i in range(max(0, minimum - len(keys)))]
+        return keys
+
+    def _run(self, cache, keys, languages, threads_count, options) -> float:
+        for key in keys:
+            for lang in languages:
+                cache.set(key, lang, f"{key} [{lang}]", TTL)
+
+        stop = threading.Event()
+        barrier = threading.Barrier(threads_count + 1)
+        counts = [0] * threads_count
+
+        # Частота ключей как на страницах: немногие строки шаблонов — в каждом рендере
+        weights = [1 / (rank + 1) for rank in range(len(keys))]
+
+        def worker(index: int) -> None:
+            rng = random.Random(options["seed"] + index)
+            sample = rng.choices(keys, weights=weights, k=4096)
+            write_ratio = options["write_ratio"]
+            operations = 0
+            barrier.wait()
+            while not stop.is_set():
+                now = time.time()
+                for key in sample:
+                    lang = languages[operations % len(languages)]
+                    if rng.random() < write_ratio:
+                        cache.set(key, lang, key, TTL)
+                    else:
+                        cache.get(key, lang, now)
+                    operations += 1
+            counts[index] = operations
+
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads_count)]
+        for thread in workers:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        time.sleep(options["seconds"])
+        stop.set()
+        for thread in workers:
+            thread.join()
+        return sum(counts) / (time.perf_counter() - started)
@@ -0,0 +1,147 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.translation._core.conf import (
+    DEFAULT_REFERENCE_LANGUAGE,
+    TRANSLATION_BATCH_SIZE,
+    TRANSLATION_TIERS,
+    get_supported_language_codes,
+    get_translation_tier,
+    is_openai_enabled,
+)
+from apps.translation._core.openai import (
+    TranslationUsage,
+    generate_translation,
+    generate_translations,
+    tier_cost,
+)
+from apps.translation._core.rate_limit import wait_for_capacity
+from apps.translation.models import Translation
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарк уровней качества перевода на реальных ключах: задержка, "
+        "число вызовов и токены на строку (single, candidates, full, "
+        "пакетный single и текущие правила TRANSLATION_TIER_RULES). В БД ничего не пишет"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--language", default="", help="Язык перевода (по умолчанию первый неэталонный)")
+        parser.add_argument("--sample", type=int, default=20, help="Ключей из таблицы переводов")
+        parser.add_argument("--tiers", default=",".join(TRANSLATION_TIERS))
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if not is_openai_enabled():
+            raise CommandError("OPENAI_KEY не задан: бенчмарк делает реальные запросы к OpenAI")
+
+        targets = [code for code in get_supported_language_codes() if code != DEFAULT_REFERENCE_LANGUAGE]
+        lang_code = options["language"] or targets[0]
+        if lang_code not in targets:
+            raise CommandError(f"Язык должен быть одним из: {', '.join(targets)}")
+
+        tiers = [tier.strip() for tier in options["tiers"].split(",") if tier.strip()]
+        unknown = [tier for tier in tiers if tier not in TRANSLATION_TIERS]
+        if unknown:
+            raise CommandError(f"Неизвестные уровни: {', '.join(unknown)}")
+
+        keys = list(Translation.objects.order_by("id").values_list("source_text", flat=True))
+        if not keys:
+            raise CommandError("Таблица переводов пуста — сначала выполните pretranslate")
+        keys = random.Random(options["seed"]).sample(keys, min(options["sample"], len(keys)))
+
+        by_rule = {tier: sum(1 for key in keys if get_translation_tier(key) == tier) for tier in TRANSLATION_TIERS}
+        self.stdout.write(self.style.NOTICE(
+            f"\n=== {len(keys)} ключей → {lang_code}; по правилам: "
+            + ", ".join(f"{tier} {count}" for tier, count in by_rule.items())
+            + " ===\n"
+        ))
+
+        results, outputs = {}, {}
+        for tier in tiers:
+            outputs[tier], results[tier] = self._run_tier(keys, lang_code, tier)
+        outputs["rules"], results["rules"] = self._run_tier(keys, lang_code, None)
+        outputs["single-batch"], results["single-batch"] = self._run_batch(keys, lang_code)
+
+        self.stdout.write(
+            f"\n{'уровень':>13} {'вызовов':>8} {'мс p50':>8} {'мс p95':>8} "
+            f"{'вх. ток.':>9} {'вых. ток.':>10} {'пусто':>6} {'= full':>7}   (на строку)"
+        )
+        for name, row in results.items():
+            if "full" in outputs and name != "full":
+                same = sum(
+                    1 for key in keys
+                    if outputs[name].get(key) and outputs[name].get(key) == outputs["full"].get(key)
+                )
+                agreement = f"{same / len(keys):.0%}"
+            else:
+                agreement = "—"
+            self.stdout.write(
+                f"{name:>13} {row['calls'] / len(keys):>8.2f} {row['p50']:>8.0f} {row['p95']:>8.0f} "
+                f"{row['prompt'] / len(keys):>9.0f} {row['completion'] / len(keys):>10.0f} "
+                f"{row['empty']:>6} {agreement:>7}"
+            )
+
+        self.stdout.write(
+            "\nЗадержка — время ответа без ожидания лимитов; для single-batch это время пакета "
+            f"из {TRANSLATION_BATCH_SIZE} строк, делённое на число строк в нём."
+        )
+        self.stdout.write(self.style.SUCCESS("\nГотово!\n"))
+
+    def _run_tier(self, keys, lang_code, tier):
+        """Строка за строкой; tier=None — уровень по правилам для каждого ключа."""
+        usage = TranslationUsage()
+        timings, outputs, empty = [], {}, 0
+
+        for key in keys:
+            key_tier = tier or get_translation_tier(key)
+            wait_for_capacity([key], *tier_cost(key_tier))
+            started = time.perf_counter()
+            try:
+                value = generate_translation(key, lang_code, tier=key_tier, usage=usage)
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"  {tier or 'rules'}: ошибка на «{key[:40]}»: {e}"))
+                value = None
+            timings.append((time.perf_counter() - started) * 1000)
+            if value:
+                outputs[key] = value
+            else:
+                empty += 1
+
+        self.stdout.write(f"  {tier or 'rules':>12}: {sum(timings) / 1000:.1f} с")
+        return outputs, self._row(usage, timings, empty)
+
+    def _run_batch(self, keys, lang_code):
+        """Пакетный single, как в фоновых воркерах и pretranslate."""
+        usage = TranslationUsage()
+        timings, outputs = [], {}
+
+        for start in range(0, len(keys), TRANSLATION_BATCH_SIZE):
+            batch = keys[start:start + TRANSLATION_BATCH_SIZE]
+            wait_for_capacity(batch)
+            started = time.perf_counter()
+            try:
+                outputs.update(generate_translations(batch, lang_code, usage))
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"  single-batch: ошибка пакета: {e}"))
+            per_string = (time.perf_counter() - started) * 1000 / len(batch)
+            timings += [per_string] * len(batch)
+
+        self.stdout.write(f"  {'single-batch':>12}: {sum(timings) / 1000:.1f} с")
+        return outputs, self._row(usage, timings, len(keys) - len(outputs))
+
+    @staticmethod
+    def _row(usage, timings, empty):
+        ordered = sorted(timings)
+        return {
+            "calls": usage.calls,
+            "p50": statistics.median(ordered),
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "prompt": usage.prompt_tokens,
+            "completion": usage.completion_tokens,
+            "empty": empty,
+        }
@@ -0,0 +1,103 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from apps.translation._core.conf import (
+    DEFAULT_REFERENCE_LANGUAGE,
+    TRANSLATION_MAX_WORKERS,
+    get_supported_language_codes,
+    is_openai_enabled,
+)
+from apps.translation._core.pretranslate import (
+    collect_choice_labels,
+    collect_template_keys,
+    missing_rows,
+    pretranslate,
+    register_catalog_keys,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Сбор ключей {% tr \"...\" %} из шаблонов и подписей choices моделей, "
+        "регистрация одной массовой вставкой и предварительный перевод недостающего "
+        "на все языки (для запуска при деплое)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--languages", default="", help="Через запятую; по умолчанию все SUPPORTED_LANGUAGES")
+        parser.add_argument("--workers", type=int, default=TRANSLATION_MAX_WORKERS, help="Параллельных пакетов")
+        parser.add_argument("--all", action="store_true", help="Переводить все строки таблицы, а не только найденные ключи")
+        parser.add_argument("--dry-run", action="store_true", help="Только показать, что будет зарегистрировано и переведено")
+
+    def handle(self, *args, **options):
+        supported = get_supported_language_codes()
+        languages = [code.strip() for code in options["languages"].split(",") if code.strip()] or supported
+        unknown = [code for code in languages if code not in supported]
+        if unknown:
+            raise CommandError(f"Неизвестные языки: {', '.join(unknown)}")
+        # Текст эталонного языка — сам ключ
+        languages = [code for code in languages if code != DEFAULT_REFERENCE_LANGUAGE]
+
+        self.stdout.write(self.style.NOTICE("\n=== Предварительный перевод каталога ===\n"))
+
+        # ---------- Ключи ----------
+        template_keys, errors = collect_template_keys()
+        choice_labels = collect_choice_labels()
+        keys = template_keys | choice_labels
+
+        self.stdout.write(f"Ключей из шаблонов:   {len(template_keys)}")
+        self.stdout.write(f"Подписей choices:     {len(choice_labels)}")
+        for name, error in errors.items():
+            self.stdout.write(self.style.WARNING(f"  шаблон {name} не скомпилирован: {error}"))
+
+        scope = None if options["all"] else keys
+
+        if options["dry_run"]:
+            self.stdout.write(f"\nБудет переведено ({'вся таблица' if scope is None else 'найденные ключи'}):")
+            for lang_code in languages:
+                self.stdout.write(f"  {lang_code}: {len(missing_rows(lang_code, scope))} строк без перевода")
+            self.stdout.write(self.style.SUCCESS("\nПробный прогон, изменений нет.\n"))
+            return
+
+        # ---------- Регистрация ----------
+        try:
+            created = register_catalog_keys(keys)
+        except DatabaseError as e:
+            raise CommandError(f"Ключи не зарегистрированы: {e}")
+        self.stdout.write(f"Новых ключей в БД:    {created}")
+
+        # ---------- Перевод ----------
+        if not is_openai_enabled():
+            for lang_code in languages:
+                self.stdout.write(f"  {lang_code}: {len(missing_rows(lang_code, scope))} строк без перевода")
+            self.stdout.write(self.style.WARNING("\nOPENAI_KEY не задан — перевод пропущен.\n"))
+            return
+
+        def on_batch(lang_code, strings, translated):
+            style = self.style.WARNING if translated < strings else str
+            self.stdout.write(style(f"  {lang_code}: пакет {translated}/{strings}"))
+
+        self.stdout.write(f"\nПеревод пакетами, параллельно {options['workers']}:")
+        started = time.perf_counter()
+        stats = pretranslate(scope, languages, options["workers"], on_batch)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"\n{'язык':>6} {'не было':>9} {'переведено':>11} {'ошибок':>8} {'осталось':>9}")
+        remaining = 0
+        for lang_code, row in stats.items():
+            left = len(missing_rows(lang_code, scope))
+            remaining += left
+            self.stdout.write(
+                f"{lang_code:>6} {row['missing']:>9} {row['translated']:>11} {row['failed']:>8} {left:>9}"
+            )
+        self.stdout.write(f"\nВремя: {elapsed:.2f} с")
+
+        if remaining:
+            self.stdout.write(self.style.WARNING(
+                f"\nБез перевода осталось {remaining} строк — повторите запуск "
+                f"(задачи, исчерпавшие попытки: translation_jobs --retry-dead).\n"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("\nКаталог полностью переведён.\n"))
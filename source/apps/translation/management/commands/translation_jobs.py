@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.translation._core.conf import is_openai_enabled
+from apps.translation._core.jobs import job_stats, retry_dead
+from apps.translation._core.translator import drain_translation_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Очередь фоновых переводов (таблица TranslationJob): статистика по статусам, "
+        "повтор «мёртвых» задач и выполнение готовых задач в текущем процессе"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--retry-dead", action="store_true", help="Вернуть задачи со статусом dead в очередь")
+        parser.add_argument("--drain", action="store_true", help="Выполнить все готовые задачи и выйти")
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("\n=== Очередь переводов ===\n"))
+
+        if options["retry_dead"]:
+            self.stdout.write(f"Возвращено в очередь:  {retry_dead()}")
+
+        if options["drain"]:
+            if not is_openai_enabled():
+                self.stdout.write(self.style.WARNING("OPENAI_KEY не задан — выполнение пропущено."))
+            else:
+                started = time.perf_counter()
+                processed = drain_translation_jobs()
+                self.stdout.write(f"Выполнено задач:       {processed} за {time.perf_counter() - started:.2f} с")
+
+        self.stdout.write("")
+        for status, count in job_stats().items():
+            self.stdout.write(f"{status:>10}: {count}")
+        self.stdout.write(self.style.SUCCESS("\nГотово!\n"))
@@ -47,7 +47,9 @@ class CustomLocaleMiddleware:
         if len(path_parts) > 1 and path_parts[1] in self.supported_codes:
             lang = path_parts[1]
             request.path_info = "/" + "/".join(path_parts[2:])
-            request.session["django_language"] = lang
+            # Запись только при смене языка: иначе сессия сохранялась бы на каждый запрос
+            if request.session.get("django_language") != lang:
+                request.session["django_language"] = lang
         else:
             lang = request.session.get("django_language", DEFAULT_LANGUAGE_STARTUP)
             if not request.path.startswith(self.excluded_prefixes):
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 23:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translation', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='translation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Last updated at'),
+        ),
+    ]
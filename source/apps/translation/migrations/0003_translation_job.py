@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-18 23:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translation', '0002_translation_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='SHA-256 of source text')),
+                ('lang_code', models.CharField(max_length=10, verbose_name='Language')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает'), ('running', 'Выполняется'), ('done', 'Готово'), ('dead', 'Не удалось')], default='pending', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('available_at', models.DateTimeField(verbose_name='Available at')),
+                ('leased_by', models.CharField(blank=True, max_length=32, null=True, verbose_name='Lease token')),
+                ('lease_until', models.DateTimeField(blank=True, null=True, verbose_name='Lease until')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Last error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Last updated at')),
+                ('translation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='translation.translation', verbose_name='Translation')),
+            ],
+            options={
+                'verbose_name': 'Задача перевода',
+                'verbose_name_plural': 'Задачи перевода',
+                'indexes': [models.Index(fields=['status', 'available_at'], name='translation_job_ready_idx')],
+                'constraints': [models.UniqueConstraint(fields=('content_hash', 'lang_code'), name='translation_job_unique_content_lang')],
+            },
+        ),
+    ]
@@ -11,6 +11,7 @@ class Translation(models.Model):
     )
     updated_at = models.DateTimeField(
         auto_now=True,
+        db_index=True,
         verbose_name="Last updated at",
     )
 
@@ -32,3 +33,93 @@ for lang in SUPPORTED_LANGUAGES:
             blank=True,
         ),
     )
+
+
+class TranslationJob(models.Model):
+    """
+    One background translation of a row into one language.
+
+    Unique per (content_hash, lang_code): every process enqueues the same
+    job row, and a worker claims it with a time-limited lease, so a missing
+    translation is generated once across all workers.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    DEAD = "dead"
+
+    STATUSES = [
+        (PENDING, "Ожидает"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Готово"),
+        (DEAD, "Не удалось"),
+    ]
+
+    translation = models.ForeignKey(
+        Translation,
+        on_delete=models.CASCADE,
+        related_name="jobs",
+        verbose_name="Translation",
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        verbose_name="SHA-256 of source text",
+    )
+    lang_code = models.CharField(
+        max_length=10,
+        verbose_name="Language",
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name="Status",
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Attempts",
+    )
+    available_at = models.DateTimeField(
+        verbose_name="Available at",
+    )
+    leased_by = models.CharField(
+        max_length=32,
+        null=True,
+        blank=True,
+        verbose_name="Lease token",
+    )
+    lease_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Lease until",
+    )
+    last_error = models.TextField(
+        blank=True,
+        default="",
+        verbose_name="Last error",
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Created at",
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Last updated at",
+    )
+
+    class Meta:
+        verbose_name = "Задача перевода"
+        verbose_name_plural = "Задачи перевода"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_hash", "lang_code"],
+                name="translation_job_unique_content_lang",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["status", "available_at"], name="translation_job_ready_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.lang_code}: {self.content_hash[:12]} [{self.status}]"
@@ -0,0 +1,54 @@
+"""
+Translation model signals.
+
+Any saved / deleted Translation (admin edits, background worker) bumps
+the shared catalog version after commit, so every process picks the
+change up on its next version check. The saving process applies the row
+to its own catalog in the same callback: before commit a rolled-back row
+would stay in the catalog, since its updated_at never reaches the DB for
+the delta reload to notice.
+
+After commit the row's values are also written through to the value
+cache (both tiers) and its empty languages are dropped from it: keys the
+catalog does not hold (longer than CATALOG_MAX_KEY_LENGTH) are answered
+from the cache, and a translation cleared to force regeneration must
+miss there to be requested again.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ._core.cache import delete_from_cache, save_to_cache
+from ._core.conf import get_supported_language_codes
+from ._core.snapshot import bump_reset, bump_version, remember
+from .models import Translation
+
+
+def _saved(instance: Translation) -> None:
+    remember(instance)
+    bump_version()
+    _write_through(instance)
+
+
+def _write_through(instance: Translation) -> None:
+    cleared = []
+    for code in get_supported_language_codes():
+        value = getattr(instance, f"text_{code}", None)
+        if value:
+            save_to_cache(instance.source_text, code, value)
+        else:
+            cleared.append(code)
+    if cleared:
+        delete_from_cache(instance.source_text, cleared)
+
+
+@receiver(post_save, sender=Translation)
+def translation_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: _saved(instance))
+
+
+@receiver(post_delete, sender=Translation)
+def translation_deleted(sender, instance, **kwargs):
+    transaction.on_commit(bump_reset)
+    transaction.on_commit(lambda: delete_from_cache(instance.source_text, get_supported_language_codes()))
@@ -3,7 +3,7 @@ from django.urls import reverse
 from django.utils.safestring import mark_safe
 
 from .._core.active_language_context import get_language
-from .._core.translator import get_translate
+from .._core.catalog import render_catalog
 
 register = template.Library()
 
@@ -21,8 +21,8 @@ def url(view_name: str, *args, **kwargs) -> str:
     return f"/{lang}{base_url}"
 
 
-@register.simple_tag
-def tr(key: str, force: bool = False) -> str:
+@register.simple_tag(takes_context=True)
+def tr(context, key: str, force: bool = False) -> str:
     """
     Translate a string key into the current active language.
 
@@ -32,6 +32,10 @@ def tr(key: str, force: bool = False) -> str:
           is the default reference language.
         - False → return key as-is when current language == default.
 
+    Keys are resolved through the render-scoped catalog: all keys known
+    for the template are loaded with one query on the first {% tr %},
+    the rest of the render is served from memory.
+
     The result is marked safe for HTML rendering.
 
     Examples:
@@ -39,6 +43,7 @@ def tr(key: str, force: bool = False) -> str:
         {% tr "Submit" True %}  → forces translation lookup
     """
     try:
-        return mark_safe(get_translate(key, is_default_lang=not force))
+        catalog = render_catalog(context, tr)
+        return mark_safe(catalog.translate(key, is_default_lang=not force))
     except Exception as exc:
         return f"[translation error: {exc}]"
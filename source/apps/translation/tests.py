@@ -0,0 +1,247 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from ._core import jobs, translator
+from ._core.pretranslate import pretranslate
+from ._core.cache import _shared_key, get_from_cache, get_shared_tier, invalidate_cache
+from ._core.conf import TRANSLATION_JOB_MAX_ATTEMPTS
+from .models import Translation, TranslationJob
+
+
+class TranslationJobQueueTests(TestCase):
+    """Durable job queue (_core/jobs.py)."""
+
+    def setUp(self):
+        self.rows = [Translation.objects.create(source_text=f"Key {i}") for i in range(4)]
+
+    def _enqueue(self, rows, lang_code="en"):
+        jobs.enqueue([(row.id, row.source_text, lang_code) for row in rows])
+
+    def _make_ready(self):
+        """Skip the backoff delay."""
+        TranslationJob.objects.filter(status=TranslationJob.PENDING).update(available_at=timezone.now())
+
+    def test_enqueue_deduplicates_repeated_calls(self):
+        self._enqueue(self.rows[:1] * 2)
+        self._enqueue(self.rows[:1])
+        self._enqueue(self.rows[:1], lang_code="de")
+
+        self.assertEqual(TranslationJob.objects.filter(lang_code="en").count(), 1)
+        self.assertEqual(TranslationJob.objects.count(), 2)
+
+    def test_enqueue_reopens_done_job(self):
+        self._enqueue(self.rows[:1])
+        token, claimed = jobs.claim(10)
+        jobs.complete(token, [job.id for job in claimed])
+
+        self._enqueue(self.rows[:1])
+
+        job = TranslationJob.objects.get()
+        self.assertEqual(job.status, TranslationJob.PENDING)
+        self.assertEqual(job.attempts, 0)
+
+    def test_claims_do_not_share_rows(self):
+        self._enqueue(self.rows)
+
+        first_token, first = jobs.claim(2)
+        second_token, second = jobs.claim(2)
+
+        self.assertNotEqual(first_token, second_token)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 2)
+        self.assertFalse({job.id for job in first} & {job.id for job in second})
+        self.assertIsNone(jobs.claim(2))
+
+    def test_claim_takes_one_language(self):
+        self._enqueue(self.rows[:2], lang_code="en")
+        self._enqueue(self.rows[:2], lang_code="de")
+
+        _, claimed = jobs.claim(10)
+
+        self.assertEqual(len({job.lang_code for job in claimed}), 1)
+
+    def test_fail_backs_off_then_dead(self):
+        self._enqueue(self.rows[:1])
+        delays = []
+
+        for attempt in range(1, TRANSLATION_JOB_MAX_ATTEMPTS + 1):
+            self._make_ready()
+            token, claimed = jobs.claim(10)
+            self.assertEqual(claimed[0].attempts, attempt)
+            before = timezone.now()
+            jobs.fail(token, claimed, "boom")
+
+            job = TranslationJob.objects.get()
+            self.assertIsNone(job.leased_by)
+            self.assertEqual(job.last_error, "boom")
+            if attempt < TRANSLATION_JOB_MAX_ATTEMPTS:
+                self.assertEqual(job.status, TranslationJob.PENDING)
+                self.assertIsNone(jobs.claim(10))
+                delays.append(job.available_at - before)
+
+        self.assertEqual(job.status, TranslationJob.DEAD)
+        self.assertEqual(delays, sorted(delays))
+        self.assertIsNone(jobs.claim(10))
+
+        self.assertEqual(jobs.retry_dead(), 1)
+        self.assertIsNotNone(jobs.claim(10))
+
+    def test_complete_ignores_foreign_token(self):
+        self._enqueue(self.rows[:2])
+        token, claimed = jobs.claim(10)
+        job_ids = [job.id for job in claimed]
+
+        self.assertEqual(jobs.complete("not-the-lease-token", job_ids), 0)
+        self.assertFalse(TranslationJob.objects.filter(status=TranslationJob.DONE).exists())
+
+        self.assertEqual(jobs.complete(token, job_ids), 2)
+        self.assertEqual(TranslationJob.objects.filter(status=TranslationJob.DONE).count(), 2)
+
+    def test_expired_lease_is_reclaimed(self):
+        self._enqueue(self.rows[:1])
+        token, _ = jobs.claim(10)
+        TranslationJob.objects.update(lease_until=timezone.now() - timedelta(seconds=1))
+
+        new_token, claimed = jobs.claim(10)
+
+        self.assertNotEqual(new_token, token)
+        self.assertEqual(claimed[0].attempts, 2)
+        self.assertEqual(jobs.complete(token, [claimed[0].id]), 0)
+
+    def test_expired_lease_on_last_attempt_is_dead(self):
+        self._enqueue(self.rows[:1])
+        jobs.claim(10)
+        TranslationJob.objects.update(
+            attempts=TRANSLATION_JOB_MAX_ATTEMPTS,
+            lease_until=timezone.now() - timedelta(seconds=1),
+        )
+
+        self.assertFalse(jobs.has_ready_jobs())
+        self.assertIsNone(jobs.claim(10))
+
+        job = TranslationJob.objects.get()
+        self.assertEqual(job.status, TranslationJob.DEAD)
+        self.assertIsNone(job.leased_by)
+
+    def test_extend_ignores_foreign_token(self):
+        self._enqueue(self.rows[:2])
+        token, claimed = jobs.claim(10)
+        job_ids = [job.id for job in claimed]
+
+        self.assertEqual(jobs.extend("not-the-lease-token", job_ids), 0)
+        self.assertEqual(jobs.extend(token, job_ids), 2)
+
+
+@mock.patch.object(translator, "wait_for_capacity", return_value=0.0)
+@mock.patch.object(translator, "generate_translations", side_effect=lambda texts, lang: {t: f"[{t}]" for t in texts})
+class TranslationWorkerTests(TestCase):
+    """Worker batches (translator._process): slow tiers are stored one at a time."""
+
+    def setUp(self):
+        short = [Translation.objects.create(source_text=f"Label {i}") for i in range(2)]
+        long = [Translation.objects.create(source_text=f"Sentence number {i}. " * 4) for i in range(3)]
+        jobs.enqueue([(row.id, row.source_text, "en") for row in short + long])
+        self.token, self.jobs = jobs.claim(10)
+
+    def test_slow_tier_is_stored_and_completed_per_string(self, *mocks):
+        def generate(text, lang_code, tier):
+            # Earlier slow strings are already stored and completed
+            stored = Translation.objects.exclude(text_en__isnull=True).exclude(text_en="").count()
+            return f"{tier}:{stored}"
+
+        with mock.patch.object(translator, "generate_translation", side_effect=generate):
+            translator._process(self.token, self.jobs)
+
+        slow = Translation.objects.filter(source_text__startswith="Sentence").order_by("id")
+        self.assertEqual([row.text_en for row in slow], ["candidates:2", "candidates:3", "candidates:4"])
+        self.assertEqual(TranslationJob.objects.filter(status=TranslationJob.DONE).count(), 5)
+
+    def test_lost_lease_stops_the_batch(self, *mocks):
+        def generate(text, lang_code, tier):
+            # Lease expired and taken by another worker meanwhile
+            TranslationJob.objects.filter(status=TranslationJob.RUNNING).update(leased_by="other")
+            return "value"
+
+        with mock.patch.object(translator, "generate_translation", side_effect=generate) as generate_mock:
+            translator._process(self.token, self.jobs)
+
+        self.assertEqual(generate_mock.call_count, 1)
+        self.assertEqual(TranslationJob.objects.filter(leased_by="other").count(), 3)
+
+
+@mock.patch.object(translator, "wait_for_capacity", return_value=0.0)
+@mock.patch.object(translator, "generate_translations", side_effect=lambda texts, lang: {t: f"[{t}]" for t in texts})
+class PretranslateTests(TransactionTestCase):
+    """
+    Pre-translation goes through the job queue (_core/pretranslate.py).
+    TransactionTestCase: the pool threads must see the committed rows.
+    """
+
+    def setUp(self):
+        self.rows = [Translation.objects.create(source_text=f"Button {i}") for i in range(3)]
+        self.keys = {row.source_text for row in self.rows}
+
+    def test_rows_leased_by_a_worker_are_not_translated_again(self, *mocks):
+        jobs.enqueue([(row.id, row.source_text, "en") for row in self.rows])
+        _, (leased,) = jobs.claim(1)
+        batches = []
+
+        stats = pretranslate(self.keys, ["en"], 2, lambda *batch: batches.append(batch))
+
+        self.assertEqual(stats, {"en": {"missing": 3, "translated": 2, "failed": 0}})
+        self.assertEqual(batches, [("en", 2, 2)])
+        self.assertFalse(Translation.objects.get(pk=leased.translation_id).text_en)
+        self.assertEqual(TranslationJob.objects.filter(status=TranslationJob.DONE).count(), 2)
+
+
+@override_settings(TRANSLATION_SHARED_CACHE="local")
+class TranslationCacheWriteThroughTests(TestCase):
+    """Saved rows reach both cache tiers after commit (signals.py)."""
+
+    def setUp(self):
+        invalidate_cache()
+        self.addCleanup(invalidate_cache)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.row = Translation.objects.create(source_text="Long legal text " * 20, text_en="Old")
+
+    def _shared(self, lang_code):
+        key = _shared_key(self.row.source_text, lang_code)
+        return get_shared_tier().get_many([key]).get(key)
+
+    def test_edit_replaces_cached_value(self):
+        self.assertEqual(self._shared("en"), "Old")
+
+        self.row.text_en = "New"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.row.save()
+
+        self.assertEqual(self._shared("en"), "New")
+        self.assertEqual(get_from_cache(self.row.source_text, "en"), "New")
+
+    def test_cleared_value_is_dropped(self):
+        self.row.text_en = ""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.row.save()
+
+        self.assertIsNone(self._shared("en"))
+        self.assertIsNone(get_from_cache(self.row.source_text, "en"))
+
+    def test_nothing_written_before_commit(self):
+        self.row.text_en = "New"
+        with self.captureOnCommitCallbacks(execute=False):
+            self.row.save()
+
+        self.assertEqual(self._shared("en"), "Old")
+
+    def test_catalog_applied_only_after_commit(self):
+        with mock.patch("apps.translation.signals.remember") as remember:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                self.row.save()
+            remember.assert_not_called()
+
+            for callback in callbacks:
+                callback()
+            remember.assert_called_once_with(self.row)
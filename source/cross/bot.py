@@ -11,6 +11,8 @@ from django.conf import settings
 
 from apps.support.models import SupportTicket, Client, Engineer
 from cross.openai_use_case import OpenAIUseCase
+from cross.search import search_tickets
+from cross.ticket_flow import transition_ticket
 from cross.utils import calculate_final_priority
 
 
@@ -108,19 +110,21 @@ help_keyboard = make_help_keyboard()
 # SEARCH SIMILAR SOLUTIONS
 # ============================================================
 def find_similar_solutions(user_text: str) -> list:
-    if not user_text:
+    """
+    До трёх решённых заявок, описание или решение которых ближе всего
+    к тексту пользователя (полнотекстовый индекс, любое из слов).
+    """
+    if not user_text or len(user_text.strip()) <= 5:
         return []
 
-    text = user_text.lower()
-    qs = SupportTicket.objects.filter(final_resolution__isnull=False).exclude(final_resolution="")
-
-    matches = []
-    for t in qs[:200]:
-        desc = (t.description or "").lower()
-        if len(text) > 5 and text in desc:
-            matches.append({"id": t.id, "solution": t.final_resolution})
-
-    return sorted(matches, key=lambda x: x["id"], reverse=True)[:3]
+    tickets = search_tickets(
+        user_text,
+        queryset=SupportTicket.objects.only("id", "final_resolution"),
+        limit=3,
+        match_all=False,
+        resolved_only=True,
+    )
+    return [{"id": t.id, "solution": t.final_resolution} for t in tickets]
 
 
 def format_similar_solutions(lang: str, solutions: list) -> str:
@@ -244,12 +248,14 @@ def process_ticket_dialog(message: types.Message, user_id: int, text: str, lang:
             user_state.pop(user_id, None)
             return
 
-        final_priority = calculate_final_priority(int(ai.get("initial_priority", 50)), client)
+        initial_priority = int(ai.get("initial_priority", 50))
+        final_priority = calculate_final_priority(initial_priority, client)
 
         ticket = SupportTicket.objects.create(
             client=client,
             description=text,
             priority_score=final_priority,
+            initial_priority=initial_priority,
             engineer_visit_probability=ai.get("engineer_probability", 0),
             why_engineer_needed=ai.get("engineer_probability_explanation", ""),
             proposed_solution_engineer=ai.get("engineer_advice", ""),
@@ -266,10 +272,7 @@ def process_ticket_dialog(message: types.Message, user_id: int, text: str, lang:
                 id=engineer_pick.get("engineer_id"),
                 is_active=True
             ).first()
-            if engineer:
-                ticket.engineer = engineer
-                ticket.save(update_fields=["engineer"])
-
+            if engineer and transition_ticket(ticket, engineer=engineer):
                 logger.info(
                     "AI engineer assigned (TG)",
                     extra={
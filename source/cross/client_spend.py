@@ -0,0 +1,168 @@
+"""
+Распределение расходов клиентов для перцентильного ранжирования.
+
+Раньше на каждую заявку пересчитывались суммы услуг ВСЕХ клиентов
+(N+1 запросов + list.index). Теперь:
+
+- суммы считаются одним агрегирующим SQL-запросом (GROUP BY клиент);
+- результат хранится в памяти процесса как отсортированный массив
+  и обновляется не чаще, чем раз в SPEND_CACHE_TTL_SECONDS;
+- ранг клиента ищется бинарным поиском (bisect) — O(log n);
+- для очень больших баз вместо полного массива хранится компактный
+  квантильный скетч (SKETCH_SIZE порядковых статистик).
+"""
+
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+from django.db.models import DecimalField, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.support.models import Client
+
+
+# ============================================================
+# Настройки
+# ============================================================
+SPEND_CACHE_TTL_SECONDS = 60
+SKETCH_THRESHOLD = 200_000     # начиная с этого числа клиентов — скетч
+SKETCH_SIZE = 2048             # количество хранимых квантилей
+
+
+# ============================================================
+# Точное распределение (отсортированный массив)
+# ============================================================
+class SpendDistribution:
+    """
+    Отсортированные суммы расходов всех клиентов.
+    """
+
+    def __init__(self, totals: array):
+        self.totals = totals
+        self.count = len(totals)
+
+    @property
+    def is_empty(self) -> bool:
+        return self.count == 0 or self.totals[-1] == 0
+
+    def percentile(self, total: float) -> float:
+        """
+        Доля клиентов с расходами строго меньше total (0.0–1.0).
+        Совпадает с прежним rank / (n - 1), где rank = sorted.index(total).
+        """
+        if self.count <= 1:
+            return 1.0
+        rank = bisect_left(self.totals, total)
+        return min(rank / (self.count - 1), 1.0)
+
+    def percentile_many(self, totals: np.ndarray) -> np.ndarray:
+        """
+        Векторная версия percentile() для массива сумм.
+        """
+        if self.count <= 1:
+            return np.ones(len(totals))
+        ranks = np.searchsorted(np.frombuffer(self.totals, dtype=np.float64), totals, side="left")
+        return np.minimum(ranks / (self.count - 1), 1.0)
+
+
+# ============================================================
+# Приближённое распределение (квантильный скетч)
+# ============================================================
+class SpendQuantileSketch(SpendDistribution):
+    """
+    Хранит только SKETCH_SIZE равноотстоящих порядковых статистик.
+    Ошибка ранга не больше count / SKETCH_SIZE позиций.
+    """
+
+    def __init__(self, quantiles: array, count: int):
+        super().__init__(quantiles)
+        self.count = count
+        self.step = (count - 1) / (len(quantiles) - 1) if len(quantiles) > 1 else 0.0
+
+    def percentile(self, total: float) -> float:
+        if self.count <= 1:
+            return 1.0
+        rank = bisect_left(self.totals, total) * self.step
+        return min(rank / (self.count - 1), 1.0)
+
+    def percentile_many(self, totals: np.ndarray) -> np.ndarray:
+        if self.count <= 1:
+            return np.ones(len(totals))
+        ranks = np.searchsorted(np.frombuffer(self.totals, dtype=np.float64), totals, side="left")
+        return np.minimum(ranks * self.step / (self.count - 1), 1.0)
+
+
+# ============================================================
+# Загрузка из БД
+# ============================================================
+def _client_totals_queryset():
+    return (
+        Client.objects
+        .annotate(
+            total=Coalesce(
+                Sum("clientservice__service__price"),
+                Value(0),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            )
+        )
+        .order_by("total")
+        .values_list("total", flat=True)
+    )
+
+
+def load_spend_distribution(sketch_threshold: int = SKETCH_THRESHOLD) -> SpendDistribution:
+    """
+    Строит распределение одним агрегирующим запросом.
+    Большие базы читаются потоково и сворачиваются в скетч.
+    """
+    count = Client.objects.count()
+
+    if count < sketch_threshold:
+        return SpendDistribution(
+            array("d", (float(t) for t in _client_totals_queryset()))
+        )
+
+    step = (count - 1) / (SKETCH_SIZE - 1)
+    positions = {round(i * step) for i in range(SKETCH_SIZE)}
+    quantiles = array("d")
+
+    for position, total in enumerate(_client_totals_queryset().iterator(chunk_size=10_000)):
+        if position in positions:
+            quantiles.append(float(total))
+
+    return SpendQuantileSketch(quantiles, count)
+
+
+# ============================================================
+# Кеш в памяти процесса
+# ============================================================
+_distribution: SpendDistribution | None = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def get_spend_distribution() -> SpendDistribution:
+    """
+    Возвращает закешированное распределение, перезагружая его по TTL.
+    """
+    global _distribution, _loaded_at
+
+    now = time.monotonic()
+    if _distribution is not None and now - _loaded_at < SPEND_CACHE_TTL_SECONDS:
+        return _distribution
+
+    with _lock:
+        if _distribution is None or time.monotonic() - _loaded_at >= SPEND_CACHE_TTL_SECONDS:
+            _distribution = load_spend_distribution()
+            _loaded_at = time.monotonic()
+        return _distribution
+
+
+def invalidate_spend_distribution() -> None:
+    """Сбросить кеш: следующий вызов перечитает распределение из БД."""
+    global _distribution
+    with _lock:
+        _distribution = None
@@ -0,0 +1,101 @@
+"""
+Поддержка материализованной таблицы ClientStats.
+
+- refresh_client_stats(ids) — пересчёт строк для указанных клиентов:
+  пачками по REFRESH_BATCH_SIZE, на пачку один GROUP BY-запрос и один
+  upsert (bulk_create update_conflicts);
+- schedule_client_stats_refresh(ids) — то же самое после коммита
+  транзакции (используется сигналами);
+- clients_using_service(service_id) — клиенты, затронутые изменением цены.
+"""
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from apps.support.models import Client, ClientService, ClientStats
+from cross.client_spend import invalidate_spend_distribution
+from cross.utils import summarize_client_services
+
+
+STATS_FIELDS = [
+    "total_spend",
+    "services_count",
+    "service_type_counts",
+    "updated_at",
+]
+
+REFRESH_BATCH_SIZE = 900        # < лимита параметров SQLite
+
+
+# ============================================================
+# Пересчёт статистики группы клиентов
+# ============================================================
+def refresh_client_stats(client_ids) -> int:
+    """
+    Пересчитывает ClientStats для клиентов client_ids.
+    Возвращает количество обновлённых строк.
+    """
+    client_ids = sorted(set(client_ids))
+    if not client_ids:
+        return 0
+
+    refreshed = sum(
+        _refresh_batch(client_ids[start:start + REFRESH_BATCH_SIZE])
+        for start in range(0, len(client_ids), REFRESH_BATCH_SIZE)
+    )
+    if refreshed:
+        invalidate_spend_distribution()
+    return refreshed
+
+
+def _refresh_batch(client_ids) -> int:
+    existing_ids = list(Client.objects.filter(id__in=client_ids).values_list("id", flat=True))
+    if not existing_ids:
+        return 0
+
+    rows_by_client = {client_id: [] for client_id in existing_ids}
+
+    type_rows = (
+        ClientService.objects
+        .filter(client_id__in=existing_ids)
+        .values_list("client_id", "service__service_type")
+        .annotate(count=Count("id"), spend=Sum("service__price"))
+        .order_by()
+    )
+    for client_id, service_type, count, spend in type_rows:
+        rows_by_client[client_id].append((service_type, count, spend))
+
+    stats = [
+        ClientStats(client_id=client_id, **summarize_client_services(rows))
+        for client_id, rows in rows_by_client.items()
+    ]
+
+    ClientStats.objects.bulk_create(
+        stats,
+        update_conflicts=True,
+        unique_fields=["client"],
+        update_fields=STATS_FIELDS,
+    )
+    return len(stats)
+
+
+def schedule_client_stats_refresh(client_ids) -> None:
+    """
+    Пересчитать статистику после успешного коммита текущей транзакции
+    (при откате ничего не делается, удалённые клиенты пропускаются).
+    """
+    client_ids = {client_id for client_id in client_ids if client_id is not None}
+    if client_ids:
+        transaction.on_commit(lambda: refresh_client_stats(client_ids))
+
+
+# ============================================================
+# Клиенты, затронутые изменением услуги
+# ============================================================
+def clients_using_service(service_id) -> set:
+    return set(
+        ClientService.objects
+        .filter(service_id=service_id)
+        .values_list("client_id", flat=True)
+        .distinct()
+    )
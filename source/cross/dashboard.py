@@ -0,0 +1,289 @@
+"""
+Данные дешборда по секциям с кешированием.
+
+Каждая секция (статусы, средний приоритет, загрузка инженеров,
+популярность услуг, динамика, справочники) строится отдельной функцией
+и кешируется в общем кеше Django под ключом с номером поколения:
+
+    dashboard:gen:<секция>                  → поколение (int)
+    dashboard:<секция>:<поколение>:<параметр> → данные
+
+Запись в БД не удаляет данные, а увеличивает поколение зависимых секций
+(invalidate_topic), поэтому стоимость дешборда зависит от числа записей,
+а не от числа зрителей: при отсутствии изменений показ = два get_many.
+
+Защита от «stampede» при пересборке: секцию строит только процесс,
+захвативший блокировку (cache.add); остальные отдают последнее
+построенное значение (stale), а если его нет — недолго ждут результата.
+
+Промахи кеша и прочие независимые запросы страницы (первые страницы
+заявок) выполняются параллельно в ограниченном пуле потоков, у каждого
+потока своё соединение с БД. Время каждой задачи возвращается для
+заголовка Server-Timing.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Count, Q
+
+from apps.support.models import Client, Engineer, Service, SupportTicket
+from cross import rollups
+from cross.query_budget import bind_recorders
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# Настройки
+# ============================================================
+SECTION_TTL_SECONDS = 60 * 60
+LOCK_TIMEOUT_SECONDS = 30
+WAIT_FOR_BUILD_SECONDS = 2.0
+WAIT_STEP_SECONDS = 0.05
+
+REFERENCE_LIST_SIZE = 5
+
+DASHBOARD_WORKERS = 6
+
+
+# ============================================================
+# Построение секций
+# ============================================================
+def build_reference() -> dict:
+    """
+    KPI и короткие списки для блоков «Детали».
+    """
+    engineers = (
+        Engineer.objects
+        .order_by("id")
+        .annotate(active_tickets=Count("supportticket", filter=Q(supportticket__status__in=["new", "in_progress"])))
+        .values("full_name", "active_tickets")
+    )
+    clients = (
+        Client.objects
+        .order_by("id")
+        .select_related("stats")[:REFERENCE_LIST_SIZE]
+    )
+
+    return {
+        "clients_count": Client.objects.count(),
+        "services_count": Service.objects.count(),
+        "engineers_count": Engineer.objects.count(),
+        "tickets_count": SupportTicket.objects.count(),
+        "engineers": list(engineers),
+        "services": list(Service.objects.order_by("id").values("title", "price")[:REFERENCE_LIST_SIZE]),
+        "clients": [
+            {
+                "full_name": client.full_name,
+                "services_count": client.stats.services_count if hasattr(client, "stats") else 0,
+            }
+            for client in clients
+        ],
+    }
+
+
+# Секция → (функция построения, темы изменений, от которых она зависит)
+SECTIONS = {
+    "status_counts": (lambda param: rollups.ticket_status_counts(), {"tickets"}),
+    "avg_priority": (lambda param: rollups.average_priority(), {"tickets"}),
+    "engineer_load": (lambda param: rollups.engineer_load(), {"tickets", "engineers"}),
+    "service_usage": (lambda param: rollups.service_usage(), {"client_services", "services"}),
+    "timeline": (lambda param: rollups.ticket_timeline(param), {"tickets"}),
+    "reference": (lambda param: build_reference(), {"tickets", "engineers", "services", "clients", "client_services"}),
+}
+
+
+# ============================================================
+# Ключи
+# ============================================================
+def _generation_key(section: str) -> str:
+    return f"dashboard:gen:{section}"
+
+
+def _data_key(section: str, generation: int, param) -> str:
+    return f"dashboard:{section}:{generation}:{param or ''}"
+
+
+def _stale_key(section: str, param) -> str:
+    return f"dashboard:{section}:stale:{param or ''}"
+
+
+# ============================================================
+# Инвалидация
+# ============================================================
+def _new_generation() -> int:
+    return time.time_ns()
+
+
+def invalidate_topic(topic: str) -> None:
+    """
+    Выдаёт новое поколение всем секциям, зависящим от темы
+    ("tickets", "client_services", "engineers", "services", "clients").
+
+    Не cache.incr: в DatabaseCache он перезаписывает ключ с таймаутом
+    по умолчанию, и поколение через 5 минут пропадало бы.
+    """
+    cache.set_many(
+        {_generation_key(section): _new_generation() for section, (_, topics) in SECTIONS.items() if topic in topics},
+        timeout=None,
+    )
+
+
+def _generations(sections) -> dict:
+    """
+    {секция: поколение}. Отсутствующие (вытесненные) поколения создаются.
+    """
+    keys = {section: _generation_key(section) for section in sections}
+    found = cache.get_many(list(keys.values()))
+
+    generations = {}
+    for section, key in keys.items():
+        if key not in found:
+            cache.add(key, _new_generation(), timeout=None)
+            found[key] = cache.get(key)
+        generations[section] = found[key]
+    return generations
+
+
+def section_version(section: str) -> int:
+    """
+    Текущее поколение секции = время (нс) последней влияющей записи.
+    Используется как ETag / Last-Modified JSON-эндпоинтов.
+    """
+    return _generations([section])[section]
+
+
+# ============================================================
+# Ожидание секции, которую строит другой процесс
+# ============================================================
+def _lock_key(section: str, generation: int, param) -> str:
+    return f"{_data_key(section, generation, param)}:lock"
+
+
+def _wait_for(section: str, param, generation: int):
+    """
+    Секцию уже строит другой процесс: отдаём последнее построенное
+    значение, а если его нет — недолго ждём результата.
+    """
+    stale = cache.get(_stale_key(section, param))
+    if stale is not None:
+        return stale
+
+    data_key = _data_key(section, generation, param)
+    deadline = time.monotonic() + WAIT_FOR_BUILD_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_STEP_SECONDS)
+        value = cache.get(data_key)
+        if value is not None:
+            return value
+
+    logger.warning("Dashboard section build timed out, building locally", extra={"section": section})
+    builder, _ = SECTIONS[section]
+    return builder(param)
+
+
+# ============================================================
+# Параллельное выполнение
+# ============================================================
+_executor = ThreadPoolExecutor(max_workers=DASHBOARD_WORKERS, thread_name_prefix="dashboard")
+
+
+def _timed(task):
+    """
+    Выполняет задачу в рабочем потоке. Соединение потока закрывается
+    по правилам CONN_MAX_AGE, как в конце обычного запроса.
+    """
+    close_old_connections()
+    started = time.perf_counter()
+    try:
+        return task(), time.perf_counter() - started
+    finally:
+        close_old_connections()
+
+
+def run_parallel(tasks: dict) -> tuple[dict, dict]:
+    """
+    tasks: {имя: функция без аргументов}.
+    Возвращает ({имя: результат}, {имя: секунды}).
+    Одна задача выполняется в текущем потоке.
+    """
+    if len(tasks) <= 1:
+        results, timings = {}, {}
+        for name, task in tasks.items():
+            started = time.perf_counter()
+            results[name] = task()
+            timings[name] = time.perf_counter() - started
+        return results, timings
+
+    # Запросы рабочих потоков учитываются в счётчиках запроса (query_budget)
+    futures = {name: _executor.submit(_timed, bind_recorders(task)) for name, task in tasks.items()}
+
+    results, timings = {}, {}
+    for name, future in futures.items():
+        results[name], timings[name] = future.result()
+    return results, timings
+
+
+def get_sections(requested: dict, extra_tasks: dict | None = None) -> tuple[dict, dict]:
+    """
+    requested:   {секция: параметр или None}
+    extra_tasks: {имя: функция} — другие независимые запросы страницы,
+                 выполняются в том же пуле, что и промахи кеша.
+
+    Возвращает ({секция или имя задачи: данные}, {этап: секунды}).
+    При попадании в кеш — два обращения к кешу.
+    """
+    started = time.perf_counter()
+    generations = _generations(requested)
+
+    keys = {
+        section: _data_key(section, generations[section], param)
+        for section, param in requested.items()
+    }
+    cached = cache.get_many(list(keys.values()))
+    cache_seconds = time.perf_counter() - started
+
+    result = {}
+    tasks = dict(extra_tasks or {})
+    locks, waiting = {}, []
+
+    # Блокировки берутся в текущем потоке: кеш пишется только отсюда
+    # (DatabaseCache на SQLite молча теряет параллельные записи)
+    for section, param in requested.items():
+        key = keys[section]
+        if key in cached:
+            result[section] = cached[key]
+            continue
+
+        lock_key = _lock_key(section, generations[section], param)
+        if cache.add(lock_key, 1, timeout=LOCK_TIMEOUT_SECONDS):
+            locks[section] = lock_key
+            tasks[section] = partial(SECTIONS[section][0], param)
+        else:
+            waiting.append(section)
+
+    try:
+        built, timings = run_parallel(tasks)
+
+        fresh = {}
+        for section in locks:
+            fresh[keys[section]] = built[section]
+            fresh[_stale_key(section, requested[section])] = built[section]
+        if fresh:
+            cache.set_many(fresh, timeout=SECTION_TTL_SECONDS)
+    finally:
+        if locks:
+            cache.delete_many(list(locks.values()))
+
+    result.update(built)
+    for section in waiting:
+        result[section] = _wait_for(section, requested[section], generations[section])
+
+    timings["cache"] = cache_seconds
+    return result, timings
@@ -0,0 +1,210 @@
+"""
+Живые события дешборда (создание / назначение / закрытие заявок).
+
+Синхронный код (сигналы, переходы, очередь) вызывает
+publish_ticket_event() — событие отправляется после коммита.
+Открытые дешборды получают события через SSE (async-представление
+подписывается на брокер и пишет их в поток).
+
+Брокеры (settings.LIVE_EVENTS_BROKER):
+- "local" — рассылка в памяти процесса: asyncio.Queue на подписчика,
+  публикация из любого потока через call_soon_threadsafe. Достаточно
+  для одного ASGI-процесса, разработки и тестов.
+- "redis" — события публикуются в канал Redis, каждый ASGI-процесс
+  слушает канал и раздаёт события своим локальным подписчикам.
+  Пакет redis подключается только в этом режиме.
+
+Медленный подписчик, у которого переполнилась очередь, отключается:
+браузер переподключится сам (EventSource), а пропуски закрывает опрос.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.support.models import SupportTicket
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# Настройки
+# ============================================================
+SUBSCRIBER_QUEUE_SIZE = 100
+REDIS_CHANNEL = "dashboard:live-events"
+
+_DISCONNECT = object()
+
+
+# ============================================================
+# Подписчик
+# ============================================================
+class Subscription:
+    """
+    Очередь событий одного подключения. Читается в цикле событий,
+    куда подписались; пишется из любого потока.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.closed = False
+
+    def _put(self, event) -> None:
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.closed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_DISCONNECT)
+
+    def deliver(self, event) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # Цикл событий уже закрыт
+            self.closed = True
+
+    async def get(self, timeout: float):
+        """
+        Следующее событие, None по таймауту.
+        ConnectionAbortedError → подписчик отстал и отключён.
+        """
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is _DISCONNECT:
+            raise ConnectionAbortedError("Subscriber queue overflow")
+        return event
+
+
+# ============================================================
+# Локальный брокер (в памяти процесса)
+# ============================================================
+class LocalBroker:
+
+    def __init__(self):
+        self._subscribers: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscribers_count(self) -> int:
+        return len(self._subscribers)
+
+    def fan_out(self, event: dict) -> None:
+        event.setdefault("id", next(self._ids))
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def publish(self, event: dict) -> None:
+        self.fan_out(event)
+
+
+# ============================================================
+# Общий брокер (Redis pub/sub поверх локального)
+# ============================================================
+class RedisBroker(LocalBroker):
+
+    def __init__(self, url: str):
+        super().__init__()
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._listener = threading.Thread(target=self._listen, name="live-events-redis", daemon=True)
+        self._listener.start()
+
+    def publish(self, event: dict) -> None:
+        try:
+            self._client.publish(REDIS_CHANNEL, json.dumps(event, ensure_ascii=False))
+        except Exception:
+            logger.exception("Live event publish to Redis failed, delivering locally")
+            self.fan_out(event)
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(REDIS_CHANNEL)
+                for message in pubsub.listen():
+                    self.fan_out(json.loads(message["data"]))
+            except Exception:
+                logger.exception("Live events Redis listener failed, reconnecting")
+                threading.Event().wait(1.0)
+
+
+# ============================================================
+# Выбор брокера
+# ============================================================
+_broker: LocalBroker | None = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> LocalBroker:
+    global _broker
+
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                if getattr(settings, "LIVE_EVENTS_BROKER", "local") == "redis":
+                    _broker = RedisBroker(settings.LIVE_EVENTS_REDIS_URL)
+                else:
+                    _broker = LocalBroker()
+    return _broker
+
+
+# ============================================================
+# Публикация из синхронного кода
+# ============================================================
+def ticket_event(ticket: SupportTicket, kind: str) -> dict:
+    return {
+        "kind": kind,
+        "ticket_id": ticket.id,
+        "ticket_code": ticket.ticket_code,
+        "status": ticket.status,
+        "engineer_id": ticket.engineer_id,
+        "priority_score": ticket.priority_score,
+    }
+
+
+def publish_ticket_event(ticket: SupportTicket, kind: str) -> None:
+    """
+    Отправить событие после коммита текущей транзакции
+    (поля берутся на момент коммита: например, ticket_code новой заявки).
+    kind: created / assigned / status / closed / updated / deleted.
+    """
+    ticket_id = ticket.id   # после delete() Django обнуляет pk
+
+    def send():
+        try:
+            get_broker().publish({**ticket_event(ticket, kind), "ticket_id": ticket_id})
+        except Exception:
+            logger.exception("Live event publish failed", extra={"ticket_id": ticket.id, "kind": kind})
+
+    transaction.on_commit(send)
+
+
+def format_sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: ticket\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
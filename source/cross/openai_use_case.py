@@ -16,6 +16,8 @@ CORE OpenAI JSON Helper + Ticket AI Resolver (Unified).
 
 import logging
 from django.conf import settings
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
 from openai import OpenAI
 from pydantic import BaseModel
 
@@ -28,6 +30,9 @@ import re
 logger = logging.getLogger(__name__)
 _client = OpenAI(api_key=settings.OPENAI_KEY)
 
+# Сколько решённых заявок инженера показывать ИИ при выборе
+SOLVED_HISTORY_SIZE = 25
+
 
 # ============================================================
 # STRICT JSON SCHEMAS
@@ -145,17 +150,19 @@ class OpenAIUseCase:
         }.get(lang, "English")
 
         # Истории
+        # final_resolution > "" — не NULL и не пусто (частичный индекс ticket_resolved_recent)
         hist_res = "\n".join([
-            f"- {t.final_resolution}"
-            for t in SupportTicket.objects.exclude(final_resolution=None)
-                                          .exclude(final_resolution="")
-                                          .order_by("-created_at")[:30]
+            f"- {resolution}"
+            for resolution in SupportTicket.objects.filter(final_resolution__gt="")
+                                                   .order_by("-created_at")
+                                                   .values_list("final_resolution", flat=True)[:30]
         ]) or "(нет данных)"
 
         hist_prob = "\n".join([
-            f"- {t.description}\n  Вероятность: {t.engineer_visit_probability}"
-            for t in SupportTicket.objects.exclude(engineer_visit_probability=None)
-                                          .order_by("-created_at")[:40]
+            f"- {description}\n  Вероятность: {probability}"
+            for description, probability in SupportTicket.objects.exclude(engineer_visit_probability=None)
+                                                                 .order_by("-created_at")
+                                                                 .values_list("description", "engineer_visit_probability")[:40]
         ]) or "(нет данных)"
 
         # SYSTEM PROMPT
@@ -208,23 +215,36 @@ class OpenAIUseCase:
     @staticmethod
     def pick_engineer_for_ticket(ticket: SupportTicket):
 
-        engineers = list(Engineer.objects.filter(is_active=True))
+        # Загрузка и история всех инженеров — двумя запросами, а не 2 на инженера
+        engineers = list(
+            Engineer.objects
+            .filter(is_active=True)
+            .annotate(active_tickets=Count("supportticket", filter=Q(supportticket__status__in=["new", "in_progress"])))
+            .order_by("id")
+        )
         if not engineers:
             return None
 
-        engineers_payload = []
-        for e in engineers:
-            engineers_payload.append({
+        solved = (
+            SupportTicket.objects
+            .filter(engineer__in=engineers, status="done")
+            .annotate(row=Window(RowNumber(), partition_by=F("engineer_id"), order_by=F("id").asc()))
+            .filter(row__lte=SOLVED_HISTORY_SIZE)
+            .values_list("engineer_id", "description")
+        )
+        solved_by_engineer = {e.id: [] for e in engineers}
+        for engineer_id, description in solved:
+            solved_by_engineer[engineer_id].append(description)
+
+        engineers_payload = [
+            {
                 "id": e.id,
                 "name": e.full_name,
-                "active_tickets": e.supportticket_set.filter(
-                    status__in=["new", "in_progress"]
-                ).count(),
-                "solved_descriptions": list(
-                    SupportTicket.objects.filter(engineer=e, status="done")
-                    .values_list("description", flat=True)[:25]
-                ),
-            })
+                "active_tickets": e.active_tickets,
+                "solved_descriptions": solved_by_engineer[e.id],
+            }
+            for e in engineers
+        ]
 
         system_prompt = (
             "Ты — система распределения инженеров Казахтелекома.\n"
@@ -0,0 +1,199 @@
+"""
+Массовый пересчёт priority_score для всех открытых заявок.
+
+Нужен, когда меняются цены услуг или активная PriorityPolicy и сохранённые
+приоритеты устаревают. Формула та же, что в calculate_final_priority
+(активная политика), но вычисляется векторно (score_many) сразу для всех
+заявок:
+
+1. открытые заявки (id, клиент, initial_priority, priority_score) → массивы;
+2. признаки клиентов из ClientStats → плотные массивы по client_id;
+3. формула считается над массивами целиком;
+4. записываются только изменившиеся строки: заявки группируются по новому
+   значению, и каждая группа пишется пачками UPDATE ... WHERE id IN (...).
+
+Заявки без initial_priority (созданные до его появления) пропускаются.
+"""
+
+import logging
+import time
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F, Min
+from django.utils import timezone
+
+from apps.support.models import ClientStats, SupportTicket
+from cross.client_spend import load_spend_distribution
+from cross.client_stats import refresh_client_stats
+from cross.priority_policy import SERVICE_TYPES, CompiledPolicy, get_active_policy
+from cross.rollups import local_day, refresh_ticket_rollups
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# Настройки
+# ============================================================
+OPEN_STATUSES = ("new", "in_progress")
+WRITE_BATCH_SIZE = 900          # < лимита параметров SQLite
+READ_CHUNK_SIZE = 20_000
+
+TICKET_DTYPE = np.dtype([
+    ("id", np.int64),
+    ("client_id", np.int64),
+    ("initial_priority", np.float64),
+    ("priority_score", np.int64),
+])
+
+
+# ============================================================
+# Загрузка данных
+# ============================================================
+def load_open_tickets() -> np.ndarray:
+    rows = (
+        SupportTicket.objects
+        .filter(status__in=OPEN_STATUSES, initial_priority__isnull=False)
+        .order_by()
+        .values_list("id", "client_id", "initial_priority", "priority_score")
+    )
+    return np.fromiter(rows.iterator(chunk_size=READ_CHUNK_SIZE), dtype=TICKET_DTYPE)
+
+
+class ClientFeatures:
+    """
+    Признаки клиентов в плотных массивах, индекс = client_id.
+    """
+
+    def __init__(self, size: int, service_types: list[str]):
+        self.service_types = service_types
+        self.known = np.zeros(size, dtype=bool)
+        self.total_spend = np.zeros(size, dtype=np.float64)
+        self.services_count = np.zeros(size, dtype=np.int64)
+        self.is_company = np.zeros(size, dtype=bool)
+        self.type_counts = np.zeros((size, len(service_types)), dtype=np.int64)
+
+
+def load_client_features(client_ids: np.ndarray) -> ClientFeatures:
+    service_types = SERVICE_TYPES
+    type_index = {service_type: i for i, service_type in enumerate(service_types)}
+    size = int(client_ids.max()) + 1 if len(client_ids) else 1
+
+    features = ClientFeatures(size, service_types)
+
+    rows = (
+        ClientStats.objects
+        .filter(client_id__lt=size)
+        .order_by()
+        .values_list("client_id", "client__is_company", "total_spend", "services_count", "service_type_counts")
+    )
+    for client_id, is_company, total_spend, services_count, type_counts in rows.iterator(chunk_size=READ_CHUNK_SIZE):
+        features.known[client_id] = True
+        features.is_company[client_id] = is_company
+        features.total_spend[client_id] = float(total_spend)
+        features.services_count[client_id] = services_count
+        for service_type, count in (type_counts or {}).items():
+            if service_type in type_index:
+                features.type_counts[client_id, type_index[service_type]] = count
+
+    return features
+
+
+# ============================================================
+# Запись изменившихся строк
+# ============================================================
+def write_priorities(ticket_ids: np.ndarray, scores: np.ndarray, batch_size: int = WRITE_BATCH_SIZE) -> None:
+    """
+    Версия заявки увеличивается, как при любой записи: переход статуса
+    (CAS по version), прочитавший заявку до пересчёта, увидит конфликт.
+    Событий по каждой заявке нет — дешборд обновляется через агрегаты.
+    """
+    with transaction.atomic():
+        for score in np.unique(scores):
+            ids = ticket_ids[scores == score].tolist()
+            for start in range(0, len(ids), batch_size):
+                (
+                    SupportTicket.objects
+                    .filter(id__in=ids[start:start + batch_size])
+                    .update(priority_score=int(score), version=F("version") + 1)
+                )
+
+
+# ============================================================
+# ГЛАВНАЯ ФУНКЦИЯ
+# ============================================================
+def recompute_open_priorities(
+    dry_run: bool = False,
+    batch_size: int = WRITE_BATCH_SIZE,
+    policy: CompiledPolicy | None = None,
+) -> dict:
+    """
+    Пересчитывает priority_score всех открытых заявок
+    политикой policy (по умолчанию — активной).
+    Возвращает статистику: сколько заявок просчитано/изменено и тайминги.
+    """
+    policy = policy or get_active_policy()
+    timings = {}
+    started = time.perf_counter()
+
+    tickets = load_open_tickets()
+    timings["load_tickets"] = time.perf_counter() - started
+
+    if not len(tickets):
+        return {"tickets": 0, "changed": 0, "policy": str(policy), "timings": timings}
+
+    step = time.perf_counter()
+    features = load_client_features(tickets["client_id"])
+
+    missing = np.unique(tickets["client_id"][~features.known[tickets["client_id"]]])
+    if len(missing):
+        refresh_client_stats(missing.tolist())
+        features = load_client_features(tickets["client_id"])
+
+    distribution = load_spend_distribution()
+    timings["load_clients"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    client_ids = tickets["client_id"]
+    totals = features.total_spend[client_ids]
+
+    if distribution.is_empty:
+        percentile = np.zeros(len(tickets))
+    else:
+        percentile = distribution.percentile_many(totals)
+
+    scores = policy.score_many(
+        tickets["initial_priority"],
+        percentile,
+        features.is_company[client_ids],
+        totals,
+        features.services_count[client_ids],
+        features.type_counts[client_ids],
+    )
+    changed = scores != tickets["priority_score"]
+    timings["evaluate"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    if not dry_run and changed.any():
+        write_priorities(tickets["id"][changed], scores[changed], batch_size=batch_size)
+    timings["write"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    if not dry_run and changed.any():
+        # UPDATE без save(): суммы приоритетов в агрегатах дешборда
+        # пересчитываются за дни, где есть открытые заявки
+        oldest = SupportTicket.objects.filter(status__in=OPEN_STATUSES).aggregate(oldest=Min("created_at"))["oldest"]
+        if oldest is not None:
+            refresh_ticket_rollups({local_day(oldest), local_day(timezone.now())})
+    timings["rollups"] = time.perf_counter() - step
+
+    result = {
+        "tickets": int(len(tickets)),
+        "changed": int(changed.sum()),
+        "policy": str(policy),
+        "timings": timings,
+    }
+    logger.info("Bulk priority recompute finished", extra=result)
+
+    return result
@@ -0,0 +1,349 @@
+"""
+Движок политик приоритизации заявок.
+
+Раньше было две независимые формулы с зашитыми весами:
+- cross/utils.py::calculate_final_priority (перцентиль расходов + веса типов);
+- cross/te.py::calculate_priority (логарифм кол-ва услуг + сумма услуг).
+
+Теперь обе — «виды» (kind) одной политики. Веса хранятся в PriorityPolicy
+(версионируемая запись в БД); при загрузке конфигурация компилируется
+в замыкание с заранее разобранными числами и таблицами по типам услуг:
+
+- score(...)       → приоритет одной заявки (0–100);
+- score_many(...)  → тот же расчёт над NumPy-массивами (массовый пересчёт);
+- raw(...)         → значение формулы до нормализации.
+
+Скомпилированные политики кешируются по (id, version). Активная политика
+перечитывается не чаще раза в POLICY_RELOAD_INTERVAL_SECONDS: версия
+сверяется через общий кеш Django (маркер сбрасывается после коммита
+правки и в любом случае живёт не дольше ACTIVE_POLICY_MARKER_TTL_SECONDS),
+поэтому правка в админке подхватывается всеми процессами без перезапуска.
+"""
+
+import logging
+import math
+import threading
+import time
+
+import numpy as np
+from django.core.cache import cache
+
+from apps.support.models import PriorityPolicy, Service
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# Значения по умолчанию (прежние зашитые веса)
+# ============================================================
+PERCENTILE_DEFAULTS = {
+    "importance_min": 1.10,
+    "importance_max": 1.20,
+    "company_multiplier": 1.15,
+    "services_count_points": 2,
+    "services_count_max_points": 10,
+    "service_types": {
+        "networks":       {"mult": 1.10, "points": 5},
+        "it_services":    {"mult": 1.08, "points": 3},
+        "external_calls": {"mult": 1.04, "points": 2},
+        "local_phone":    {"mult": 1.00, "points": 1},
+        "ip_tv":          {"mult": 1.02, "points": 1},
+    },
+}
+
+LOG_PRICE_DEFAULTS = {
+    "company_multiplier": 1.20,
+    "price_divisor": 50000,
+    "default_base_score": 50,
+    "base_scores": {
+        "networks": 70,
+        "it_services": 65,
+        "local_phone": 55,
+        "external_calls": 50,
+        "ip_tv": 40,
+    },
+}
+
+DEFAULT_CONFIGS = {
+    "percentile": PERCENTILE_DEFAULTS,
+    "log_price": LOG_PRICE_DEFAULTS,
+}
+
+SERVICE_TYPES = [code for code, _ in Service.SERVICE_TYPES]
+
+POLICY_RELOAD_INTERVAL_SECONDS = 5
+ACTIVE_POLICY_CACHE_KEY = "priority-policy:active"
+# Страховка: маркер, закешированный вне очереди с инвалидацией, живёт не дольше
+ACTIVE_POLICY_MARKER_TTL_SECONDS = 300
+
+
+# ============================================================
+# Скомпилированная политика
+# ============================================================
+class CompiledPolicy:
+    """
+    Результат компиляции: имя/версия + функции расчёта.
+
+    Аргументы score / raw:
+        initial_priority, percentile, is_company,
+        total_spend, services_count, type_counts (dict тип → кол-во)
+
+    Аргументы score_many — те же признаки массивами, type_counts —
+    матрица (заявки × SERVICE_TYPES).
+    """
+
+    def __init__(self, name: str, version: int, kind: str, raw, raw_many, policy_id: int | None = None):
+        self.policy_id = policy_id
+        self.name = name
+        self.version = version
+        self.kind = kind
+        self.raw = raw
+        self.raw_many = raw_many
+
+    def __repr__(self):
+        return f"<CompiledPolicy {self.name} v{self.version} ({self.kind})>"
+
+    def score(self, *args, **kwargs) -> int:
+        return int(round(max(0.0, min(self.raw(*args, **kwargs), 100.0))))
+
+    def score_many(self, *args, **kwargs) -> np.ndarray:
+        return np.rint(np.clip(self.raw_many(*args, **kwargs), 0, 100)).astype(np.int64)
+
+
+def _deep_merge(defaults: dict, overrides: dict) -> dict:
+    merged = dict(defaults)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _merged_config(kind: str, config: dict | None) -> dict:
+    """
+    Настройки по умолчанию, поверх — сохранённые в политике.
+    Слияние глубокое: политика, переопределившая один тип услуги
+    в service_types / base_scores, не обнуляет остальные.
+    """
+    return _deep_merge(DEFAULT_CONFIGS[kind], config or {})
+
+
+# ============================================================
+# Компиляция: перцентиль расходов + веса типов
+# ============================================================
+def _compile_percentile(config: dict):
+    importance_min = float(config["importance_min"])
+    importance_span = float(config["importance_max"]) - importance_min
+    company_multiplier = float(config["company_multiplier"])
+    count_points = float(config["services_count_points"])
+    count_max_points = float(config["services_count_max_points"])
+
+    weights = {
+        service_type: (float(w["mult"]), int(w["points"]))
+        for service_type, w in config["service_types"].items()
+    }
+    mult_vector = np.array([weights.get(t, (1.0, 0))[0] for t in SERVICE_TYPES])
+    points_vector = np.array([weights.get(t, (1.0, 0))[1] for t in SERVICE_TYPES])
+
+    def raw(initial_priority, percentile, is_company, total_spend, services_count, type_counts):
+        priority = float(initial_priority) * round(importance_min + percentile * importance_span, 4)
+
+        if is_company:
+            priority *= company_multiplier
+
+        type_multiplier = 1.0
+        type_points = 0
+        for service_type, count in sorted(type_counts.items()):
+            weight = weights.get(service_type)
+            if weight:
+                type_multiplier *= weight[0] ** count
+                type_points += weight[1] * count
+
+        priority *= type_multiplier
+        priority += type_points
+        priority += min(count_points * services_count, count_max_points)
+        return priority
+
+    def raw_many(initial_priority, percentile, is_company, total_spend, services_count, type_counts):
+        importance = np.round(importance_min + percentile * importance_span, 4)
+
+        priority = initial_priority * importance
+        priority = np.where(is_company, priority * company_multiplier, priority)
+        priority = priority * np.prod(mult_vector ** type_counts, axis=1)
+        priority = priority + type_counts @ points_vector
+        priority = priority + np.minimum(count_points * services_count, count_max_points)
+        return priority
+
+    return raw, raw_many
+
+
+# ============================================================
+# Компиляция: логарифм кол-ва услуг + сумма услуг (бывший te.py)
+# ============================================================
+def _compile_log_price(config: dict):
+    company_multiplier = float(config["company_multiplier"])
+    price_divisor = float(config["price_divisor"])
+    default_base = float(config["default_base_score"])
+    base_scores = {t: float(v) for t, v in config["base_scores"].items()}
+    base_vector = np.array([base_scores.get(t, default_base) for t in SERVICE_TYPES])
+
+    def ticket_base(type_counts):
+        # Тип услуги в заявке не хранится — берём самый весомый тип клиента
+        present = [base_scores.get(t, default_base) for t, n in type_counts.items() if n]
+        return max(present) if present else default_base
+
+    def raw(initial_priority, percentile, is_company, total_spend, services_count, type_counts):
+        return (
+            ticket_base(type_counts)
+            * (company_multiplier if is_company else 1.0)
+            * (1 + math.log(services_count + 1, 10))
+            * (1 + float(total_spend) / price_divisor)
+        )
+
+    def raw_many(initial_priority, percentile, is_company, total_spend, services_count, type_counts):
+        present = type_counts > 0
+        base = np.where(
+            present.any(axis=1),
+            np.max(np.where(present, base_vector, -np.inf), axis=1),
+            default_base,
+        )
+        return (
+            base
+            * np.where(is_company, company_multiplier, 1.0)
+            * (1 + np.log10(services_count + 1))
+            * (1 + total_spend / price_divisor)
+        )
+
+    return raw, raw_many
+
+
+COMPILERS = {
+    "percentile": _compile_percentile,
+    "log_price": _compile_log_price,
+}
+
+
+def compile_policy(
+    kind: str,
+    config: dict | None = None,
+    name: str = "default",
+    version: int = 0,
+    policy_id: int | None = None,
+) -> CompiledPolicy:
+    """
+    Компилирует конфигурацию в CompiledPolicy.
+    ValueError → неизвестный вид формулы.
+    """
+    if kind not in COMPILERS:
+        raise ValueError(f"Неизвестный вид политики: {kind}")
+    raw, raw_many = COMPILERS[kind](_merged_config(kind, config))
+    return CompiledPolicy(name=name, version=version, kind=kind, raw=raw, raw_many=raw_many, policy_id=policy_id)
+
+
+def validate_policy_config(kind: str, config) -> None:
+    """
+    Проверка конфигурации перед сохранением (PriorityPolicy.clean):
+    компиляция и пробный расчёт одной заявки.
+    ValueError → описание ошибки.
+    """
+    if config is not None and not isinstance(config, dict):
+        raise ValueError("Конфигурация должна быть JSON-объектом")
+
+    try:
+        policy = compile_policy(kind, config)
+        policy.score(
+            initial_priority=50,
+            percentile=0.5,
+            is_company=True,
+            total_spend=10000,
+            services_count=len(SERVICE_TYPES),
+            type_counts={service_type: 1 for service_type in SERVICE_TYPES},
+        )
+    except (ValueError, KeyError, TypeError, AttributeError, ArithmeticError) as e:
+        raise ValueError(f"Некорректная конфигурация политики: {e!r}") from e
+
+
+DEFAULT_POLICY = compile_policy("percentile", name="default")
+LOG_PRICE_POLICY = compile_policy("log_price", name="log_price")
+
+
+# ============================================================
+# Активная политика: кеш по версии + горячая перезагрузка
+# ============================================================
+_compiled: dict[tuple[int, int], CompiledPolicy] = {}
+_active: CompiledPolicy = DEFAULT_POLICY
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def compile_stored_policy(policy: PriorityPolicy) -> CompiledPolicy:
+    key = (policy.pk, policy.version)
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = compile_policy(
+            policy.kind,
+            policy.config,
+            name=policy.name,
+            version=policy.version,
+            policy_id=policy.pk,
+        )
+        _compiled[key] = compiled
+    return compiled
+
+
+def _read_active_marker():
+    """
+    (id, version) активной политики или None. Сначала общий кеш, потом БД.
+    """
+    marker = cache.get(ACTIVE_POLICY_CACHE_KEY)
+    if marker is not None:
+        return tuple(marker) if marker else None
+
+    row = PriorityPolicy.objects.filter(is_active=True).values_list("id", "version").first()
+    cache.set(ACTIVE_POLICY_CACHE_KEY, list(row) if row else [], timeout=ACTIVE_POLICY_MARKER_TTL_SECONDS)
+    return row
+
+
+def get_active_policy() -> CompiledPolicy:
+    """
+    Возвращает активную скомпилированную политику (или DEFAULT_POLICY).
+    """
+    global _active, _checked_at
+
+    if time.monotonic() - _checked_at < POLICY_RELOAD_INTERVAL_SECONDS:
+        return _active
+
+    with _lock:
+        if time.monotonic() - _checked_at < POLICY_RELOAD_INTERVAL_SECONDS:
+            return _active
+
+        try:
+            marker = _read_active_marker()
+            if marker is None:
+                _active = DEFAULT_POLICY
+            elif (marker[0], marker[1]) != (_active.policy_id, _active.version):
+                policy = PriorityPolicy.objects.filter(pk=marker[0]).first()
+                if policy is None:
+                    _active = DEFAULT_POLICY
+                else:
+                    _active = compile_stored_policy(policy)
+                    logger.info("Priority policy loaded: %s", _active)
+        except Exception:
+            logger.exception("Priority policy reload failed, keeping %s", _active)
+
+        _checked_at = time.monotonic()
+        return _active
+
+
+def invalidate_active_policy() -> None:
+    """
+    Вызывается после коммита изменения PriorityPolicy: сбрасывает маркер
+    в общем кеше (все процессы увидят новую версию при следующей проверке)
+    и локальный таймер проверки. До коммита другой процесс успел бы
+    перечитать из БД старую версию и снова закешировать её.
+    """
+    global _checked_at
+    cache.delete(ACTIVE_POLICY_CACHE_KEY)
+    _checked_at = 0.0
@@ -0,0 +1,157 @@
+"""
+Учёт SQL-запросов: количество и время на участок кода / запрос.
+
+    with record_queries("dashboard") as stats:
+        ...
+    stats.count, stats.seconds, stats.duplicates()
+
+    with query_budget(20, "assign_engineer"):
+        ...                         # > 20 запросов → QueryBudgetExceeded
+
+    @budgeted(130, warm=10, POST=75)   # бюджеты представления
+
+Счётчик ставится обёрткой execute_wrapper на соединения текущего
+потока. Задачи, которые уходят в пул потоков (дешборд), оборачиваются
+bind_recorders(): в рабочем потоке на его соединение ставятся те же
+счётчики, поэтому запросы параллельных секций тоже учитываются.
+"""
+
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db import connections
+
+
+# Счётчики, активные в текущем контексте (вложенные участки считаются во всех)
+_active_recorders: ContextVar[tuple] = ContextVar("query_recorders", default=())
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+# ============================================================
+# Счётчик
+# ============================================================
+class QueryStats:
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.count += 1
+                self.seconds += elapsed
+                self.statements[sql] += 1
+
+    def duplicates(self, limit: int = 5) -> list[tuple[str, int]]:
+        """
+        Самые частые повторяющиеся запросы — типичный след N+1.
+        """
+        return [(sql, n) for sql, n in self.statements.most_common(limit) if n > 1]
+
+    def __repr__(self):
+        return f"<QueryStats {self.label!r}: {self.count} queries, {self.seconds * 1000:.1f} ms>"
+
+
+@contextmanager
+def _wrap_connections(recorders):
+    with ExitStack() as stack:
+        for alias in connections:
+            connection = connections[alias]
+            for recorder in recorders:
+                stack.enter_context(connection.execute_wrapper(recorder))
+        yield
+
+
+# ============================================================
+# Публичный API
+# ============================================================
+@contextmanager
+def record_queries(label: str = ""):
+    stats = QueryStats(label)
+    token = _active_recorders.set(_active_recorders.get() + (stats,))
+    try:
+        with _wrap_connections((stats,)):
+            yield stats
+    finally:
+        _active_recorders.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = ""):
+    """
+    QueryBudgetExceeded, если внутри блока выполнено больше max_queries запросов.
+    """
+    with record_queries(label) as stats:
+        yield stats
+
+    if stats.count > max_queries:
+        details = "\n".join(f"  {n}× {sql[:200]}" for sql, n in stats.duplicates())
+        raise QueryBudgetExceeded(
+            f"{label or 'block'}: {stats.count} queries > budget {max_queries}"
+            + (f"\nrepeated:\n{details}" if details else "")
+        )
+
+
+def bind_recorders(func):
+    """
+    Переносит активные счётчики в поток, где будет вызвана func.
+    """
+    recorders = _active_recorders.get()
+    if not recorders:
+        return func
+
+    @wraps(func)
+    def bound(*args, **kwargs):
+        token = _active_recorders.set(recorders)
+        try:
+            with _wrap_connections(recorders):
+                return func(*args, **kwargs)
+        finally:
+            _active_recorders.reset(token)
+
+    return bound
+
+
+def budgeted(max_queries: int, warm: int | None = None, **methods):
+    """
+    Бюджет запросов представления: читается QueryBudgetMiddleware
+    и тестами apps/support/tests.py. Ставится внешним декоратором.
+
+    max_queries — холодный путь (кеши пусты);
+    warm        — повторный запрос с прогретыми кешами (по умолчанию = max_queries);
+    methods     — отдельный бюджет метода, например POST=75 (холодный и тёплый).
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        view.query_budget_warm = max_queries if warm is None else warm
+        view.query_budget_methods = {method.upper(): n for method, n in methods.items()}
+        return view
+    return decorator
+
+
+def view_budget(view, method: str, default: int, warm: bool = False) -> int:
+    """
+    Бюджет представления для метода: отдельный бюджет метода,
+    иначе тёплый / холодный, иначе default (не размеченные представления).
+    """
+    methods = getattr(view, "query_budget_methods", {})
+    if method.upper() in methods:
+        return methods[method.upper()]
+    if warm:
+        return getattr(view, "query_budget_warm", getattr(view, "query_budget", default))
+    return getattr(view, "query_budget", default)
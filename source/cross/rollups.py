@@ -0,0 +1,237 @@
+"""
+Дневные агрегаты для графиков дешборда (таблица DashboardRollup).
+
+Раньше каждый показ дешборда пересчитывал GROUP BY по всей таблице
+заявок, а динамика по дням строилась через .extra("DATE(created_at)"),
+то есть в UTC. Теперь:
+
+- счётчики хранятся по дням TIME_ZONE (Asia/Almaty);
+- при записи заявки/услуги клиента пересчитываются только затронутые
+  дни (один GROUP BY по диапазону created_at + upsert) после коммита;
+- графики читают суммы по агрегатам: число строк зависит от количества
+  дней в окне, а не от объёма истории;
+- rebuild_rollups() — полная пересборка (команда rebuild_dashboard_rollups).
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate, TruncDay, TruncMonth, TruncWeek
+from django.dispatch import Signal
+from django.utils import timezone
+
+from apps.support.models import ClientService, DashboardRollup, Engineer, Service, SupportTicket
+
+
+# ============================================================
+# Настройки
+# ============================================================
+ROLLUP_TZ = timezone.get_default_timezone()
+
+TICKET_METRICS = ("status", "engineer", "priority")
+SERVICE_METRICS = ("service",)
+
+# Гранулярность динамики: функция усечения + окно (в днях)
+GRANULARITIES = {
+    "day": (TruncDay, 90),
+    "week": (TruncWeek, 52 * 7),
+    "month": (TruncMonth, 24 * 31),
+}
+DEFAULT_GRANULARITY = "day"
+
+# Отправляется после записи агрегатов; аргумент metrics — изменённые метрики
+rollups_changed = Signal()
+
+
+# ============================================================
+# Дни
+# ============================================================
+def local_day(moment: datetime) -> date:
+    return timezone.localtime(moment, ROLLUP_TZ).date()
+
+
+def _day_range(days) -> tuple[datetime, datetime]:
+    """
+    Полуинтервал [начало первого дня, начало дня после последнего).
+    """
+    first, last = min(days), max(days)
+    start = datetime.combine(first, time.min, tzinfo=ROLLUP_TZ)
+    end = datetime.combine(last + timedelta(days=1), time.min, tzinfo=ROLLUP_TZ)
+    return start, end
+
+
+# ============================================================
+# Расчёт агрегатов по источникам
+# ============================================================
+def _ticket_rollups(start: datetime | None = None, end: datetime | None = None) -> list[DashboardRollup]:
+    tickets = SupportTicket.objects.order_by()
+    if start is not None:
+        tickets = tickets.filter(created_at__gte=start, created_at__lt=end)
+    tickets = tickets.annotate(day=TruncDate("created_at", tzinfo=ROLLUP_TZ))
+
+    rollups = []
+    priority_by_day = {}
+
+    for row in tickets.values("day", "status").annotate(total=Count("id"), priority=Sum("priority_score")):
+        rollups.append(DashboardRollup(day=row["day"], metric="status", key=row["status"], value=row["total"]))
+        priority_by_day[row["day"]] = priority_by_day.get(row["day"], 0) + (row["priority"] or 0)
+
+    for day, value in priority_by_day.items():
+        rollups.append(DashboardRollup(day=day, metric="priority", key="sum", value=value))
+
+    engineer_rows = (
+        tickets
+        .filter(engineer__isnull=False)
+        .values("day", "engineer_id")
+        .annotate(total=Count("id"))
+    )
+    for row in engineer_rows:
+        rollups.append(DashboardRollup(day=row["day"], metric="engineer", key=str(row["engineer_id"]), value=row["total"]))
+
+    return rollups
+
+
+def _service_rollups(start: datetime | None = None, end: datetime | None = None) -> list[DashboardRollup]:
+    links = ClientService.objects.order_by()
+    if start is not None:
+        links = links.filter(created_at__gte=start, created_at__lt=end)
+
+    rows = (
+        links
+        .annotate(day=TruncDate("created_at", tzinfo=ROLLUP_TZ))
+        .values("day", "service_id")
+        .annotate(total=Count("id"))
+    )
+    return [
+        DashboardRollup(day=row["day"], metric="service", key=str(row["service_id"]), value=row["total"])
+        for row in rows
+    ]
+
+
+def _replace(metrics, rollups, first: date | None = None, last: date | None = None) -> int:
+    """
+    Заменяет строки metrics за [first, last] (или все) на rollups.
+    """
+    with transaction.atomic():
+        stale = DashboardRollup.objects.filter(metric__in=metrics)
+        if first is not None:
+            stale = stale.filter(day__gte=first, day__lte=last)
+        stale.delete()
+
+        DashboardRollup.objects.bulk_create(
+            rollups,
+            update_conflicts=True,
+            unique_fields=["day", "metric", "key"],
+            update_fields=["value"],
+        )
+
+    rollups_changed.send(sender=DashboardRollup, metrics=tuple(metrics))
+    return len(rollups)
+
+
+# ============================================================
+# Инкрементальное обновление
+# ============================================================
+def refresh_ticket_rollups(days) -> int:
+    """
+    Пересчитывает агрегаты заявок за дни от min(days) до max(days).
+    """
+    days = set(days)
+    if not days:
+        return 0
+    start, end = _day_range(days)
+    return _replace(TICKET_METRICS, _ticket_rollups(start, end), min(days), max(days))
+
+
+def refresh_service_rollups(days) -> int:
+    days = set(days)
+    if not days:
+        return 0
+    start, end = _day_range(days)
+    return _replace(SERVICE_METRICS, _service_rollups(start, end), min(days), max(days))
+
+
+def schedule_ticket_rollup_refresh(*tickets: SupportTicket) -> None:
+    """
+    Обновить агрегаты дней создания заявок после коммита транзакции.
+    """
+    days = {local_day(t.created_at) for t in tickets if t.created_at is not None}
+    if days:
+        transaction.on_commit(lambda: refresh_ticket_rollups(days))
+
+
+def schedule_service_rollup_refresh(*links: ClientService) -> None:
+    days = {local_day(link.created_at) for link in links if link.created_at is not None}
+    if days:
+        transaction.on_commit(lambda: refresh_service_rollups(days))
+
+
+def rebuild_rollups() -> dict:
+    """
+    Полная пересборка всех агрегатов (бэкфилл).
+    """
+    return {
+        "tickets": _replace(TICKET_METRICS, _ticket_rollups()),
+        "services": _replace(SERVICE_METRICS, _service_rollups()),
+    }
+
+
+# ============================================================
+# Чтение: серии для графиков
+# ============================================================
+def _totals(metric: str) -> dict[str, int]:
+    rows = (
+        DashboardRollup.objects
+        .filter(metric=metric)
+        .values("key")
+        .annotate(total=Sum("value"))
+        .order_by("key")
+    )
+    return {row["key"]: row["total"] for row in rows}
+
+
+def ticket_status_counts() -> list[dict]:
+    return [{"status": status, "total": total} for status, total in _totals("status").items() if total]
+
+
+def average_priority() -> float:
+    tickets = sum(_totals("status").values())
+    if not tickets:
+        return 0
+    return round(_totals("priority").get("sum", 0) / tickets, 1)
+
+
+def engineer_load() -> list[dict]:
+    totals = _totals("engineer")
+    return [
+        {"full_name": full_name, "total_tickets": totals.get(str(engineer_id), 0)}
+        for engineer_id, full_name in Engineer.objects.order_by("id").values_list("id", "full_name")
+    ]
+
+
+def service_usage() -> list[dict]:
+    totals = _totals("service")
+    return [
+        {"title": title, "total_users": totals.get(str(service_id), 0)}
+        for service_id, title in Service.objects.order_by("id").values_list("id", "title")
+    ]
+
+
+def ticket_timeline(granularity: str = DEFAULT_GRANULARITY) -> list[dict]:
+    """
+    Количество созданных заявок по дням / неделям / месяцам
+    за последнее окно гранулярности.
+    """
+    trunc, window_days = GRANULARITIES.get(granularity, GRANULARITIES[DEFAULT_GRANULARITY])
+    since = local_day(timezone.now()) - timedelta(days=window_days)
+
+    rows = (
+        DashboardRollup.objects
+        .filter(metric="status", day__gte=since)
+        .annotate(period=trunc("day"))
+        .values("period")
+        .annotate(total=Sum("value"))
+        .order_by("period")
+    )
+    return [{"day": row["period"].isoformat(), "total": row["total"]} for row in rows]
@@ -0,0 +1,301 @@
+"""
+Полнотекстовый поиск по заявкам (описание + финальное решение).
+
+Индекс — отдельная таблица, ключ = id заявки:
+- SQLite:     виртуальная таблица FTS5 support_ticket_fts
+              (description, resolution), ранжирование bm25();
+- PostgreSQL: support_ticket_search(ticket_id, document tsvector)
+              с GIN-индексом, ранжирование ts_rank_cd().
+
+Нормализация одна для обеих СУБД и делается в Python: нижний регистр,
+ё → е, казахские буквы → ближайшие русские (ә → а, қ → к, ң → н, і → и …),
+чтобы «қосылу» и «косылу» находили друг друга. В индекс пишутся целые
+слова; слова запроса укорачиваются до основы (снимается одно русское или
+казахское окончание) и ищутся по префиксу: «соединения» → «соедин*».
+Поэтому в PostgreSQL используется конфигурация 'simple', а не 'russian':
+стемминг Snowball портит казахские слова и дал бы другие результаты,
+чем SQLite.
+
+Индекс обновляется после коммита при сохранении / удалении заявки
+(сигналы), полностью перестраивается командой rebuild_search_index.
+"""
+
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from apps.support.models import SupportTicket
+
+
+# ============================================================
+# Настройки
+# ============================================================
+SEARCH_LIMIT = 200
+MIN_TOKEN_LENGTH = 3
+MIN_STEM_LENGTH = 4
+
+# Вес описания и решения в ранжировании
+DESCRIPTION_WEIGHT = 1.0
+RESOLUTION_WEIGHT = 0.5
+
+SQLITE_TABLE = "support_ticket_fts"
+POSTGRES_TABLE = "support_ticket_search"
+
+INDEXED_FIELDS = {"description", "final_resolution"}
+
+_FOLD = str.maketrans({
+    "ё": "е", "й": "и",
+    "ә": "а", "ғ": "г", "қ": "к", "ң": "н", "ө": "о",
+    "ұ": "у", "ү": "у", "һ": "х", "і": "и",
+})
+
+_TOKEN_RE = re.compile(r"[0-9a-zа-я]+")
+
+# Окончания после свёртки букв; снимается самое длинное подходящее
+_SUFFIXES = sorted(
+    {
+        # русские
+        "иями", "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими", "ение", "ения", "ении",
+        "ов", "ев", "еи", "ии", "ыи", "ои", "ая", "яя", "ое", "ее", "ые", "ие", "ах", "ях",
+        "ом", "ем", "ам", "ям", "ию", "ия", "ью",
+        "а", "я", "о", "е", "ы", "и", "у", "ю", "ь",
+        # казахские
+        "лар", "лер", "дар", "дер", "тар", "тер", "нын", "нин", "дын", "дин", "тын", "тин",
+        "да", "де", "та", "те", "га", "ге", "ка", "ке", "ны", "ды", "ты",
+    },
+    key=len,
+    reverse=True,
+)
+
+
+# ============================================================
+# Нормализация
+# ============================================================
+def normalize(text: str | None) -> str:
+    """
+    Текст для индекса: свёрнутые слова через пробел.
+    """
+    if not text:
+        return ""
+    return " ".join(_TOKEN_RE.findall(text.lower().translate(_FOLD)))
+
+
+def stem(token: str) -> str:
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LENGTH:
+            return token[: -len(suffix)]
+    return token
+
+
+def query_terms(query: str) -> list[str]:
+    """
+    Основы слов запроса (без повторов, в исходном порядке).
+    """
+    terms = []
+    for token in normalize(query).split():
+        if len(token) >= MIN_TOKEN_LENGTH:
+            term = stem(token)
+            if term not in terms:
+                terms.append(term)
+    return terms
+
+
+# ============================================================
+# Запись в индекс
+# ============================================================
+def write_documents(rows, using=None) -> int:
+    """
+    rows: (id заявки, описание, финальное решение).
+    Пишет / заменяет документы индекса.
+    """
+    conn = using or connection
+    documents = [
+        (ticket_id, normalize(description), normalize(resolution))
+        for ticket_id, description, resolution in rows
+    ]
+    if not documents:
+        return 0
+
+    with conn.cursor() as cursor:
+        if conn.vendor == "sqlite":
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO {SQLITE_TABLE} (rowid, description, resolution) VALUES (%s, %s, %s)",
+                documents,
+            )
+        elif conn.vendor == "postgresql":
+            cursor.executemany(
+                f"INSERT INTO {POSTGRES_TABLE} (ticket_id, document) "
+                f"VALUES (%s, setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B')) "
+                f"ON CONFLICT (ticket_id) DO UPDATE SET document = EXCLUDED.document",
+                documents,
+            )
+    return len(documents)
+
+
+def delete_documents(ticket_ids) -> None:
+    ticket_ids = list(ticket_ids)
+    if not ticket_ids:
+        return
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.executemany(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [(i,) for i in ticket_ids])
+        elif connection.vendor == "postgresql":
+            cursor.execute(f"DELETE FROM {POSTGRES_TABLE} WHERE ticket_id = ANY(%s)", [ticket_ids])
+
+
+def index_tickets(ticket_ids) -> int:
+    rows = (
+        SupportTicket.objects
+        .filter(id__in=list(ticket_ids))
+        .values_list("id", "description", "final_resolution")
+    )
+    return write_documents(rows)
+
+
+def schedule_ticket_index(ticket: SupportTicket, update_fields=None) -> None:
+    """
+    Переиндексировать заявку после коммита, если менялся её текст.
+    """
+    if update_fields is not None and not INDEXED_FIELDS & set(update_fields):
+        return
+    ticket_id = ticket.id
+    transaction.on_commit(lambda: index_tickets([ticket_id]))
+
+
+def schedule_ticket_unindex(ticket: SupportTicket) -> None:
+    ticket_id = ticket.id   # после delete() Django обнуляет pk
+    transaction.on_commit(lambda: delete_documents([ticket_id]))
+
+
+def rebuild_index(batch_size: int = 2000) -> int:
+    """
+    Полная перестройка индекса (бэкфилл / после массовых вставок).
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute(f"DELETE FROM {SQLITE_TABLE}")
+            elif connection.vendor == "postgresql":
+                cursor.execute(f"TRUNCATE {POSTGRES_TABLE}")
+
+        total = 0
+        batch = []
+        rows = SupportTicket.objects.order_by("id").values_list("id", "description", "final_resolution")
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                total += write_documents(batch)
+                batch = []
+        total += write_documents(batch)
+    return total
+
+
+# ============================================================
+# Поиск
+# ============================================================
+def _sqlite_search(terms, match_all, resolved_only, limit):
+    operator = " AND " if match_all else " OR "
+    match = operator.join(f'"{term}"*' for term in terms)
+    resolved = "AND t.final_resolution > ''" if resolved_only else ""
+    table = SupportTicket._meta.db_table
+
+    sql = (
+        f"SELECT {SQLITE_TABLE}.rowid FROM {SQLITE_TABLE} JOIN {table} t ON t.id = {SQLITE_TABLE}.rowid "
+        f"WHERE {SQLITE_TABLE} MATCH %s {resolved} "
+        f"ORDER BY bm25({SQLITE_TABLE}, %s, %s), {SQLITE_TABLE}.rowid DESC LIMIT %s"
+    )
+    return sql, [match, DESCRIPTION_WEIGHT, RESOLUTION_WEIGHT, limit]
+
+
+def _postgres_search(terms, match_all, resolved_only, limit):
+    operator = " & " if match_all else " | "
+    tsquery = operator.join(f"'{term}':*" for term in terms)
+    resolved = "AND t.final_resolution > ''" if resolved_only else ""
+    table = SupportTicket._meta.db_table
+
+    # Веса {D, C, B, A}: A — описание, B — решение
+    weights = f"'{{0, 0, {RESOLUTION_WEIGHT}, {DESCRIPTION_WEIGHT}}}'"
+    sql = (
+        f"SELECT s.ticket_id FROM {POSTGRES_TABLE} s JOIN {table} t ON t.id = s.ticket_id "
+        f"WHERE s.document @@ to_tsquery('simple', %s) {resolved} "
+        f"ORDER BY ts_rank_cd({weights}, s.document, to_tsquery('simple', %s)) DESC, s.ticket_id DESC LIMIT %s"
+    )
+    return sql, [tsquery, tsquery, limit]
+
+
+def search_ticket_ids(
+    query: str,
+    limit: int = SEARCH_LIMIT,
+    match_all: bool = True,
+    resolved_only: bool = False,
+) -> list[int]:
+    """
+    id заявок по убыванию релевантности.
+
+    match_all=True  — все слова запроса (поиск в админке / дешборде);
+    match_all=False — любое слово, лучшие совпадения выше (похожие решения в боте).
+    resolved_only   — только заявки с финальным решением.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+
+    if connection.vendor == "sqlite":
+        sql, params = _sqlite_search(terms, match_all, resolved_only, limit)
+    elif connection.vendor == "postgresql":
+        sql, params = _postgres_search(terms, match_all, resolved_only, limit)
+    else:
+        # Без полнотекстового индекса — подстрочный поиск
+        tickets = SupportTicket.objects.filter(search_condition(query, match_all))
+        if resolved_only:
+            tickets = tickets.filter(final_resolution__gt="")
+        return list(tickets.order_by("-id").values_list("id", flat=True)[:limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_condition(query: str, match_all: bool = True) -> Q:
+    """
+    Условие «найдено по запросу» для фильтра queryset: подзапрос к индексу
+    без ранжирования и без ограничения SEARCH_LIMIT (поиск в админке,
+    где нужны все совпадения, а порядок задаёт список).
+    """
+    terms = query_terms(query)
+    if not terms:
+        return Q(pk__in=[])
+
+    if connection.vendor == "sqlite":
+        operator = " AND " if match_all else " OR "
+        match = operator.join(f'"{term}"*' for term in terms)
+        return Q(id__in=RawSQL(f"SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s", [match]))
+
+    if connection.vendor == "postgresql":
+        operator = " & " if match_all else " | "
+        tsquery = operator.join(f"'{term}':*" for term in terms)
+        return Q(id__in=RawSQL(
+            f"SELECT ticket_id FROM {POSTGRES_TABLE} WHERE document @@ to_tsquery('simple', %s)",
+            [tsquery],
+        ))
+
+    # Без полнотекстового индекса — подстрочный поиск
+    condition = Q()
+    for term in terms:
+        term_q = Q(description__icontains=term) | Q(final_resolution__icontains=term)
+        condition = condition & term_q if match_all else condition | term_q
+    return condition
+
+
+def search_tickets(query: str, queryset=None, limit: int = SEARCH_LIMIT, **options) -> list[SupportTicket]:
+    """
+    Заявки queryset (по умолчанию все), найденные по запросу, в порядке релевантности.
+    """
+    ids = search_ticket_ids(query, limit=limit, **options)
+    if queryset is None:
+        queryset = SupportTicket.objects.all()
+    found = queryset.in_bulk(ids)
+    return [found[ticket_id] for ticket_id in ids if ticket_id in found]
@@ -1,17 +1,15 @@
 import math
 
+from cross.priority_policy import LOG_PRICE_DEFAULTS, LOG_PRICE_POLICY
+
 
 # ============================================================
 # Базовые приоритеты типов услуг
+# (значения по умолчанию политики вида "log_price",
+#  см. cross/priority_policy.py)
 # ============================================================
 
-SERVICE_BASE_SCORES = {
-    "networks": 70,
-    "it_services": 65,
-    "local_phone": 55,
-    "external_calls": 50,
-    "ip_tv": 40,
-}
+SERVICE_BASE_SCORES = LOG_PRICE_DEFAULTS["base_scores"]
 
 
 # ============================================================
@@ -22,7 +20,7 @@ def get_client_type_multiplier(is_company: bool) -> float:
     """
     Юр лицо важнее — множитель больше.
     """
-    return 1.20 if is_company else 1.00
+    return LOG_PRICE_DEFAULTS["company_multiplier"] if is_company else 1.00
 
 
 # ============================================================
@@ -50,7 +48,7 @@ def get_total_price_factor(total_price: float) -> float:
     50 000 тенге → x2
     10 000 → x1.2
     """
-    return 1 + (total_price / 50000)
+    return 1 + (total_price / LOG_PRICE_DEFAULTS["price_divisor"])
 
 
 # ============================================================
@@ -58,7 +56,7 @@ def get_total_price_factor(total_price: float) -> float:
 # ============================================================
 
 def get_base_score(service_type: str) -> float:
-    return SERVICE_BASE_SCORES.get(service_type, 50)
+    return SERVICE_BASE_SCORES.get(service_type, LOG_PRICE_DEFAULTS["default_base_score"])
 
 
 # ============================================================
@@ -72,39 +70,16 @@ def calculate_priority(
     is_company: bool,
 ) -> float:
     """
-    Комплексная оценка приоритета заявки на поддержку.
+    Комплексная оценка приоритета заявки на поддержку
+    (без нормализации, формула политики "log_price").
     """
-
-    base = get_base_score(service_type)
-    type_coef = get_client_type_multiplier(is_company)
-    count_factor = get_service_count_factor(service_count)
-    price_factor = get_total_price_factor(total_price)
-
-    final = base * type_coef * count_factor * price_factor
+    final = LOG_PRICE_POLICY.raw(
+        initial_priority=None,
+        percentile=None,
+        is_company=is_company,
+        total_spend=total_price,
+        services_count=service_count,
+        type_counts={service_type: 1},
+    )
 
     return round(final, 2)
-
-
-# ============================================================
-# Тестовые примеры
-# ============================================================
-
-if __name__ == "__main__":
-    examples = [
-        {
-            "title": "Физ лицо, 2 услуги, сумма 8000, заявка networks",
-            "args": ("networks", 2, 8000, False),
-        },
-        {
-            "title": "Юр лицо, 20 услуг, 40 000 тг, заявка it_services",
-            "args": ("it_services", 20, 40000, True),
-        },
-        {
-            "title": "1000 дешевых услуг, 10 000 тг, networks",
-            "args": ("networks", 1000, 10000, False),
-        },
-    ]
-
-    for ex in examples:
-        result = calculate_priority(*ex["args"])
-        print(f"{ex['title']} → приоритет = {result}")
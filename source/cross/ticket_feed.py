@@ -0,0 +1,136 @@
+"""
+Постраничная выдача заявок для дешборда (keyset-пагинация).
+
+Порядок внутри раздела тот же, что был у общего списка:
+    -priority_score, created_at, id
+
+Вместо OFFSET следующая страница начинается строго после последней
+показанной заявки (курсор = её ключ сортировки), поэтому стоимость
+запроса не растёт с номером страницы и вставки новых заявок не
+сдвигают уже загруженные карточки.
+
+Длинные AI-поля в карточках всё равно обрезаются до 200 символов,
+поэтому из БД читаются только их префиксы (Substr), а сами поля
+откладываются (defer).
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from django.db.models.functions import Substr
+
+from apps.support.models import SupportTicket
+from cross.search import search_ticket_ids
+
+
+# ============================================================
+# Настройки
+# ============================================================
+PAGE_SIZE = 24
+PREVIEW_LENGTH = 201     # truncatechars:200 + признак обрезки
+
+PREVIEW_FIELDS = [
+    "description",
+    "why_engineer_needed",
+    "proposed_solution_engineer",
+    "proposed_solution_client",
+    "final_resolution",
+]
+
+SECTIONS = {
+    "active": ~Q(status="done"),
+    "done": Q(status="done"),
+}
+
+
+# ============================================================
+# Курсор
+# ============================================================
+def encode_cursor(ticket: SupportTicket) -> str:
+    payload = [ticket.priority_score, ticket.created_at.isoformat(), ticket.id]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, datetime, int]:
+    """
+    ValueError → курсор повреждён или подделан.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        priority_score, created_at, ticket_id = json.loads(base64.urlsafe_b64decode(padded))
+        return int(priority_score), datetime.fromisoformat(created_at), int(ticket_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Некорректный курсор") from exc
+
+
+def _after(priority_score: int, created_at: datetime, ticket_id: int) -> Q:
+    """
+    Условие «строго после ключа» для порядка (-priority_score, created_at, id).
+    """
+    return (
+        Q(priority_score__lt=priority_score)
+        | Q(priority_score=priority_score, created_at__gt=created_at)
+        | Q(priority_score=priority_score, created_at=created_at, id__gt=ticket_id)
+    )
+
+
+# ============================================================
+# Страница раздела
+# ============================================================
+def section_queryset(section: str):
+    """
+    Заявки раздела ("active" / "done") в порядке дешборда.
+    """
+    return (
+        SupportTicket.objects
+        .filter(SECTIONS[section])
+        .select_related("client", "engineer")
+        .defer(*PREVIEW_FIELDS)
+        .annotate(**{f"{field}_preview": Substr(field, 1, PREVIEW_LENGTH) for field in PREVIEW_FIELDS})
+        .order_by("-priority_score", "created_at", "id")
+    )
+
+
+def ticket_page(section: str, cursor: str | None = None, limit: int = PAGE_SIZE):
+    """
+    Возвращает (заявки, курсор следующей страницы или None).
+
+    KeyError   → неизвестный раздел.
+    ValueError → некорректный курсор.
+    """
+    queryset = section_queryset(section)
+
+    if cursor:
+        queryset = queryset.filter(_after(*decode_cursor(cursor)))
+
+    tickets = list(queryset[:limit + 1])
+    has_more = len(tickets) > limit
+    tickets = tickets[:limit]
+
+    next_cursor = encode_cursor(tickets[-1]) if has_more else None
+    return tickets, next_cursor
+
+
+def ticket_card(ticket_id: int):
+    """
+    (раздел, заявка) для перерисовки одной карточки или None.
+    """
+    for section in SECTIONS:
+        ticket = section_queryset(section).filter(id=ticket_id).first()
+        if ticket is not None:
+            return section, ticket
+    return None
+
+
+def search_sections(query: str, limit: int = PAGE_SIZE) -> dict[str, list]:
+    """
+    Найденные заявки по разделам, в порядке релевантности.
+    """
+    ids = search_ticket_ids(query, limit=limit)
+    result = {}
+    for section in SECTIONS:
+        found = section_queryset(section).in_bulk(ids) if ids else {}
+        result[section] = [found[ticket_id] for ticket_id in ids if ticket_id in found]
+    return result
@@ -0,0 +1,109 @@
+"""
+Переходы состояний заявки с оптимистичной блокировкой.
+
+Жизненный цикл: new → in_progress → done (+ назначение инженера).
+
+Каждый переход — один условный UPDATE:
+    UPDATE ... SET ..., version = version + 1
+    WHERE id = <id> AND version = <прочитанная версия>
+
+Если строку успели изменить (диспетчер, автоматика, инженер из очереди),
+UPDATE затрагивает 0 строк и вызывающий код получает False вместо
+молчаливой перезаписи чужих изменений. Блокировки строк не нужны.
+"""
+
+import logging
+
+from django.db.models import F
+from django.utils import timezone
+
+from apps.support.models import SupportTicket, Engineer
+from cross.live_events import publish_ticket_event
+from cross.rollups import schedule_ticket_rollup_refresh
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# Разрешённые переходы статусов
+# ============================================================
+ALLOWED_TRANSITIONS = {
+    "new": {"in_progress"},
+    "in_progress": {"done"},
+    "done": set(),
+}
+
+_UNSET = object()
+
+
+def can_transition(from_status: str, to_status: str) -> bool:
+    """
+    True → переход разрешён (или статус не меняется).
+    """
+    return from_status == to_status or to_status in ALLOWED_TRANSITIONS.get(from_status, set())
+
+
+# ============================================================
+# ГЛАВНАЯ ФУНКЦИЯ: compare-and-swap переход
+# ============================================================
+def transition_ticket(
+    ticket: SupportTicket,
+    status: str | None = None,
+    engineer: Engineer | None = _UNSET,
+) -> bool:
+    """
+    Применяет переход к заявке, если с момента чтения её никто не менял.
+
+    - status   → новый статус (проверяется по ALLOWED_TRANSITIONS)
+    - engineer → назначаемый инженер (None — снять назначение)
+
+    True  → изменения записаны, объект ticket обновлён (включая version).
+    False → конфликт версий: заявку изменили параллельно,
+            нужно перечитать её и принять решение заново.
+
+    ValueError → недопустимый переход статуса.
+    """
+    changes = {}
+
+    if status is not None and status != ticket.status:
+        if not can_transition(ticket.status, status):
+            raise ValueError(f"Недопустимый переход статуса: {ticket.status} → {status}")
+        changes["status"] = status
+        if status == "done":
+            changes["closed_at"] = timezone.now()
+
+    if engineer is not _UNSET:
+        changes["engineer"] = engineer
+
+    if not changes:
+        return True
+
+    updated = (
+        SupportTicket.objects
+        .filter(id=ticket.id, version=ticket.version)
+        .update(version=F("version") + 1, **changes)
+    )
+
+    if not updated:
+        logger.debug(
+            "Ticket transition conflict",
+            extra={"ticket_id": ticket.id, "version": ticket.version, "changes": list(changes)},
+        )
+        return False
+
+    for field, value in changes.items():
+        setattr(ticket, field, value)
+    ticket.version += 1
+
+    # UPDATE без save() — сигналы не срабатывают
+    schedule_ticket_rollup_refresh(ticket)
+
+    if changes.get("status") == "done":
+        publish_ticket_event(ticket, "closed")
+    elif "engineer" in changes:
+        publish_ticket_event(ticket, "assigned")
+    else:
+        publish_ticket_event(ticket, "status")
+
+    return True
@@ -1,4 +1,16 @@
-from apps.support.models import Client
+from django.db.models import Count, Sum
+
+from apps.support.models import Client, ClientStats
+from cross.client_spend import get_spend_distribution
+from cross.priority_policy import PERCENTILE_DEFAULTS, get_active_policy
+
+
+# ============================================================
+# Параметры формулы приоритета (значения по умолчанию;
+# действующие веса — в активной PriorityPolicy)
+# ============================================================
+IMPORTANCE_MIN_COEF = PERCENTILE_DEFAULTS["importance_min"]
+IMPORTANCE_MAX_COEF = PERCENTILE_DEFAULTS["importance_max"]
 
 
 # ============================================================
@@ -8,97 +20,103 @@ def calculate_client_total_price(client):
     """
     Возвращает суммарную стоимость всех услуг клиента.
     """
-    return sum(cs.service.price for cs in client.clientservice_set.all())
+    return get_client_stats(client).total_spend
 
 
 # ============================================================
 # Коэффициент важности клиента (динамический)
 # ============================================================
-def calculate_client_importance_multiplier(client, min_coef=1.10, max_coef=1.20):
+def calculate_client_importance_multiplier(
+    client,
+    min_coef=IMPORTANCE_MIN_COEF,
+    max_coef=IMPORTANCE_MAX_COEF,
+):
     """
     Динамически считает коэффициент важности клиента.
-    Основан на перцентильном ранжировании по сумме расходов.
+    Основан на перцентильном ранжировании по сумме расходов
+    (закешированное распределение + бинарный поиск).
     """
-    client_total = calculate_client_total_price(client)
-
-    all_totals = [
-        calculate_client_total_price(c)
-        for c in Client.objects.all()
-    ]
+    distribution = get_spend_distribution()
 
-    if not all_totals or all(t == 0 for t in all_totals):
+    if distribution.is_empty:
         return min_coef
 
-    all_totals.sort()
-    rank = all_totals.index(client_total)
-
-    if len(all_totals) == 1:
-        p = 1.0
-    else:
-        p = rank / (len(all_totals) - 1)
+    client_total = get_client_stats(client).total_spend
+    p = distribution.percentile(float(client_total))
 
     coef = min_coef + p * (max_coef - min_coef)
     return round(coef, 4)
 
 
 # ============================================================
-# Весовые коэффициенты типов услуг
+# Агрегаты по услугам клиента (ClientStats)
 # ============================================================
-SERVICE_TYPE_WEIGHTS = {
-    "networks":      {"mult": 1.10, "points": 5},
-    "it_services":   {"mult": 1.08, "points": 3},
-    "external_calls":{"mult": 1.04, "points": 2},
-    "local_phone":   {"mult": 1.00, "points": 1},
-    "ip_tv":         {"mult": 1.02, "points": 1},
-}
-
-
-# ============================================================
-# ГЛАВНАЯ ФУНКЦИЯ: Финальный приоритет клиента (0–100)
-# ============================================================
-def calculate_final_priority(initial_priority: int, client: Client) -> int:
+def summarize_client_services(type_rows) -> dict:
     """
-    Вычисляет финальный приоритет заявки на основе:
-    - начального приоритета (AI) 30–70
-    - важности клиента (динамический перцентиль)
-    - корпоративного статуса
-    - состава услуг клиента
-    - веса типа каждой услуги (множитель + баллы)
+    Сворачивает строки (service_type, кол-во, сумма) в поля ClientStats:
+    сумма, количество и счётчики по типам. Веса типов здесь не
+    применяются: они берутся из активной PriorityPolicy при расчёте
+    приоритета и не устаревают при её смене.
     """
+    total_spend = 0
+    services_count = 0
+    type_counts = {}
 
-    priority = float(initial_priority)
+    for service_type, count, spend in type_rows:
+        total_spend += spend or 0
+        services_count += count
+        type_counts[service_type] = type_counts.get(service_type, 0) + count
 
-    # 1. Важность клиента (перцентиль затрат)
-    importance_multiplier = calculate_client_importance_multiplier(client)
-    priority *= importance_multiplier
+    return {
+        "total_spend": total_spend,
+        "services_count": services_count,
+        "service_type_counts": type_counts,
+    }
 
-    # 2. Корпоративность клиента
-    if client.is_company:
-        priority *= 1.15
 
-    # 3. Услуги клиента
-    services = client.clientservice_set.all()
-
-    total_multiplier = 1.0
-    total_points = 0
-
-    for cs in services:
-        stype = cs.service.service_type
-        weights = SERVICE_TYPE_WEIGHTS.get(stype)
-
-        if weights:
-            total_multiplier *= weights["mult"]
-            total_points += weights["points"]
-
-    # Применяем множители и баллы
-    priority *= total_multiplier
-    priority += total_points
+def get_client_stats(client: Client) -> ClientStats:
+    """
+    Возвращает предрасчитанную статистику клиента.
+    Если строки ещё нет (до rebuild_client_stats) — считает на лету,
+    не сохраняя результат.
+    """
+    try:
+        return client.stats
+    except ClientStats.DoesNotExist:
+        pass
 
-    # 4. Дополнительные баллы за количество услуг
-    priority += min(2 * len(services), 10)
+    type_rows = (
+        client.clientservice_set
+        .values_list("service__service_type")
+        .annotate(count=Count("id"), spend=Sum("service__price"))
+        .order_by()
+    )
+    return ClientStats(client=client, **summarize_client_services(type_rows))
 
-    # 5. Нормализация 0–100
-    priority = max(0, min(priority, 100))
 
-    return int(round(priority))
-    
\ No newline at end of file
+# ============================================================
+# ГЛАВНАЯ ФУНКЦИЯ: Финальный приоритет клиента (0–100)
+# ============================================================
+def calculate_final_priority(initial_priority: int, client: Client) -> int:
+    """
+    Вычисляет финальный приоритет заявки активной политикой
+    (cross/priority_policy.py). По умолчанию учитываются:
+    - начальный приоритет (AI) 30–70
+    - важность клиента (динамический перцентиль)
+    - корпоративный статус
+    - состав услуг клиента
+    - вес типа каждой услуги (множитель + баллы)
+    """
+    stats = get_client_stats(client)
+
+    distribution = get_spend_distribution()
+    percentile = 0.0 if distribution.is_empty else distribution.percentile(float(stats.total_spend))
+
+    return get_active_policy().score(
+        initial_priority,
+        percentile,
+        client.is_company,
+        stats.total_spend,
+        stats.services_count,
+        stats.service_type_counts,
+    )
@@ -0,0 +1,129 @@
+"""
+Очередь заявок для инженеров: атомарный захват следующей заявки.
+
+Инженер «забирает» самую приоритетную открытую заявку, которая
+либо ещё не назначена, либо заранее назначена именно ему (AI-подбор).
+
+- PostgreSQL → SELECT ... FOR UPDATE SKIP LOCKED: параллельные инженеры
+  не ждут друг друга, занятые строки просто пропускаются.
+- SQLite → блокировок строк нет, поэтому выбор и захват выполняются
+  одним UPDATE ... WHERE id = (SELECT ... LIMIT 1) RETURNING id.
+"""
+
+import logging
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from apps.support.models import SupportTicket, Engineer
+from cross.live_events import publish_ticket_event
+from cross.rollups import schedule_ticket_rollup_refresh
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# Настройки очереди
+# ============================================================
+CLAIM_ORDER = ("-priority_score", "created_at", "id")
+
+
+# ============================================================
+# Заявки, доступные инженеру
+# ============================================================
+def claimable_tickets(engineer: Engineer, queryset=None):
+    """
+    Открытые заявки, которые может взять инженер, в порядке очереди.
+    queryset позволяет сузить очередь (например, для бенчмарка).
+    """
+    if queryset is None:
+        queryset = SupportTicket.objects.all()
+
+    return (
+        queryset
+        .filter(status="new")
+        .filter(Q(engineer__isnull=True) | Q(engineer=engineer))
+        .order_by(*CLAIM_ORDER)
+    )
+
+
+# ============================================================
+# PostgreSQL: FOR UPDATE SKIP LOCKED
+# ============================================================
+def _claim_skip_locked(engineer: Engineer, queryset) -> SupportTicket | None:
+    with transaction.atomic():
+        ticket = (
+            claimable_tickets(engineer, queryset)
+            .select_for_update(skip_locked=True, of=("self",))
+            .first()
+        )
+        if ticket is None:
+            return None
+
+        ticket.engineer = engineer
+        ticket.status = "in_progress"
+        ticket.save(update_fields=["engineer", "status"])
+
+    return ticket
+
+
+# ============================================================
+# SQLite: один условный UPDATE ... RETURNING
+# ============================================================
+def _claim_single_update(engineer: Engineer, queryset) -> SupportTicket | None:
+    """
+    Выбор и захват заявки одним оператором: SQLite выполняет его
+    под одной блокировкой записи, поэтому два инженера не могут
+    получить одну заявку, а каждая запись завершается захватом.
+    Требуется SQLite >= 3.35 (RETURNING).
+    """
+    candidate_sql, candidate_params = (
+        claimable_tickets(engineer, queryset)
+        .values("id")[:1]
+        .query.sql_with_params()
+    )
+    table = connection.ops.quote_name(SupportTicket._meta.db_table)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET engineer_id = %s, status = %s, version = version + 1 "
+            f"WHERE id = ({candidate_sql}) AND status = %s "
+            f"RETURNING id",
+            [engineer.id, "in_progress", *candidate_params, "new"],
+        )
+        row = cursor.fetchone()
+
+    if row is None:
+        return None
+
+    ticket = SupportTicket.objects.get(id=row[0])
+    schedule_ticket_rollup_refresh(ticket)
+    publish_ticket_event(ticket, "assigned")
+    return ticket
+
+
+# ============================================================
+# ГЛАВНАЯ ФУНКЦИЯ
+# ============================================================
+def claim_next_ticket(engineer: Engineer, queryset=None) -> SupportTicket | None:
+    """
+    Атомарно назначает инженеру следующую заявку из очереди.
+    Возвращает заявку или None, если очередь пуста
+    (или все кандидаты уже разобраны параллельными инженерами).
+    """
+    if not engineer.is_active:
+        return None
+
+    if connection.features.has_select_for_update_skip_locked:
+        ticket = _claim_skip_locked(engineer, queryset)
+    else:
+        ticket = _claim_single_update(engineer, queryset)
+
+    if ticket is not None:
+        logger.debug(
+            "Ticket claimed from queue",
+            extra={"ticket_id": ticket.id, "engineer_id": engineer.id},
+        )
+
+    return ticket
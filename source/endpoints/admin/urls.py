@@ -9,6 +9,22 @@ urlpatterns = [
     # dashboard page
     path("dashboard/", views.admin_dashboard_view, name="admin_dashboard"),
 
+    # dashboard: данные графиков (ETag / 304 для опроса)
+    path("dashboard/sections/<str:section>/", views.dashboard_section_view, name="admin_dashboard_section"),
+
+    # dashboard: подгрузка заявок (keyset-пагинация)
+    path("dashboard/tickets/<str:section>/", views.tickets_page_view, name="admin_tickets_page"),
+
+    # dashboard: полнотекстовый поиск заявок
+    path("dashboard/search/", views.ticket_search_view, name="admin_ticket_search"),
+
+    # dashboard: одна карточка и поток живых событий (SSE)
+    path("dashboard/tickets/card/<int:ticket_id>/", views.ticket_card_view, name="admin_ticket_card"),
+    path("dashboard/live/", views.live_events_view, name="admin_live_events"),
+
     # назначение инженера вручную
     path("auto-engineer/<int:ticket_id>/", views.assign_engineer_view, name="assign_engineer"),
+
+    # очередь: инженер забирает следующую заявку
+    path("queue/claim/<int:engineer_id>/", views.claim_ticket_view, name="claim_ticket"),
 ]
@@ -1,119 +1,292 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Avg
-from django.db import models
 from django.contrib import messages
+from django.http import JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.views.decorators.http import condition, require_GET, require_POST
+from datetime import datetime, timezone
+from functools import partial
 import json
+import time
 
 from apps.support.models import (
     SupportTicket,
-    Client,
-    Service,
-    ClientService,
     Engineer,
 )
 
+from cross import dashboard, rollups
 from cross.openai_use_case import OpenAIUseCase
+from cross.query_budget import budgeted
+from cross.live_events import format_sse, get_broker
+from cross.ticket_feed import search_sections, ticket_card, ticket_page
+from cross.ticket_flow import transition_ticket
+from cross.work_queue import claim_next_ticket
 
 
 # ============================================================
 # DASHBOARD
 # ============================================================
+@budgeted(135, warm=10)
 @login_required(login_url="/auth/login/")
 def admin_dashboard_view(request):
     """
     Панель администратора + аналитика для графиков.
     """
 
+    started = time.perf_counter()
+
     # --------------------------------------------------------
-    # 1) Список заявок
+    # 1) Агрегаты и справочники (кеш по секциям, см. cross/dashboard.py)
+    #    + первые страницы заявок (остальные — через admin_tickets_page).
+    #    Независимые запросы выполняются параллельно.
     # --------------------------------------------------------
-    tickets_queryset = (
-        SupportTicket.objects
-        .select_related("client", "engineer")
-        .order_by(
-            models.Case(
-                models.When(status="done", then=2),
-                default=1,
-                output_field=models.IntegerField(),
-            ),
-            "-priority_score",
-            "created_at",
-        )
+    timeline_granularity = request.GET.get("granularity", rollups.DEFAULT_GRANULARITY)
+    if timeline_granularity not in rollups.GRANULARITIES:
+        timeline_granularity = rollups.DEFAULT_GRANULARITY
+
+    sections, timings = dashboard.get_sections(
+        {
+            "status_counts": None,
+            "avg_priority": None,
+            "engineer_load": None,
+            "service_usage": None,
+            "timeline": timeline_granularity,
+            "reference": None,
+        },
+        extra_tasks={
+            "active_page": partial(ticket_page, "active"),
+            "done_page": partial(ticket_page, "done"),
+        },
     )
+    active_tickets, active_next_cursor = sections["active_page"]
+    done_tickets, done_next_cursor = sections["done_page"]
+    reference = sections["reference"]
+    timings["data"] = time.perf_counter() - started
 
     # --------------------------------------------------------
-    # 2) Количество заявок по статусам
+    # 2) Контекст
     # --------------------------------------------------------
-    ticket_status_counts = (
-        SupportTicket.objects
-        .values("status")
-        .annotate(total=Count("id"))
+    context = {
+        "active_tickets": active_tickets,
+        "active_next_cursor": active_next_cursor,
+        "done_tickets": done_tickets,
+        "done_next_cursor": done_next_cursor,
+
+        # KPI
+        "clients_count": reference["clients_count"],
+        "services_count": reference["services_count"],
+        "engineers_count": reference["engineers_count"],
+        "tickets_count": reference["tickets_count"],
+
+        "avg_priority": sections["avg_priority"],
+        "timeline_granularity": timeline_granularity,
+
+        # JSON для графиков
+        "ticket_status_counts_json": json.dumps(sections["status_counts"], ensure_ascii=False),
+        "ticket_timeline_json": json.dumps(sections["timeline"], ensure_ascii=False),
+        "engineer_load_json": json.dumps(sections["engineer_load"], ensure_ascii=False),
+        "service_usage_json": json.dumps(sections["service_usage"], ensure_ascii=False),
+
+        # Справочники
+        "clients": reference["clients"],
+        "services": reference["services"],
+        "engineers": reference["engineers"],
+    }
+
+    render_started = time.perf_counter()
+    response = render(request, "cadmin/dash.html", context)
+    timings["render"] = time.perf_counter() - render_started
+    timings["total"] = time.perf_counter() - started
+
+    # Разбивка времени для DevTools (вкладка Timing)
+    response["Server-Timing"] = ", ".join(
+        f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()
     )
+    return response
 
-    # --------------------------------------------------------
-    # 3) Средний приоритет
-    # --------------------------------------------------------
-    avg_priority = round(
-        SupportTicket.objects.aggregate(avg=Avg("priority_score"))["avg"] or 0,
-        1
+
+
+# ============================================================
+# DASHBOARD: ДАННЫЕ СЕКЦИИ (условный GET для опроса графиков)
+# ============================================================
+def _section_param(request, section):
+    if section != "timeline":
+        return None
+    granularity = request.GET.get("granularity", rollups.DEFAULT_GRANULARITY)
+    return granularity if granularity in rollups.GRANULARITIES else rollups.DEFAULT_GRANULARITY
+
+
+def _section_version(request, section):
+    # Одно чтение кеша на запрос: версию спрашивают ETag, Last-Modified и сам ответ
+    if not hasattr(request, "_dashboard_section_version"):
+        request._dashboard_section_version = dashboard.section_version(section)
+    return request._dashboard_section_version
+
+
+def _section_etag(request, section):
+    if section not in dashboard.SECTIONS:
+        return None
+    return f"{section}-{_section_version(request, section)}-{_section_param(request, section) or ''}"
+
+
+def _section_last_modified(request, section):
+    if section not in dashboard.SECTIONS:
+        return None
+    return datetime.fromtimestamp(_section_version(request, section) / 1e9, tz=timezone.utc)
+
+
+@budgeted(35, warm=8)
+@login_required(login_url="/auth/login/")
+@require_GET
+@condition(etag_func=_section_etag, last_modified_func=_section_last_modified)
+def dashboard_section_view(request, section):
+    """
+    JSON одной секции дешборда: {"section", "version", "data"}.
+    ETag / Last-Modified — поколение секции, поэтому повторный опрос
+    без изменений получает 304 Not Modified за два чтения кеша.
+    """
+    if section not in dashboard.SECTIONS:
+        return JsonResponse({"error": "Неизвестная секция"}, status=404, json_dumps_params={"ensure_ascii": False})
+
+    param = _section_param(request, section)
+    sections, _ = dashboard.get_sections({section: param})
+
+    response = JsonResponse(
+        {"section": section, "version": _section_version(request, section), "data": sections[section]},
+        json_dumps_params={"ensure_ascii": False},
     )
+    # Браузер хранит ответ, но перед использованием всегда перепроверяет ETag
+    response["Cache-Control"] = "private, no-cache"
+    return response
 
-    # --------------------------------------------------------
-    # 4) Загрузка инженеров
-    # --------------------------------------------------------
-    engineer_load = (
-        Engineer.objects
-        .annotate(total_tickets=Count("supportticket"))
-        .values("full_name", "total_tickets")
+
+
+# ============================================================
+# DASHBOARD: СЛЕДУЮЩАЯ СТРАНИЦА ЗАЯВОК
+# ============================================================
+@budgeted(6)
+@login_required(login_url="/auth/login/")
+@require_GET
+def tickets_page_view(request, section):
+    """
+    Следующая страница карточек раздела ("active" / "done").
+    Ответ: {"html": <карточки>, "next_cursor": <курсор или null>}.
+    """
+    try:
+        tickets, next_cursor = ticket_page(section, request.GET.get("cursor"))
+    except KeyError:
+        return JsonResponse({"error": "Неизвестный раздел"}, status=404, json_dumps_params={"ensure_ascii": False})
+    except ValueError:
+        return JsonResponse({"error": "Некорректный курсор"}, status=400, json_dumps_params={"ensure_ascii": False})
+
+    html = render_to_string(f"cadmin/tickets/{section}.html", {"tickets": tickets}, request=request)
+
+    return JsonResponse(
+        {"html": html, "next_cursor": next_cursor},
+        json_dumps_params={"ensure_ascii": False},
     )
 
-    # --------------------------------------------------------
-    # 5) Популярность услуг
-    # --------------------------------------------------------
-    service_usage = (
-        Service.objects
-        .annotate(total_users=Count("clientservice"))
-        .values("title", "total_users")
+
+
+# ============================================================
+# DASHBOARD: ПОИСК ЗАЯВОК (полнотекстовый индекс, см. cross/search.py)
+# ============================================================
+@budgeted(8)
+@login_required(login_url="/auth/login/")
+@require_GET
+def ticket_search_view(request):
+    """
+    ?q=<запрос> → {"active_html", "done_html", "count"}; карточки по релевантности.
+    """
+    found = search_sections(request.GET.get("q", ""))
+
+    return JsonResponse(
+        {
+            "active_html": render_to_string("cadmin/tickets/active.html", {"tickets": found["active"]}, request=request),
+            "done_html": render_to_string("cadmin/tickets/done.html", {"tickets": found["done"]}, request=request),
+            "count": len(found["active"]) + len(found["done"]),
+        },
+        json_dumps_params={"ensure_ascii": False},
     )
 
-    # --------------------------------------------------------
-    # 6) Динамика заявок
-    # --------------------------------------------------------
-    ticket_timeline = (
-        SupportTicket.objects
-        .extra(select={"day": "DATE(created_at)"})
-        .values("day")
-        .annotate(total=Count("id"))
-        .order_by("day")
+
+
+# ============================================================
+# DASHBOARD: ОДНА КАРТОЧКА (для живых обновлений)
+# ============================================================
+@budgeted(6)
+@login_required(login_url="/auth/login/")
+@require_GET
+def ticket_card_view(request, ticket_id):
+    """
+    {"section": "active" | "done", "html": <карточка>}
+    или {"section": null}, если заявки больше нет.
+    """
+    found = ticket_card(ticket_id)
+    if found is None:
+        return JsonResponse({"section": None, "html": ""})
+
+    section, ticket = found
+    html = render_to_string(f"cadmin/tickets/{section}.html", {"tickets": [ticket]}, request=request)
+
+    return JsonResponse(
+        {"section": section, "html": html},
+        json_dumps_params={"ensure_ascii": False},
     )
 
-    # --------------------------------------------------------
-    # 7) Контекст
-    # --------------------------------------------------------
-    context = {
-        "tickets": tickets_queryset,
 
-        # JSON для графиков
-        "ticket_status_counts_json": json.dumps(list(ticket_status_counts), ensure_ascii=False),
-        "ticket_timeline_json": json.dumps(list(ticket_timeline), ensure_ascii=False),
-        "engineer_load_json": json.dumps(list(engineer_load), ensure_ascii=False),
-        "service_usage_json": json.dumps(list(service_usage), ensure_ascii=False),
 
-        # Справочники
-        "clients": Client.objects.all(),
-        "services": Service.objects.all(),
-        "client_services": ClientService.objects.select_related("client", "service"),
-        "engineers": Engineer.objects.all(),
-    }
+# ============================================================
+# DASHBOARD: ЖИВЫЕ СОБЫТИЯ (SSE)
+# ============================================================
+SSE_KEEPALIVE_SECONDS = 20
 
-    return render(request, "cadmin/dash.html", context)
+
+async def _live_event_stream(subscription):
+    """
+    Поток SSE подписчика. Комментарий-пинг раз в SSE_KEEPALIVE_SECONDS
+    не даёт прокси закрыть простаивающее соединение; при отключении
+    клиента ASGI-сервер отменяет генератор и подписка снимается.
+    """
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+            except ConnectionAbortedError:
+                return
+            yield format_sse(event) if event is not None else ": ping\n\n"
+    finally:
+        get_broker().unsubscribe(subscription)
+
+
+@login_required(login_url="/auth/login/")
+async def live_events_view(request):
+    """
+    Поток событий заявок (text/event-stream) для открытых дешбордов.
+    Работает только под ASGI; под WSGI → 501, страница остаётся на опросе.
+    """
+    if not hasattr(request, "scope"):
+        return JsonResponse(
+            {"error": "Живые события доступны только при запуске через ASGI"},
+            status=501,
+            json_dumps_params={"ensure_ascii": False},
+        )
+
+    response = StreamingHttpResponse(
+        _live_event_stream(get_broker().subscribe()),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
 
 
 # ============================================================
 # AI ENGINEER PICK ASSIGNMENT
 # ============================================================
+@budgeted(38)
 @login_required(login_url="/auth/login/")
 def assign_engineer_view(request, ticket_id):
     """
@@ -126,7 +299,7 @@ def assign_engineer_view(request, ticket_id):
     """
 
     # 1) Находим заявку
-    ticket = get_object_or_404(SupportTicket, id=ticket_id)
+    ticket = get_object_or_404(SupportTicket.objects.select_related("client"), id=ticket_id)
 
     # 2) Нельзя назначать инженера в закрытую заявку
     if ticket.status == "done":
@@ -150,10 +323,15 @@ def assign_engineer_view(request, ticket_id):
         messages.error(request, "AI выбрал инженера, которого нет в базе.")
         return redirect("admin_dashboard")
 
-    # 5) Применяем назначение
-    ticket.engineer = engineer
-    ticket.status = "in_progress"
-    ticket.save(update_fields=["engineer", "status"])
+    # 5) Применяем назначение (compare-and-swap: пока работал ИИ,
+    #    заявку мог изменить другой диспетчер или инженер из очереди)
+    if not transition_ticket(ticket, status="in_progress", engineer=engineer):
+        messages.warning(
+            request,
+            f"Заявка #{ticket.ticket_code} была изменена другим пользователем. "
+            "Обновите страницу и повторите назначение."
+        )
+        return redirect("admin_dashboard")
 
     # 6) Красивый вывод причины
     messages.success(
@@ -165,3 +343,40 @@ def assign_engineer_view(request, ticket_id):
     )
 
     return redirect("admin_dashboard")
+
+
+
+# ============================================================
+# ОЧЕРЕДЬ: ИНЖЕНЕР ЗАБИРАЕТ СЛЕДУЮЩУЮ ЗАЯВКУ
+# ============================================================
+@budgeted(35)
+@login_required(login_url="/auth/login/")
+@require_POST
+def claim_ticket_view(request, engineer_id):
+    """
+    Атомарно выдаёт инженеру самую приоритетную открытую заявку.
+    Не блокируется на заявках, которые сейчас забирают другие инженеры.
+    """
+    engineer = get_object_or_404(Engineer, id=engineer_id, is_active=True)
+
+    ticket = claim_next_ticket(engineer)
+
+    if ticket is None:
+        return JsonResponse(
+            {"claimed": False, "message": "Нет доступных заявок"},
+            json_dumps_params={"ensure_ascii": False},
+        )
+
+    return JsonResponse(
+        {
+            "claimed": True,
+            "ticket": {
+                "id": ticket.id,
+                "ticket_code": ticket.ticket_code,
+                "priority_score": ticket.priority_score,
+                "status": ticket.status,
+                "description": ticket.description,
+            },
+        },
+        json_dumps_params={"ensure_ascii": False},
+    )
@@ -5,6 +5,8 @@ from django.views.decorators.http import require_http_methods
 
 from apps.support.models import SupportTicket, Client, Engineer
 from cross.openai_use_case import OpenAIUseCase
+from cross.query_budget import budgeted
+from cross.ticket_flow import transition_ticket
 from cross.utils import calculate_final_priority
 
 
@@ -15,6 +17,7 @@ logger = logging.getLogger(__name__)
 #                     СОЗДАНИЕ ЗАЯВКИ
 # ============================================================
 
+@budgeted(4, POST=72)
 @require_http_methods(["GET", "POST"])
 def support_view(request):
     """
@@ -107,6 +110,7 @@ def support_view(request):
         client=client,
         description=description,
         priority_score=final_priority,
+        initial_priority=int(initial_priority),
         engineer_visit_probability=engineer_prob,
         why_engineer_needed=engineer_prob_expl,
         proposed_solution_engineer=engineer_advice,
@@ -127,10 +131,7 @@ def support_view(request):
             is_active=True
         ).first()
 
-        if engineer:
-            ticket.engineer = engineer
-            ticket.save(update_fields=["engineer"])
-
+        if engineer and transition_ticket(ticket, engineer=engineer):
             logger.info(
                 "Engineer assigned by AI",
                 extra={
@@ -154,6 +155,7 @@ def support_view(request):
 #                ПРОВЕРКА СТАТУСА ЗАЯВКИ
 # ============================================================
 
+@budgeted(5)
 @require_http_methods(["GET", "POST"])
 def check_support_view(request):
     """
@@ -173,7 +175,7 @@ def check_support_view(request):
     # --------------------------------------------------------
     ticket_code = request.POST.get("ticket_id", "").strip()
 
-    ticket = SupportTicket.objects.filter(
+    ticket = SupportTicket.objects.select_related("engineer").filter(
         ticket_code=ticket_code
     ).first()
 
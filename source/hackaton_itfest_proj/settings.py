@@ -70,6 +70,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "apps.common.middleware.SetRealIPMiddleware",
+    "apps.common.middleware.QueryBudgetMiddleware",
     "htmlmin.middleware.HtmlMinifyMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -82,6 +83,11 @@ MIDDLEWARE = [
     "apps.translation.middleware.CustomLocaleMiddleware",
 ]
 
+# Учёт SQL-запросов на запрос (Server-Timing + предупреждение при превышении);
+# по умолчанию только при DEBUG, бюджеты проверяют тесты apps/support/tests.py
+QUERY_BUDGET_ENABLED = config("QUERY_BUDGET_ENABLED", default=DEBUG, cast=bool)
+QUERY_BUDGET_DEFAULT = config("QUERY_BUDGET_DEFAULT", default=50, cast=int)
+
 ROOT_URLCONF = "hackaton_itfest_proj.urls"
 
 TEMPLATES = [
@@ -191,6 +197,26 @@ OPENAI_KEY = config("OPENAI_API_KEY")
 # =============================================================================
 BOT_TOKEN = config("BOT_TOKEN")
 
+# =============================================================================
+# LIVE EVENTS (SSE дешборда)
+# =============================================================================
+# local — брокер в памяти процесса (один ASGI-процесс / разработка)
+# redis — общий брокер между процессами (нужен пакет redis)
+LIVE_EVENTS_BROKER = config("LIVE_EVENTS_BROKER", default="local")
+LIVE_EVENTS_REDIS_URL = config("LIVE_EVENTS_REDIS_URL", default="redis://localhost:6379/0")
+
+# Общий кеш переводов за кешем процесса (apps/translation/_core/cache.py):
+# none  — только кеш процесса
+# local — заглушка в памяти процесса (тесты / разработка)
+# redis — Redis-совместимый сервер, общий для всех воркеров (нужен пакет redis)
+TRANSLATION_SHARED_CACHE = config("TRANSLATION_SHARED_CACHE", default="none")
+TRANSLATION_SHARED_CACHE_URL = config("TRANSLATION_SHARED_CACHE_URL", default="redis://localhost:6379/1")
+
+# Лимиты OpenAI (OPENAI_*_PER_MINUTE в apps/translation/_core/conf.py) — на весь
+# ключ API, а ограничитель считает их в процессе: каждый из N процессов,
+# вызывающих OpenAI (воркеры сервера + pretranslate), получает 1/N лимита
+OPENAI_RATE_LIMIT_PROCESSES = config("OPENAI_RATE_LIMIT_PROCESSES", default=1, cast=int)
+
 # =============================================================================
 # GOOGLE_APP_PASSWORD
 # =============================================================================
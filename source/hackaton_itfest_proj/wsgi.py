@@ -14,3 +14,16 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hackaton_itfest_proj.settings')
 
 application = get_wsgi_application()
+
+# Каталог переводов загружается при старте воркера, а не первым запросом;
+# незавершённые задачи перевода (после рестарта) подхватываются сразу
+from django.db import connections  # noqa: E402
+
+from apps.translation._core.snapshot import preload  # noqa: E402
+from apps.translation._core.translator import resume_translation_jobs  # noqa: E402
+
+preload()
+resume_translation_jobs()
+# Модуль может импортировать мастер-процесс перед fork (gunicorn --preload):
+# соединение, открытое здесь, не должно достаться дочерним процессам
+connections.close_all()